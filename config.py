@@ -69,3 +69,10 @@ SOUND_VOLUME = {
 # Data files
 TASKS_FILE = os.path.join(DATA_DIR, 'tasks_data.json')
 SOUND_FILE = os.path.join(SFX_DIR, 'button_1.mp3')
+
+# Statistics storage backend: "json" (per-year daily_stats/YYYY.json shards) or "sqlite" (daily_stats.db)
+STATS_BACKEND = "json"
+
+# Completed tasks older than this many days move to monthly data/task_archive/YYYY-MM files (None = never)
+TASK_ARCHIVE_AFTER_DAYS = 30
+TASK_ARCHIVE_COMPRESS = True  # gzip the archive files
@@ -7,7 +7,6 @@ A beautiful Pomodoro timer with dual clock system and unlimited sessions support
 
 import sys
 import os
-import tkinter as tk
 from typing import Optional
 
 # Console window management for production deployment
@@ -25,9 +24,14 @@ elif '--hide-console' in sys.argv:
 # Add src directory to Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
-from src.core.timer_controller import TimerController
-from src.ui.welcome_screen import show_welcome_screen
-from src.ui.app_settings import should_show_welcome
+# --headless chạy timer trên terminal, không import Tkinter/UI
+HEADLESS = '--headless' in sys.argv
+
+if not HEADLESS:
+    import tkinter as tk
+    from src.core.timer_controller import TimerController
+    from src.ui.welcome_screen import show_welcome_screen
+    from src.ui.app_settings import should_show_welcome
 
 
 class StudyTimerApp:
@@ -50,6 +54,10 @@ class StudyTimerApp:
 
 def main():
     """Entry point của ứng dụng"""
+    if HEADLESS:
+        from src.core.headless_runner import run_headless
+        return run_headless(sys.argv[1:])
+    
     app = StudyTimerApp()
     
     # Check if should show welcome screen
@@ -61,4 +69,4 @@ def main():
         app.start_main_timer()
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -9,6 +9,13 @@ __description__ = "A beautiful Pomodoro timer with dual clock system"
 
 # Core exports
 from .core.timer_core import TimerCore
-from .core.timer_controller import TimerController
 
 __all__ = ["TimerCore", "TimerController"]
+
+
+def __getattr__(name):
+    """TimerController kéo theo Tkinter nên chỉ import khi được dùng (headless không cần)"""
+    if name == "TimerController":
+        from .core.timer_controller import TimerController
+        return TimerController
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
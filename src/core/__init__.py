@@ -3,6 +3,14 @@ Core timer functionality - Timer logic and main controller
 """
 
 from .timer_core import TimerCore
-from .timer_controller import TimerController
+from .multi_timer_host import MultiTimerHost
 
-__all__ = ["TimerCore", "TimerController"]
+__all__ = ["TimerCore", "TimerController", "MultiTimerHost"]
+
+
+def __getattr__(name):
+    """Import TimerController (và Tkinter) chỉ khi cần - chế độ headless không load Tk"""
+    if name == "TimerController":
+        from .timer_controller import TimerController
+        return TimerController
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,390 @@
+"""
+Headless Runner - Chạy TimerCore và các manager trên terminal, không cần Tkinter
+"""
+
+import argparse
+import queue
+import signal
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional, TextIO
+
+from .timer_core import TimerCore
+from ..managers.task_manager import TaskManager
+from ..managers.daily_stats_manager import DailyStatsManager
+from ..managers.timer_state_manager import TimerStateManager
+from ..managers.persistence_worker import get_persistence_worker
+
+# Lưu trạng thái timer mỗi bao nhiêu giây (giống TimerController)
+AUTO_SAVE_INTERVAL = 30
+
+# Phần tử đánh thức vòng lặp trong queue lệnh (khác None = hết stdin)
+_WAKE = object()
+
+# Khi stdout không phải terminal: in một dòng trạng thái mỗi bao nhiêu giây
+STATUS_LOG_INTERVAL = 60
+
+HELP_TEXT = """Commands:
+  s, start          start the study clock
+  t, toggle         switch between study and break
+  p, pause          freeze both clocks
+  r, reset          reset both clocks
+  c, continue       continue with the next session (after a session ends)
+  b, break          take a break (after a session ends)
+  a, add <text>     add a task
+  d, done <n>       complete active task number n
+  l, tasks          list active tasks
+  i, stats          show today's statistics
+  h, help           show this help
+  q, quit           save and exit"""
+
+
+class HeadlessRunner:
+    """
+    Drives TimerCore, DailyStatsManager, TaskManager and TimerStateManager
+    without Tk: a single loop sleeps until the next whole second of the
+    timer (or until a command arrives on stdin), applies the elapsed time,
+    records stats, auto-saves state and prints a status line.
+
+    Mirrors TimerController's wiring so data files stay interchangeable with
+    the GUI.
+    """
+
+    def __init__(self, output: TextIO = sys.stdout, restore: bool = True):
+        self.output = output
+        self.interactive = output.isatty()
+        self.timer_core = TimerCore()
+        self.task_manager = TaskManager()
+        self.daily_stats = DailyStatsManager()
+        self.timer_state_manager = TimerStateManager()
+        self.persistence = get_persistence_worker()
+
+        # Tracking variables for stats updates
+        self.last_main_time = 0
+        self.last_break_time = 0
+        self.auto_save_counter = 0
+        self.last_status_log = 0.0
+
+        self.running = False
+        self._commands: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._status_visible = False  # Dòng trạng thái đang chiếm dòng cuối (chế độ tty)
+
+        self._handlers: Dict[str, Callable[[str], None]] = {
+            's': self._cmd_start, 'start': self._cmd_start,
+            't': self._cmd_toggle, 'toggle': self._cmd_toggle,
+            'p': self._cmd_pause, 'pause': self._cmd_pause,
+            'r': self._cmd_reset, 'reset': self._cmd_reset,
+            'c': self._cmd_continue, 'continue': self._cmd_continue,
+            'b': self._cmd_break, 'break': self._cmd_break,
+            'a': self._cmd_add, 'add': self._cmd_add,
+            'd': self._cmd_done, 'done': self._cmd_done,
+            'l': self._cmd_tasks, 'tasks': self._cmd_tasks,
+            'i': self._cmd_stats, 'stats': self._cmd_stats,
+            'h': self._cmd_help, 'help': self._cmd_help,
+            'q': self._cmd_quit, 'quit': self._cmd_quit,
+        }
+
+        self._setup_callbacks()
+        if restore:
+            self._try_restore_timer_state()
+
+    def _setup_callbacks(self):
+        """Thiết lập callbacks của core và task manager"""
+        self.timer_core.on_state_change = self._on_state_change
+        self.timer_core.on_session_complete = self._handle_session_complete
+        self.timer_core.on_all_sessions_complete = self._handle_all_sessions_complete
+        self.timer_core.on_choice_required = self._handle_choice_required
+        self.task_manager.on_task_completed = self._on_task_completed
+
+    def _try_restore_timer_state(self):
+        """Khôi phục trạng thái timer đã lưu hôm nay (nếu có)"""
+        try:
+            if self.timer_state_manager.has_saved_state_today():
+                state_data = self.timer_state_manager.load_timer_state()
+                if state_data and self.timer_state_manager.restore_timer_state(self.timer_core, state_data):
+                    # Thời gian đã restore không được tính lại vào daily stats
+                    self.last_main_time = self.timer_core.main_time
+                    self.last_break_time = self.timer_core.break_time
+                    self.timer_core.reset_clock()
+                    self.say("✅ Timer state restored")
+        except Exception as e:
+            self.say(f"Error during state restoration: {e}")
+
+    # ----- Output -----
+
+    def say(self, message: str):
+        """In một thông báo (xuống dòng khỏi dòng trạng thái nếu cần)"""
+        if self._status_visible:
+            self.output.write("\n")
+            self._status_visible = False
+        self.output.write(message + "\n")
+        self.output.flush()
+
+    def status_line(self) -> str:
+        """Dòng trạng thái hiện tại"""
+        core = self.timer_core
+        if core.waiting_for_user_choice:
+            mode = "⏸ CHOICE"
+        elif core.main_running:
+            mode = "▶ STUDY "
+        elif core.break_running:
+            mode = "☕ BREAK "
+        else:
+            mode = "■ FROZEN"
+        today = self.daily_stats.get_today_stats()
+        return (f"{mode} {core.get_main_time_text()} | break {core.get_break_time_text()} | "
+                f"session {core.current_session}/{core.target_sessions} "
+                f"{core.get_session_progress():.0f}% | today {today.formatted_study_time}")
+
+    def _print_status(self, force: bool = False):
+        """Cập nhật dòng trạng thái (tty: ghi đè tại chỗ, còn lại: định kỳ)"""
+        if self.interactive:
+            self.output.write("\r" + self.status_line() + "\033[K")
+            self.output.flush()
+            self._status_visible = True
+            return
+
+        now = time.monotonic()
+        if force or now - self.last_status_log >= STATUS_LOG_INTERVAL:
+            self.last_status_log = now
+            self.say(self.status_line())
+
+    # ----- Core callbacks -----
+
+    def _on_state_change(self, state):
+        """Log khi trạng thái đồng hồ đổi"""
+        self._print_status(force=True)
+
+    def _handle_session_complete(self):
+        """Xử lý khi hoàn thành một session"""
+        self.daily_stats.increment_sessions_completed()
+        self.say(f"🎯 Session {self.timer_core.current_session} complete")
+
+    def _handle_all_sessions_complete(self):
+        """Xử lý khi hoàn thành tất cả sessions"""
+        self.say(f"🏆 All {self.timer_core.target_sessions} sessions complete!")
+
+    def _handle_choice_required(self):
+        """Hỏi user tiếp tục hay nghỉ"""
+        self.say("Session finished - type 'c' to continue or 'b' to take a break")
+
+    def _on_task_completed(self, task):
+        """Cộng task hoàn thành vào daily stats"""
+        self.daily_stats.increment_tasks_completed()
+        self.say(f"✅ Completed: {task['text']}")
+
+    # ----- Commands -----
+
+    def _cmd_start(self, arg: str):
+        self.timer_core.start_main_timer()
+
+    def _cmd_toggle(self, arg: str):
+        if self.timer_core.is_waiting_for_choice():
+            self.timer_core.choose_continue_session()
+        elif self.timer_core.is_main_running():
+            self.timer_core.pause_main_start_break()
+        elif self.timer_core.is_break_running():
+            self.timer_core.pause_break_start_main()
+        else:
+            self.timer_core.start_main_timer()
+
+    def _cmd_pause(self, arg: str):
+        self.timer_core.freeze_all()
+
+    def _cmd_reset(self, arg: str):
+        self.timer_core.update()
+        self._update_daily_stats()
+        self.timer_core.reset_timers()
+        self.last_main_time = 0
+        self.last_break_time = 0
+
+    def _cmd_continue(self, arg: str):
+        if self.timer_core.is_waiting_for_choice():
+            self.timer_core.choose_continue_session()
+
+    def _cmd_break(self, arg: str):
+        if self.timer_core.is_waiting_for_choice():
+            self.timer_core.choose_take_break()
+
+    def _cmd_add(self, arg: str):
+        if not arg:
+            self.say("Usage: add <task text>")
+            return
+        task = self.task_manager.add_task(arg, self.timer_core.current_session + 1)
+        self.say(f"📋 Added task #{self.task_manager.get_tasks_summary()['remaining']}: {task['text']}")
+
+    def _cmd_done(self, arg: str):
+        try:
+            task = self.task_manager.get_active_task_at(int(arg) - 1)
+        except ValueError:
+            task = None
+        if task is None:
+            remaining = self.task_manager.get_tasks_summary()['remaining']
+            self.say(f"Usage: done <1-{remaining}>" if remaining else "No active tasks")
+            return
+        self.task_manager.complete_task(task['id'])
+
+    def _cmd_tasks(self, arg: str):
+        tasks = self.task_manager.get_all_active_tasks()
+        if not tasks:
+            self.say("No active tasks")
+            return
+        lines = [f"{index:>3}. {task['text']}" for index, task in enumerate(tasks, 1)]
+        summary = self.task_manager.get_tasks_summary()
+        lines.append(f"Tasks: {summary['total']} total, {summary['completed']} completed "
+                     f"({summary['completion_rate']:.1f}%)")
+        self.say("\n".join(lines))
+
+    def _cmd_stats(self, arg: str):
+        today = self.daily_stats.get_today_stats()
+        self.say(f"📊 {today.display_date}: study {today.formatted_study_time}, "
+                 f"break {today.formatted_break_time}, sessions {today['sessions_completed']}, "
+                 f"tasks {today['tasks_completed']}")
+
+    def _cmd_help(self, arg: str):
+        self.say(HELP_TEXT)
+
+    def _cmd_quit(self, arg: str):
+        self.running = False
+
+    def handle_command(self, line: str):
+        """Thực thi một dòng lệnh"""
+        name, _, arg = line.strip().partition(" ")
+        if not name:
+            return
+        handler = self._handlers.get(name.lower())
+        if handler is None:
+            self.say(f"Unknown command '{name}' - type 'h' for help")
+            return
+        handler(arg.strip())
+        self._print_status(force=True)
+
+    # ----- Loop -----
+
+    def stop(self):
+        """Dừng vòng lặp (gọi được từ thread khác): đánh thức lượt chờ lệnh đang block"""
+        self.running = False
+        self._commands.put(_WAKE)
+
+    def _on_sigterm(self, signum, frame):
+        """
+        SIGTERM: gọi stop() từ một thread phụ - handler chạy trên main thread, có thể đúng lúc
+        main thread đang giữ lock của queue trong get(), nên không put trực tiếp tại đây.
+        """
+        threading.Thread(target=self.stop, name="headless-stop", daemon=True).start()
+
+    def _read_commands(self, stream: TextIO):
+        """Thread đọc stdin, đẩy từng dòng vào queue (None = hết input)"""
+        try:
+            for line in stream:
+                self._commands.put(line)
+        except (OSError, ValueError):
+            pass
+        self._commands.put(None)
+
+    def _update(self):
+        """Một bước cập nhật: áp dụng thời gian đã trôi, ghi stats, auto-save"""
+        elapsed = self.timer_core.update()
+        self._update_daily_stats()
+
+        self.auto_save_counter += elapsed
+        if self.auto_save_counter >= AUTO_SAVE_INTERVAL:
+            self._auto_save_state()
+            self.auto_save_counter = 0
+
+        if elapsed:
+            self._print_status()
+
+    def _update_daily_stats(self):
+        """Cập nhật daily stats"""
+        current_main_time = self.timer_core.main_time
+        current_break_time = self.timer_core.break_time
+
+        # Không xét cờ running: đoạn vừa bù có thể kết thúc bằng mốc session đã freeze đồng hồ
+        if current_main_time > self.last_main_time:
+            self.daily_stats.update_study_time(current_main_time - self.last_main_time)
+        if current_break_time > self.last_break_time:
+            self.daily_stats.update_break_time(current_break_time - self.last_break_time)
+
+        self.last_main_time = current_main_time
+        self.last_break_time = current_break_time
+
+    def _auto_save_state(self):
+        """Auto-save timer state khi đang chạy"""
+        try:
+            if (self.timer_core.main_running or self.timer_core.break_running) and \
+               (self.timer_core.main_time > 0 or self.timer_core.break_time > 0):
+                self.timer_state_manager.save_timer_state(self.timer_core)
+        except Exception as e:
+            self.say(f"Error during auto-save: {e}")
+
+    def run(self, commands: Optional[TextIO] = sys.stdin):
+        """Chạy vòng lặp tới khi nhận 'quit', SIGINT/SIGTERM"""
+        self.running = True
+        if commands is not None:
+            threading.Thread(target=self._read_commands, args=(commands,),
+                             name="headless-stdin", daemon=True).start()
+
+        if hasattr(signal, "SIGTERM") and threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, self._on_sigterm)
+
+        self._print_status(force=True)
+        try:
+            while self.running:
+                # Ngủ tới giây nguyên tiếp theo của timer, hoặc tới khi có lệnh / stop().
+                # Khi không đồng hồ nào chạy chỉ có lệnh hoặc stop() mới thay đổi được gì - chờ, không thức dậy
+                # (kể cả khi đã hết stdin: queue vẫn nhận _WAKE từ stop()/SIGTERM)
+                idle = not (self.timer_core.is_main_running() or self.timer_core.is_break_running())
+                timeout = None if idle else self.timer_core.get_next_tick_delay() / 1000
+                try:
+                    line = self._commands.get(timeout=timeout)
+                except queue.Empty:
+                    line = _WAKE
+                # None = hết stdin (vd chạy nền) - tiếp tục chạy, không nhận lệnh nữa
+                if line is not None and line is not _WAKE and self.running:
+                    self.handle_command(line)
+                self._update()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        """Lưu trạng thái, compact journals và đợi mọi thao tác ghi xong"""
+        self.running = False
+        try:
+            if self.timer_core.main_time > 0 or self.timer_core.break_time > 0:
+                self.timer_state_manager.save_timer_state(self.timer_core)
+        except Exception as e:
+            self.say(f"Error saving timer state: {e}")
+        self.daily_stats.close()
+        self.task_manager.close()
+        self.persistence.flush()
+        self.say("👋 Saved - bye")
+
+
+def run_headless(argv: Optional[List[str]] = None) -> int:
+    """Entry point cho ``python main.py --headless``"""
+    parser = argparse.ArgumentParser(prog="main.py --headless", description="Study Timer without a GUI")
+    parser.add_argument("--headless", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--minutes", type=float, help="session duration in minutes")
+    parser.add_argument("--sessions", type=int, help="target number of sessions")
+    parser.add_argument("--auto-continue", action=argparse.BooleanOptionalAction, default=None,
+                        help="start the next session automatically")
+    parser.add_argument("--start", action="store_true", help="start the study clock immediately")
+    parser.add_argument("--fresh", action="store_true", help="ignore today's saved timer state")
+    args, _ = parser.parse_known_args(argv)
+
+    runner = HeadlessRunner(restore=not args.fresh)
+    if args.minutes:
+        runner.timer_core.set_session_duration(max(1, int(args.minutes * 60)))
+    if args.sessions:
+        runner.timer_core.set_target_sessions(args.sessions)
+    if args.auto_continue is not None:
+        runner.timer_core.set_auto_continue(args.auto_continue)
+    runner.say("Study Timer (headless) - type 'h' for help")
+    if args.start:
+        runner.timer_core.start_main_timer()
+    runner.run()
+    return 0
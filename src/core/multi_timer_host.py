@@ -0,0 +1,320 @@
+"""
+Multi Timer Host - Nhiều TimerCore (mỗi profile một cái) chạy trên một scheduler dùng heap
+"""
+
+import heapq
+import itertools
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .timer_core import TimerCore
+from ..managers.daily_stats_manager import DailyStatsManager
+from ..managers.timer_state_manager import TimerStateManager
+from ..managers.persistence_worker import get_persistence_worker
+
+# Chu kỳ ghi checkpoint (stats + timer state) của các profile đang chạy (giây)
+CHECKPOINT_INTERVAL = 60
+
+# Thức dậy trễ một chút sau mốc để update() chắc chắn thấy giây đã trôi qua
+_WAKE_SLACK = 0.002
+
+
+class TimerProfile:
+    """Một timer của host: TimerCore cùng stats/state riêng trong data/profiles/<id>/"""
+
+    def __init__(self, profile_id: str, data_folder: str):
+        self.profile_id = profile_id
+        self.data_folder = data_folder
+        self.core = TimerCore()
+        self.daily_stats = DailyStatsManager(data_folder)
+        self.timer_state_manager = TimerStateManager(data_folder)
+        self.last_main_time = 0
+        self.last_break_time = 0
+        self.version = 0  # Tăng mỗi lần lập lịch lại - entry cũ trong heap bị bỏ qua
+
+    def record_stats(self):
+        """
+        Ghi phần thời gian chạy kể từ lần ghi trước vào daily stats (một record cho cả đoạn).
+        Không xét cờ running: đoạn vừa áp dụng có thể kết thúc bằng một mốc session đã freeze đồng hồ.
+        """
+        core = self.core
+        if core.main_time > self.last_main_time:
+            self.daily_stats.update_study_time(core.main_time - self.last_main_time)
+        if core.break_time > self.last_break_time:
+            self.daily_stats.update_break_time(core.break_time - self.last_break_time)
+        self.last_main_time = core.main_time
+        self.last_break_time = core.break_time
+
+    def is_running(self) -> bool:
+        return self.core.main_running or self.core.break_running
+
+
+class MultiTimerHost:
+    """
+    Hosts many TimerCore instances keyed by profile id on one scheduler.
+
+    TimerCore derives elapsed time from a monotonic anchor, so a timer does
+    not need a callback per second: it is only advanced when something can
+    happen - its next session boundary (kept in a heap, stale entries are
+    skipped lazily), a control call, a state query, or the shared checkpoint
+    that records stats and saves timer state every ``CHECKPOINT_INTERVAL``
+    seconds. Idle and break-only timers cost nothing between events, so CPU
+    grows with events rather than with instances x seconds.
+
+    Each profile keeps its own stats and timer state under
+    ``<data_folder>/<profile>/``; all of them write through the shared
+    persistence worker, which batches the snapshot files. ``on_event`` is
+    called as ``on_event(profile_id, event)`` for "session_complete",
+    "choice_required" and "all_sessions_complete".
+
+    The host is thread-safe: ``run_forever`` can run on a worker thread
+    while other threads call the control methods. Every access to a
+    profile's stats happens under the host's lock, so the SQLite stats
+    backend (whose connection is not bound to the creating thread) works
+    the same as the JSON one.
+    """
+
+    def __init__(self, data_folder: str = os.path.join("data", "profiles"),
+                 checkpoint_interval: float = CHECKPOINT_INTERVAL):
+        self.data_folder = data_folder
+        self.checkpoint_interval = checkpoint_interval
+        self.profiles: Dict[str, TimerProfile] = {}
+        self.persistence = get_persistence_worker()
+        self.on_event: Optional[Callable[[str, str], None]] = None
+
+        self._heap: List[Tuple[float, int, str, int]] = []  # (due, seq, profile_id, version)
+        self._counter = itertools.count()
+        self._next_checkpoint = time.monotonic() + checkpoint_interval
+        self._cond = threading.Condition(threading.RLock())
+        self._running = False
+
+    # ----- Profiles -----
+
+    def add_profile(self, profile_id: str, session_duration: Optional[int] = None,
+                    target_sessions: Optional[int] = None, auto_continue: Optional[bool] = None,
+                    restore: bool = True) -> TimerCore:
+        """Thêm (hoặc lấy lại) một profile, khôi phục trạng thái đã lưu hôm nay nếu có"""
+        with self._cond:
+            profile = self.profiles.get(profile_id)
+            if profile is None:
+                folder_name = re.sub(r"[^\w.-]", "_", profile_id)
+                profile = TimerProfile(profile_id, os.path.join(self.data_folder, folder_name))
+                self._wire(profile)
+                if restore:
+                    self._restore(profile)
+                self.profiles[profile_id] = profile
+
+            core = profile.core
+            if session_duration is not None:
+                core.set_session_duration(session_duration)
+            if target_sessions is not None:
+                core.set_target_sessions(target_sessions)
+            if auto_continue is not None:
+                core.set_auto_continue(auto_continue)
+            self._schedule(profile)
+            return core
+
+    def remove_profile(self, profile_id: str):
+        """Lưu và đóng một profile"""
+        with self._cond:
+            profile = self.profiles.pop(profile_id, None)
+            if profile is not None:
+                profile.version += 1  # Vô hiệu các entry còn trong heap
+                self._close_profile(profile)
+
+    def _wire(self, profile: TimerProfile):
+        """Nối callbacks của TimerCore với stats và on_event"""
+        profile_id = profile.profile_id
+
+        def session_complete():
+            profile.daily_stats.increment_sessions_completed()
+            self._emit(profile_id, "session_complete")
+
+        profile.core.on_session_complete = session_complete
+        profile.core.on_choice_required = lambda: self._emit(profile_id, "choice_required")
+        profile.core.on_all_sessions_complete = lambda: self._emit(profile_id, "all_sessions_complete")
+
+    def _restore(self, profile: TimerProfile):
+        """Khôi phục timer state của hôm nay (thời gian đã lưu không được tính lại vào stats)"""
+        manager = profile.timer_state_manager
+        try:
+            if manager.has_saved_state_today():
+                state_data = manager.load_timer_state()
+                if state_data and manager.restore_timer_state(profile.core, state_data):
+                    profile.last_main_time = profile.core.main_time
+                    profile.last_break_time = profile.core.break_time
+                    profile.core.reset_clock()
+        except Exception as e:
+            print(f"Error restoring timer state for {profile.profile_id}: {e}")
+
+    def _emit(self, profile_id: str, event: str):
+        if self.on_event:
+            try:
+                self.on_event(profile_id, event)
+            except Exception as e:
+                print(f"Error in timer host event handler ({profile_id}, {event}): {e}")
+
+    # ----- Control -----
+
+    def _control(self, profile_id: str, action: Callable[[TimerCore], Any]) -> Any:
+        """Đồng bộ profile tới hiện tại, thực hiện thao tác rồi lập lịch lại"""
+        with self._cond:
+            profile = self.profiles[profile_id]
+            self._sync(profile)
+            profile.record_stats()  # Trước thao tác - reset sẽ đưa đồng hồ về 0
+            result = action(profile.core)
+            profile.record_stats()
+            self._schedule(profile)
+            return result
+
+    def start(self, profile_id: str):
+        self._control(profile_id, lambda core: core.start_main_timer())
+
+    def toggle(self, profile_id: str):
+        """Chuyển main <-> break (giống nút toggle của UI)"""
+        def toggle(core: TimerCore):
+            if core.is_waiting_for_choice():
+                core.choose_continue_session()
+            elif core.is_main_running():
+                core.pause_main_start_break()
+            elif core.is_break_running():
+                core.pause_break_start_main()
+            else:
+                core.start_main_timer()
+        self._control(profile_id, toggle)
+
+    def pause(self, profile_id: str):
+        self._control(profile_id, lambda core: core.freeze_all())
+
+    def reset(self, profile_id: str):
+        self._control(profile_id, lambda core: core.reset_timers())
+
+    def continue_session(self, profile_id: str):
+        self._control(profile_id, lambda core: core.choose_continue_session())
+
+    def take_break(self, profile_id: str):
+        self._control(profile_id, lambda core: core.choose_take_break())
+
+    def get_state(self, profile_id: str) -> Dict[str, Any]:
+        """Trạng thái hiện tại của một profile (đồng bộ tới thời điểm gọi)"""
+        return self._control(profile_id, lambda core: core.get_state())
+
+    def get_all_states(self) -> Dict[str, Dict[str, Any]]:
+        """Trạng thái của mọi profile"""
+        with self._cond:
+            return {profile_id: self.get_state(profile_id) for profile_id in list(self.profiles)}
+
+    # ----- Scheduler -----
+
+    def _sync(self, profile: TimerProfile):
+        """Áp dụng thời gian đã trôi cho một timer (bắn các sự kiện mốc session nếu có)"""
+        profile.core.update()
+
+    def _schedule(self, profile: TimerProfile):
+        """Đặt entry heap cho mốc session tiếp theo của profile (entry cũ trở thành stale)"""
+        profile.version += 1
+        due = profile.core.get_next_boundary_time()
+        if due is not None:
+            heapq.heappush(self._heap, (due + _WAKE_SLACK, next(self._counter), profile.profile_id, profile.version))
+            self._cond.notify_all()
+
+    def next_wakeup(self) -> float:
+        """Thời điểm monotonic cần chạy run_pending tiếp theo"""
+        with self._cond:
+            self._drop_stale()
+            if self._heap:
+                return min(self._heap[0][0], self._next_checkpoint)
+            return self._next_checkpoint
+
+    def _drop_stale(self):
+        while self._heap:
+            _, _, profile_id, version = self._heap[0]
+            profile = self.profiles.get(profile_id)
+            if profile is not None and profile.version == version:
+                return
+            heapq.heappop(self._heap)
+
+    def run_pending(self, now: Optional[float] = None) -> int:
+        """Xử lý mọi sự kiện đã tới hạn, trả về số timer đã được đánh thức"""
+        if now is None:
+            now = time.monotonic()
+        woken = 0
+        with self._cond:
+            while self._heap and self._heap[0][0] <= now:
+                _, _, profile_id, version = heapq.heappop(self._heap)
+                profile = self.profiles.get(profile_id)
+                if profile is None or profile.version != version:
+                    continue  # Entry stale
+                self._sync(profile)
+                profile.record_stats()
+                self._schedule(profile)
+                woken += 1
+
+            if now >= self._next_checkpoint:
+                self.checkpoint()
+                self._next_checkpoint = now + self.checkpoint_interval
+        return woken
+
+    def checkpoint(self):
+        """Ghi stats và timer state của các profile đang chạy (một lượt cho cả host)"""
+        with self._cond:
+            for profile in self.profiles.values():
+                if not profile.is_running():
+                    continue
+                self._sync(profile)
+                profile.record_stats()
+                self._schedule(profile)
+                try:
+                    profile.timer_state_manager.save_timer_state(profile.core)
+                except Exception as e:
+                    print(f"Error saving timer state for {profile.profile_id}: {e}")
+
+    def run_forever(self):
+        """Vòng lặp scheduler: ngủ tới sự kiện gần nhất (hoặc tới khi có thao tác mới)"""
+        with self._cond:
+            self._running = True
+            while self._running:
+                timeout = self.next_wakeup() - time.monotonic()
+                if timeout > 0:
+                    self._cond.wait(timeout)
+                    continue
+                self.run_pending()
+
+    def stop(self):
+        """Dừng run_forever (gọi được từ thread khác)"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+
+    # ----- Shutdown -----
+
+    def _close_profile(self, profile: TimerProfile):
+        self._sync(profile)
+        profile.record_stats()
+        try:
+            core = profile.core
+            if core.main_time > 0 or core.break_time > 0:
+                profile.timer_state_manager.save_timer_state(core)
+        except Exception as e:
+            print(f"Error saving timer state for {profile.profile_id}: {e}")
+        profile.daily_stats.close()
+
+    def close(self):
+        """Lưu mọi profile, compact journals và đợi ghi xong"""
+        self.stop()
+        with self._cond:
+            # Compact tất cả trước rồi flush một lần, để close() từng profile không phải chờ riêng
+            for profile in self.profiles.values():
+                profile.version += 1
+                self._sync(profile)
+                profile.record_stats()
+                profile.daily_stats.save_stats()
+            self.persistence.flush()
+            for profile in self.profiles.values():
+                self._close_profile(profile)
+            self.profiles.clear()
+            self._heap.clear()
+        self.persistence.flush()
@@ -2,6 +2,7 @@
 Timer Controller Module - Điều phối giữa UI và Timer Core
 """
 
+import threading
 import tkinter as tk
 import tkinter.messagebox as messagebox
 from datetime import datetime
@@ -9,11 +10,15 @@ from typing import Optional
 
 from .timer_core import TimerCore
 from ..ui.ui_components import StudyTimerUI
-from ..ui.daily_stats_window import DailyStatsWindow
-from ..managers.sound_manager import SoundManager
+from ..ui.daily_stats_window import DailyStatsWindow, load_matplotlib
+from ..managers.sound_manager import SoundManager, load_pygame
 from ..managers.task_manager import TaskManager
 from ..managers.daily_stats_manager import DailyStatsManager
 from ..managers.timer_state_manager import TimerStateManager
+from ..managers.persistence_worker import get_persistence_worker
+
+# Sau khi cửa sổ hiện lên mới import trước pygame/matplotlib ở background (0 = tắt)
+PREWARM_DELAY_MS = 2000
 
 
 class TimerController:
@@ -29,6 +34,7 @@ class TimerController:
         self.task_manager = TaskManager()
         self.daily_stats = DailyStatsManager()
         self.timer_state_manager = TimerStateManager()
+        self.persistence = get_persistence_worker()
         
         # Tracking variables for stats updates
         self.last_main_time = 0
@@ -37,6 +43,9 @@ class TimerController:
         # Auto-save counter (save every 30 seconds)
         self.auto_save_counter = 0
         
+        # ID của lần chạy _update_loop đã hẹn (None = loop đang tạm dừng vì không đồng hồ nào chạy)
+        self._update_job = None
+        
         # Daily stats window
         self.daily_stats_window = DailyStatsWindow(root, self.daily_stats)
         
@@ -54,6 +63,19 @@ class TimerController:
         
         # Bắt đầu update loop
         self._update_loop()
+        
+        # Import trước các thư viện nặng khi app đã rảnh
+        if PREWARM_DELAY_MS > 0:
+            self.root.after(PREWARM_DELAY_MS, self._prewarm_optional_imports)
+
+    def _prewarm_optional_imports(self):
+        """Import pygame/matplotlib trong thread nền để lần dùng đầu không bị khựng"""
+        def prewarm():
+            # Chỉ import module, mọi thao tác Tk/mixer vẫn ở main thread
+            load_pygame()
+            load_matplotlib()
+        
+        threading.Thread(target=prewarm, name="prewarm-imports", daemon=True).start()
 
     def _setup_callbacks(self):
         """Thiết lập callbacks giữa UI và Core"""
@@ -94,7 +116,7 @@ class TimerController:
         # Core callbacks - Updated for dual clock system
         self.timer_core.on_main_timer_update = self.ui.update_main_timer_display
         self.timer_core.on_break_timer_update = self.ui.update_break_timer_display
-        self.timer_core.on_state_change = self.ui.update_button_state
+        self.timer_core.on_state_change = self._handle_state_change
         self.timer_core.on_session_update = self._update_session_display
         self.timer_core.on_session_complete = self._handle_session_complete
         self.timer_core.on_all_sessions_complete = self._handle_all_sessions_complete
@@ -103,7 +125,8 @@ class TimerController:
         # Task manager callbacks
         self.task_manager.on_task_added = self._on_task_added
         self.task_manager.on_task_completed = self._on_task_completed
-        self.task_manager.on_tasks_updated = self._refresh_task_display
+        self.task_manager.on_tasks_updated = self._refresh_task_summary
+        self.task_manager.on_task_list_changed = self._on_task_list_changed
 
     def _handle_start(self):
         """Xử lý sự kiện Start - Bắt đầu main timer"""
@@ -130,6 +153,9 @@ class TimerController:
 
     def _handle_reset(self):
         """Xử lý sự kiện Reset - Reset cả hai timer"""
+        # Ghi phần thời gian chưa vào stats trước khi đồng hồ về 0
+        self.timer_core.update()
+        self._update_daily_stats()
         self.timer_core.reset_timers()
         # Dừng background music khi reset
         self.sound_manager.stop_background_music()
@@ -164,13 +190,17 @@ class TimerController:
     def _handle_add_task(self, task_text):
         """Xử lý sự kiện thêm task"""
         current_session = self.timer_core.current_session + 1  # Next session
-        self.task_manager.add_task(task_text, current_session)
+        # Dán cả checklist nhiều dòng -> thêm một lần (một lần ghi, một lần refresh)
+        lines = [line.strip() for line in task_text.splitlines() if line.strip()]
+        if len(lines) > 1:
+            self.task_manager.add_tasks(lines, current_session)
+        else:
+            self.task_manager.add_task(task_text, current_session)
 
     def _handle_complete_task(self, task_index):
         """Xử lý sự kiện hoàn thành task"""
-        tasks = self.task_manager.get_all_active_tasks()
-        if 0 <= task_index < len(tasks):
-            task = tasks[task_index]
+        task = self.task_manager.get_active_task_at(task_index)
+        if task is not None:
             self.task_manager.complete_task(task['id'])
             # Update daily stats - increment tasks completed
             self.daily_stats.increment_tasks_completed()
@@ -178,23 +208,20 @@ class TimerController:
 
     def _handle_delete_task(self, task_index):
         """Xử lý sự kiện xóa task"""
-        tasks = self.task_manager.get_all_active_tasks()
-        if 0 <= task_index < len(tasks):
-            task = tasks[task_index]
+        task = self.task_manager.get_active_task_at(task_index)
+        if task is not None:
             self.task_manager.delete_task(task['id'])
 
     def _handle_edit_task(self, task_index, new_text):
         """Xử lý sự kiện chỉnh sửa task"""
-        tasks = self.task_manager.get_all_active_tasks()
-        if 0 <= task_index < len(tasks):
-            task = tasks[task_index]
+        task = self.task_manager.get_active_task_at(task_index)
+        if task is not None:
             self.task_manager.edit_task(task['id'], new_text)
 
     def _handle_reactivate_task(self, task_index):
         """Xử lý sự kiện reactivate completed task"""
-        completed_tasks = self.task_manager.get_completed_tasks()
-        if 0 <= task_index < len(completed_tasks):
-            task = completed_tasks[task_index]
+        task = self.task_manager.get_completed_task_at(task_index)
+        if task is not None:
             self.task_manager.reactivate_task(task['id'])
             self.sound_manager.play_secondary_button_sound()
 
@@ -330,9 +357,37 @@ class TimerController:
         self.ui.update_completed_task_list(completed_tasks)
         self.ui.update_task_summary(summary)
 
+    def _refresh_task_summary(self):
+        """Chỉ cập nhật dòng tóm tắt - các danh sách được cập nhật từng dòng qua _on_task_list_changed"""
+        self.ui.update_task_summary(self.task_manager.get_tasks_summary())
+
+    def _on_task_list_changed(self, list_name, change, index, task):
+        """Áp dụng thay đổi một dòng vào danh sách tương ứng ("reset" = vẽ lại cả danh sách)"""
+        if change != "reset":
+            self.ui.apply_task_list_change(list_name, change, index, task)
+        elif list_name == "active":
+            self.ui.update_task_list(self.task_manager.get_all_active_tasks())
+        else:
+            self.ui.update_completed_task_list(self.task_manager.get_completed_tasks())
+
+    def _handle_state_change(self, state):
+        """Cập nhật nút theo trạng thái và đánh thức update loop nếu nó đang tạm dừng"""
+        self.ui.update_button_state(state)
+        self._wake_update_loop()
+
+    def _wake_update_loop(self):
+        """Hẹn một lượt _update_loop nếu chưa có (lượt đó cập nhật progress/stats rồi tự quyết định chạy tiếp)"""
+        if self._update_job is None:
+            self._update_job = self.root.after_idle(self._update_loop)
+
     def _update_loop(self):
-        """Vòng lặp cập nhật timer mỗi giây"""
-        self.timer_core.tick()
+        """
+        Vòng lặp cập nhật timer - bù các giây bị trễ và hẹn lần chạy tiếp theo đúng giây nguyên.
+        Khi cả hai đồng hồ đều dừng (freeze, chờ chọn continue/break) loop tạm dừng hẳn và
+        chỉ được đánh thức lại bởi on_state_change.
+        """
+        self._update_job = None
+        elapsed = self.timer_core.update()
         
         # Cập nhật progress bar
         progress = self.timer_core.get_session_progress()
@@ -342,26 +397,27 @@ class TimerController:
         self._update_daily_stats()
         
         # Auto-save state every 30 seconds
-        self.auto_save_counter += 1
+        self.auto_save_counter += elapsed
         if self.auto_save_counter >= 30:
             self._auto_save_state()
             self.auto_save_counter = 0
         
-        # Lặp lại sau 1 giây
-        self.root.after(1000, self._update_loop)
+        # Lặp lại vào giây nguyên tiếp theo - chỉ khi còn đồng hồ đang chạy
+        if self._update_job is None and (self.timer_core.is_main_running() or self.timer_core.is_break_running()):
+            self._update_job = self.root.after(self.timer_core.get_next_tick_delay(), self._update_loop)
 
     def _update_daily_stats(self):
         """Cập nhật daily stats"""
         current_main_time = self.timer_core.main_time
         current_break_time = self.timer_core.break_time
         
-        # Update study time if main timer was running
-        if self.timer_core.is_main_running() and current_main_time > self.last_main_time:
+        # Không xét cờ running: đoạn vừa bù có thể kết thúc bằng mốc session (freeze_all),
+        # hoặc đã được _sync_clock áp dụng ngay trước khi đổi trạng thái
+        if current_main_time > self.last_main_time:
             study_increment = current_main_time - self.last_main_time
             self.daily_stats.update_study_time(study_increment)
         
-        # Update break time if break timer was running
-        if self.timer_core.is_break_running() and current_break_time > self.last_break_time:
+        if current_break_time > self.last_break_time:
             break_increment = current_break_time - self.last_break_time
             self.daily_stats.update_break_time(break_increment)
         
@@ -403,8 +459,7 @@ class TimerController:
             filename = f"tasks_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
         
         try:
-            import shutil
-            shutil.copy(self.task_manager.data_file, filename)
+            self.task_manager.export_tasks(filename)
             return filename
         except Exception as e:
             print(f"❌ Could not export tasks: {e}")
@@ -413,9 +468,7 @@ class TimerController:
     def import_tasks(self, filename):
         """Import tasks từ file"""
         try:
-            import shutil
-            shutil.copy(filename, self.task_manager.data_file)
-            self.task_manager.load_tasks()
+            self.task_manager.import_tasks(filename)
             self._refresh_task_display()
             return True
         except Exception as e:
@@ -508,6 +561,9 @@ class TimerController:
             # to prevent the _update_daily_stats() method from counting all the restored time as new time
             self.last_main_time = self.timer_core.main_time
             self.last_break_time = self.timer_core.break_time
+            
+            # Restored clocks start counting from now, not from the old monotonic anchor
+            self.timer_core.reset_clock()
             print(f"🔧 Fixed timer tracking: last_main_time={self.last_main_time}, last_break_time={self.last_break_time}")
             
         except Exception as e:
@@ -525,6 +581,13 @@ class TimerController:
             except Exception as e:
                 print(f"Error saving timer state: {e}")
             
+            # Compact the stats and task journals into their snapshot files
+            self.daily_stats.close()
+            self.task_manager.close()
+            
+            # Wait for every queued background write to reach disk
+            self.persistence.flush()
+            
             # Close the application
             self.root.destroy()
         
@@ -3,6 +3,8 @@ Timer Core Module - Dual Clock System (Main + Break)
 Handles the core timing logic with session management and unlimited sessions support.
 """
 
+import math
+import time
 from typing import Optional, Callable
 
 
@@ -12,6 +14,10 @@ class TimerCore:
     
     Manages the main timing functionality including session tracking,
     dual clock system (main/break), and unlimited session support.
+    
+    Elapsed time is derived from a ``time.monotonic()`` anchor rather than
+    from the number of scheduler callbacks, so a late wakeup is caught up in
+    one batched step instead of being lost.
     """
     
     def __init__(self):
@@ -35,6 +41,11 @@ class TimerCore:
         self.all_sessions_completed = False
         self.waiting_for_user_choice = False
         
+        # Monotonic clock engine
+        self._clock_origin = time.monotonic()  # Mốc thời gian monotonic
+        self._elapsed_applied = 0  # Số giây nguyên đã áp dụng kể từ mốc
+        self._advancing = False  # Đang trong một bước advance (tránh sync lồng nhau)
+        
         # UI callback functions
         self.on_main_timer_update: Optional[Callable] = None
         self.on_break_timer_update: Optional[Callable] = None
@@ -53,6 +64,7 @@ class TimerCore:
 
     def start_main_timer(self):
         """Bắt đầu main timer, freeze break timer và reset hidden timer"""
+        self._sync_clock()
         self.main_running = True
         self.break_running = False
         self.break_session_time = 0  # Reset hidden timer về 0
@@ -62,6 +74,7 @@ class TimerCore:
 
     def start_break_timer(self):
         """Bắt đầu break timer, freeze main timer và reset hidden timer"""
+        self._sync_clock()
         self.main_running = False
         self.break_running = True
         self.break_session_time = 0  # Reset hidden timer về 0
@@ -71,6 +84,7 @@ class TimerCore:
 
     def pause_main_start_break(self):
         """Pause main timer và start break timer"""
+        self._sync_clock()
         self.main_running = False
         self.break_running = True
         self.break_session_time = 0  # Reset hidden timer về 0
@@ -79,6 +93,7 @@ class TimerCore:
 
     def pause_break_start_main(self):
         """Pause break timer và resume main timer"""
+        self._sync_clock()
         self.break_running = False
         self.main_running = True
         if self.on_state_change:
@@ -86,6 +101,7 @@ class TimerCore:
 
     def freeze_all(self):
         """Freeze cả hai đồng hồ"""
+        self._sync_clock()
         self.main_running = False
         self.break_running = False
         if self.on_state_change:
@@ -93,6 +109,7 @@ class TimerCore:
 
     def reset_timers(self):
         """Reset cả hai timer về 0"""
+        self._sync_clock()
         self.main_running = False
         self.break_running = False
         self.main_time = 0
@@ -107,26 +124,94 @@ class TimerCore:
             self.on_state_change("reset")
 
     def tick(self):
-        """Update timers mỗi giây"""
-        # Update main timer
-        if self.main_running:
-            self.main_time += 1
-            if self.on_main_timer_update:
-                self.on_main_timer_update(self.format_time(self.main_time))
-            
-            # Check session completion - khi đạt session_duration
-            session_boundary = ((self.current_session + 1) * self.session_duration)
-            
-            if self.main_time >= session_boundary and self.main_time > self.last_session_check:
-                self.last_session_check = self.main_time
-                self._handle_session_complete()
+        """Update timers đúng 1 giây (không phụ thuộc đồng hồ thực)"""
+        self._advance(1)
+
+    def update(self, now: Optional[float] = None) -> int:
+        """
+        Advance both clocks by the whole seconds elapsed since the monotonic anchor.
+        
+        Returns the number of seconds that were due (0 if called early).
+        """
+        if now is None:
+            now = time.monotonic()
+        
+        due = int(now - self._clock_origin) - self._elapsed_applied
+        if due <= 0:
+            return 0
         
-        # Update break timer
-        if self.break_running:
-            self.break_time += 1
-            self.break_session_time += 1  # Tăng hidden timer
-            if self.on_break_timer_update:
-                self.on_break_timer_update(self.format_time(self.break_time), self.break_session_time)
+        self._elapsed_applied += due
+        self._advance(due)
+        return due
+
+    def get_next_tick_delay(self, now: Optional[float] = None) -> int:
+        """Số mili giây tới giây nguyên tiếp theo tính từ mốc monotonic"""
+        if now is None:
+            now = time.monotonic()
+        
+        next_tick = self._clock_origin + self._elapsed_applied + 1
+        return max(1, math.ceil((next_tick - now) * 1000))
+
+    def get_next_boundary_time(self) -> Optional[float]:
+        """
+        Thời điểm monotonic main clock chạm mốc session tiếp theo
+        (None nếu main clock không chạy - break clock không có mốc).
+        """
+        if not self.main_running or self.session_duration <= 0:
+            return None
+        
+        session_boundary = (self.current_session + 1) * self.session_duration
+        seconds_left = max(1, session_boundary - self.main_time)
+        return self._clock_origin + self._elapsed_applied + seconds_left
+
+    def reset_clock(self, now: Optional[float] = None):
+        """Đặt lại mốc monotonic (khi bắt đầu chạy từ trạng thái freeze hoặc sau khi restore)"""
+        self._clock_origin = time.monotonic() if now is None else now
+        self._elapsed_applied = 0
+
+    def _sync_clock(self):
+        """Áp dụng thời gian còn chờ theo trạng thái cũ trước khi chuyển trạng thái"""
+        if self._advancing:
+            return
+        
+        if self.main_running or self.break_running:
+            self.update()
+        else:
+            # Không đồng hồ nào chạy - thời gian đóng băng không được tính
+            self.reset_clock()
+
+    def _advance(self, seconds: int):
+        """Cộng dồn nhiều giây trong một bước, dừng đúng tại mỗi mốc session"""
+        self._advancing = True
+        try:
+            remaining = seconds
+            while remaining > 0 and (self.main_running or self.break_running):
+                step = remaining
+                
+                # Update main timer - không vượt quá mốc session tiếp theo
+                if self.main_running:
+                    session_boundary = ((self.current_session + 1) * self.session_duration)
+                    step = min(step, max(1, session_boundary - self.main_time))
+                    
+                    self.main_time += step
+                    if self.on_main_timer_update:
+                        self.on_main_timer_update(self.format_time(self.main_time))
+                    
+                    # Check session completion - khi đạt session_duration
+                    if self.main_time >= session_boundary and self.main_time > self.last_session_check:
+                        self.last_session_check = self.main_time
+                        self._handle_session_complete()
+                
+                # Update break timer
+                if self.break_running:
+                    self.break_time += step
+                    self.break_session_time += step  # Tăng hidden timer
+                    if self.on_break_timer_update:
+                        self.on_break_timer_update(self.format_time(self.break_time), self.break_session_time)
+                
+                remaining -= step
+        finally:
+            self._advancing = False
 
     def _handle_session_complete(self):
         """Xử lý khi hoàn thành một session"""
@@ -5,6 +5,9 @@ Manager Classes - Data and resource management components
 from .daily_stats_manager import DailyStatsManager
 from .sound_manager import SoundManager
 from .task_manager import TaskManager
+from .task_archive import TaskArchive
 from .timer_state_manager import TimerStateManager
+from .persistence_worker import PersistenceWorker, get_persistence_worker
 
-__all__ = ["DailyStatsManager", "SoundManager", "TaskManager", "TimerStateManager"]
+__all__ = ["DailyStatsManager", "SoundManager", "TaskManager", "TaskArchive", "TimerStateManager",
+           "PersistenceWorker", "get_persistence_worker"]
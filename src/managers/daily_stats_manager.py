@@ -4,7 +4,19 @@ Daily Statistics Manager - Quản lý thống kê học tập hàng ngày
 import json
 import os
 from datetime import datetime, date, timedelta
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple, Callable
+
+from .journal import Journal
+from .persistence_worker import get_persistence_worker
+from .stats_backends import create_stats_backend
+from .stats_store import DayStats, StatsDataView, format_duration
+
+# Số record trong journal trước khi gộp (compact) vào backend - khoảng 10 phút học liên tục
+JOURNAL_COMPACT_THRESHOLD = 600
+
+# Các trường có thể tăng dần qua journal
+DELTA_FIELDS = ("study_time", "break_time", "sessions_completed", "tasks_completed")
+
 
 class DailyStatsManager:
     """
@@ -12,12 +24,31 @@ class DailyStatsManager:
     
     Handles tracking of study time, break time, sessions completed,
     and tasks completed with flexible data querying capabilities.
+    
+    Per-second increments are appended to a small journal file instead of
+    rewriting the whole history; the journal is periodically compacted into
+    the storage backend.
+    
+    The backend (``STATS_BACKEND`` in config) is either the columnar
+    in-memory store saved as per-year ``daily_stats/YYYY.json`` shards
+    (loaded on demand), or a SQLite database queried on demand. Both expose
+    the same store API; ``stats_data`` is a read-only ``{date: DayStats}``
+    view over it kept for backwards compatibility. All writes go through
+    the journaled mutators.
     """
     
-    def __init__(self, data_folder="data"):
+    def __init__(self, data_folder="data", backend: Optional[str] = None):
         self.data_folder = data_folder
-        self.stats_file = os.path.join(data_folder, "daily_stats.json")
         self.ensure_data_folder()
+        self.journal = Journal(os.path.join(data_folder, "daily_stats.journal"))
+        self.persistence = get_persistence_worker()
+        self.backend = create_stats_backend(backend, data_folder, self.persistence)
+        self.stats_file = self.backend.stats_file
+        self.store = self.backend.store
+        self._goal_cache: Dict[Tuple[int, int], Dict[str, float]] = {}  # (year, month) -> averages
+        
+        # Callback khi dữ liệu thống kê thay đổi
+        self.on_stats_changed: Optional[Callable] = None
         self.stats_data = self.load_stats()
         
     def ensure_data_folder(self):
@@ -25,65 +56,100 @@ class DailyStatsManager:
         if not os.path.exists(self.data_folder):
             os.makedirs(self.data_folder)
     
-    def load_stats(self) -> Dict[str, Any]:
-        """Tải dữ liệu thống kê từ file"""
-        if os.path.exists(self.stats_file):
-            try:
-                with open(self.stats_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, FileNotFoundError):
-                return {}
-        return {}
-    
-    def save_stats(self):
-        """Lưu dữ liệu thống kê vào file"""
+    def load_stats(self) -> StatsDataView:
+        """Mở backend rồi replay các record journal chưa được compact"""
+        self._goal_cache.clear()
+        journal_seq = self.backend.load()
+        
+        with self.backend.transaction():
+            for record in self.journal.read():
+                if self.backend.needs_replay(record):
+                    self._apply_delta(record)
+                    self.backend.mark_applied(record.get("seq", 0))
+        # Record mới phải có seq lớn hơn mọi seq đã được lưu
+        self.journal.seq = max(self.journal.seq, journal_seq)
+        return StatsDataView(self.store)
+    
+    def save_stats(self, wait: bool = False):
+        """
+        Compact: lưu toàn bộ thay đổi vào backend (JSON snapshot qua persistence worker
+        hoặc commit SQLite). Journal được xoay sang segment cũ và chỉ bị xóa khi
+        dữ liệu đã nằm trên đĩa. wait=True chờ ghi xong.
+        """
+        covered_seq = self.journal.rotate()
+        self.backend.save(covered_seq, on_written=lambda: self.journal.discard_rotated(covered_seq))
+        if wait:
+            self.persistence.flush()
+    
+    def export_stats(self, filename: str):
+        """Xuất toàn bộ lịch sử thành một file JSON {YYYY-MM-DD: record}"""
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(self.store.to_dict(), f, indent=2, ensure_ascii=False)
+    
+    def close(self):
+        """Compact journal, đợi ghi xong và đóng file trước khi thoát ứng dụng"""
+        if self.journal.record_count > 0 or self.backend.has_unsaved_changes():
+            self.save_stats()
+        self.persistence.flush()
+        self.journal.close()
+        self.backend.close()
+    
+    def _record_delta(self, field: str, amount: int):
+        """Cộng dồn một trường của hôm nay và ghi một record nhỏ vào journal"""
+        record = {
+            "date": self.get_today_key(),
+            "field": field,
+            "amount": amount,
+            "at": datetime.now().isoformat()
+        }
+        seq = self.journal.append(record)
+        # Thay đổi và seq của record được commit cùng nhau (SQLite); JSON giữ trong bộ nhớ
         try:
-            with open(self.stats_file, 'w', encoding='utf-8') as f:
-                json.dump(self.stats_data, f, indent=2, ensure_ascii=False)
+            with self.backend.transaction():
+                self._apply_delta(record)
+                self.backend.mark_applied(seq)
         except Exception as e:
-            print(f"Error saving daily stats: {e}")
+            print(f"Error recording daily stats: {e}")
+        
+        if self.on_stats_changed:
+            self.on_stats_changed()
+        
+        if self.journal.record_count >= JOURNAL_COMPACT_THRESHOLD:
+            self.save_stats()
+    
+    def _apply_delta(self, record: Dict[str, Any]):
+        """Áp dụng một record journal vào store"""
+        field = record.get("field")
+        if field not in DELTA_FIELDS:
+            return
+        try:
+            ordinal = date.fromisoformat(record.get("date")).toordinal()
+        except (TypeError, ValueError):
+            return
+        
+        self.store.add(ordinal, field, record.get("amount", 0))
+        self._invalidate_goal_cache(ordinal)
+        self.store.set_time(ordinal, "last_update", record.get("at"))
+        
+        # Set start time if not already set
+        if field == "study_time" and self.store.get_time(ordinal, "start_time") is None:
+            self.store.set_time(ordinal, "start_time", record.get("at"))
     
     def get_today_key(self) -> str:
         """Lấy key cho ngày hôm nay (YYYY-MM-DD)"""
         return date.today().isoformat()
     
-    def get_today_stats(self) -> Dict[str, Any]:
-        """Lấy thống kê của ngày hôm nay"""
-        today_key = self.get_today_key()
-        if today_key not in self.stats_data:
-            self.stats_data[today_key] = {
-                "date": today_key,
-                "study_time": 0,  # Thời gian học (giây)
-                "break_time": 0,  # Thời gian nghỉ (giây)
-                "sessions_completed": 0,
-                "tasks_completed": 0,
-                "start_time": None,  # Thời gian bắt đầu học đầu tiên
-                "last_update": None  # Lần cập nhật cuối
-            }
-        else:
-            # Handle existing data format - convert if needed
-            today_stats = self.stats_data[today_key]
-            today_stats = self._normalize_day_stats(today_stats, today_key)
-        return self.stats_data[today_key]
-    
-    def get_date_stats(self, date_str: str) -> Dict[str, Any]:
-        """Lấy thống kê của ngày cụ thể (format: YYYY-MM-DD)"""
-        if date_str in self.stats_data:
-            stats = self.stats_data[date_str].copy()
-            # Normalize the stats to ensure all required fields exist
-            stats = self._normalize_day_stats(stats, date_str)
-            return stats
-        else:
-            # Return empty stats if no data available
-            return {
-                "date": date_str,
-                "study_time": 0,
-                "break_time": 0,
-                "sessions_completed": 0,
-                "tasks_completed": 0,
-                "start_time": None,
-                "last_update": None
-            }
+    def get_today_stats(self) -> DayStats:
+        """Lấy thống kê của ngày hôm nay (read-only, chưa có record thì trả về các giá trị 0)"""
+        return self._day_entry(date.today().toordinal())
+    
+    def get_date_stats(self, date_str: str) -> DayStats:
+        """Lấy thống kê của ngày cụ thể (format: YYYY-MM-DD), ngày trống trả về các giá trị 0"""
+        try:
+            ordinal = date.fromisoformat(date_str).toordinal()
+        except (TypeError, ValueError):
+            return DayStats(date_str)
+        return self._day_entry(ordinal)
     
     def get_date_summary(self, date_str: str) -> Dict[str, str]:
         """Lấy tóm tắt thống kê của ngày cụ thể với format đẹp"""
@@ -99,43 +165,23 @@ class DailyStatsManager:
     
     def update_study_time(self, additional_seconds: int):
         """Cập nhật thời gian học"""
-        today_stats = self.get_today_stats()
-        today_stats["study_time"] += additional_seconds
-        today_stats["last_update"] = datetime.now().isoformat()
-        
-        # Set start time if not already set
-        if today_stats["start_time"] is None:
-            today_stats["start_time"] = datetime.now().isoformat()
-        
-        self.save_stats()
+        self._record_delta("study_time", additional_seconds)
     
     def update_break_time(self, additional_seconds: int):
         """Cập nhật thời gian nghỉ"""
-        today_stats = self.get_today_stats()
-        today_stats["break_time"] += additional_seconds
-        today_stats["last_update"] = datetime.now().isoformat()
-        self.save_stats()
+        self._record_delta("break_time", additional_seconds)
     
     def increment_sessions_completed(self):
         """Tăng số session đã hoàn thành"""
-        today_stats = self.get_today_stats()
-        today_stats["sessions_completed"] += 1
-        today_stats["last_update"] = datetime.now().isoformat()
-        self.save_stats()
+        self._record_delta("sessions_completed", 1)
     
     def increment_tasks_completed(self):
         """Tăng số task đã hoàn thành"""
-        today_stats = self.get_today_stats()
-        today_stats["tasks_completed"] += 1
-        today_stats["last_update"] = datetime.now().isoformat()
-        self.save_stats()
+        self._record_delta("tasks_completed", 1)
     
     def format_time(self, seconds: int) -> str:
         """Format thời gian thành HH:MM:SS"""
-        hrs = seconds // 3600
-        mins = (seconds % 3600) // 60
-        secs = seconds % 60
-        return f"{hrs:02}:{mins:02}:{secs:02}"
+        return format_duration(seconds)
     
     def get_today_summary(self) -> Dict[str, str]:
         """Lấy tóm tắt thống kê ngày hôm nay"""
@@ -149,45 +195,77 @@ class DailyStatsManager:
             "total_time": self.format_time(today_stats["study_time"] + today_stats["break_time"])
         }
     
-    def get_recent_days(self, days: int = 7) -> List[Dict[str, Any]]:
+    def get_recent_days(self, days: int = 7) -> List[DayStats]:
         """Lấy thống kê của N ngày gần đây"""
-        recent_stats = []
-        
-        for i in range(days):
-            target_date = date.today() - timedelta(days=i)
-            date_key = target_date.isoformat()
-            
-            if date_key in self.stats_data:
-                stats = self.stats_data[date_key].copy()
-                # Normalize the stats to ensure all required fields exist
-                stats = self._normalize_day_stats(stats, date_key)
-                
-                stats["formatted_study_time"] = self.format_time(stats["study_time"])
-                stats["formatted_break_time"] = self.format_time(stats["break_time"])
-                recent_stats.append(stats)
-            else:
-                # Create empty entry for days with no data
-                recent_stats.append(self._create_empty_day_stats(date_key))
-        
+        end = date.today().toordinal()
+        recent_stats = self._range_entries(end - days + 1, end)
+        recent_stats.reverse()  # Hôm nay trước
         return recent_stats
     
     def get_weekly_total(self) -> Dict[str, Any]:
         """Get this week's total statistics"""
-        recent_days = self.get_recent_days(7)
-        total_study = sum(day["study_time"] for day in recent_days)
-        total_break = sum(day["break_time"] for day in recent_days)
-        total_sessions = sum(day["sessions_completed"] for day in recent_days)
-        total_tasks = sum(day["tasks_completed"] for day in recent_days)
+        today = date.today()
+        totals = self.get_range_totals(today - timedelta(days=6), today)
         
         return {
-            "total_study_time": self.format_time(total_study),
-            "total_break_time": self.format_time(total_break),
-            "total_sessions": total_sessions,
-            "total_tasks": total_tasks,
-            "average_daily_study": self.format_time(total_study // 7),
-            "days_active": len([day for day in recent_days if day["study_time"] > 0])
+            "total_study_time": self.format_time(totals["study_time"]),
+            "total_break_time": self.format_time(totals["break_time"]),
+            "total_sessions": totals["sessions_completed"],
+            "total_tasks": totals["tasks_completed"],
+            "average_daily_study": self.format_time(totals["study_time"] // 7),
+            "days_active": totals["active_days"]
         }
     
+    def get_range_totals(self, start_date, end_date) -> Dict[str, int]:
+        """
+        Tổng các chỉ số (giây/số lượng thô) trong khoảng ngày, tra từ prefix-sum index
+        
+        Args:
+            start_date: Ngày bắt đầu (datetime.date hoặc string YYYY-MM-DD)
+            end_date: Ngày kết thúc (datetime.date hoặc string YYYY-MM-DD)
+        
+        Returns:
+            Dict gồm study_time, break_time, sessions_completed, tasks_completed,
+            active_days và days (số ngày trong khoảng)
+        """
+        if isinstance(start_date, str):
+            start_date = datetime.strptime(start_date, "%Y-%m-%d").date()
+        if isinstance(end_date, str):
+            end_date = datetime.strptime(end_date, "%Y-%m-%d").date()
+        
+        start, end = start_date.toordinal(), end_date.toordinal()
+        totals = self.store.range_totals(start, end)
+        totals["days"] = max(0, end - start + 1)
+        return totals
+    
+    def get_monthly_totals(self, year: int, month: int) -> Dict[str, int]:
+        """Tổng thô (giây/số lượng, chưa format) của một tháng"""
+        from calendar import monthrange
+        
+        days_in_month = monthrange(year, month)[1]
+        start = date(year, month, 1).toordinal()
+        totals = self.store.range_totals(start, start + days_in_month - 1)
+        totals.update(year=year, month=month, days_in_month=days_in_month)
+        return totals
+    
+    def get_yearly_totals(self, year: int) -> Dict[str, Any]:
+        """
+        Tổng thô của một năm cùng 12 tổng tháng, không format/parse chuỗi thời gian
+        
+        Returns:
+            Dict gồm các tổng của năm, days_in_year và "months" (list 12 dict
+            từ get_monthly_totals)
+        """
+        start = date(year, 1, 1).toordinal()
+        end = date(year, 12, 31).toordinal()
+        totals = self.store.range_totals(start, end)
+        totals.update(
+            year=year,
+            days_in_year=end - start + 1,
+            months=[self.get_monthly_totals(year, month) for month in range(1, 13)]
+        )
+        return totals
+    
     def get_monthly_data(self, year: int = None, month: int = None) -> Dict[str, Any]:
         """Lấy thống kê theo tháng"""
         from calendar import monthrange
@@ -201,34 +279,18 @@ class DailyStatsManager:
         # Get number of days in month
         days_in_month = monthrange(year, month)[1]
         
-        monthly_stats = []
-        totals = {"study": 0, "break": 0, "sessions": 0, "tasks": 0}
-        active_days = 0
+        start = date(year, month, 1).toordinal()
+        monthly_stats = self._range_entries(start, start + days_in_month - 1)
         
-        # Iterate through all days in month
-        for day in range(1, days_in_month + 1):
-            date_key = f"{year:04d}-{month:02d}-{day:02d}"
-            
-            if date_key in self.stats_data:
-                day_stats = self.stats_data[date_key].copy()
-                # Normalize the stats to ensure all required fields exist
-                day_stats = self._normalize_day_stats(day_stats, date_key)
-                
-                day_stats["formatted_study_time"] = self.format_time(day_stats["study_time"])
-                day_stats["formatted_break_time"] = self.format_time(day_stats["break_time"])
-                monthly_stats.append(day_stats)
-                
-                # Tính tổng
-                totals["study"] += day_stats["study_time"]
-                totals["break"] += day_stats["break_time"]
-                totals["sessions"] += day_stats["sessions_completed"]
-                totals["tasks"] += day_stats["tasks_completed"]
-                
-                if day_stats["study_time"] > 0:
-                    active_days += 1
-            else:
-                # Day with no data
-                monthly_stats.append(self._create_empty_day_stats(date_key))
+        # Tổng tháng từ prefix-sum index
+        month_totals = self.get_monthly_totals(year, month)
+        totals = {
+            "study": month_totals["study_time"],
+            "break": month_totals["break_time"],
+            "sessions": month_totals["sessions_completed"],
+            "tasks": month_totals["tasks_completed"]
+        }
+        active_days = month_totals["active_days"]
         
         return {
             "year": year,
@@ -252,37 +314,24 @@ class DailyStatsManager:
         # Get number of days in month
         days_in_month = monthrange(year, month)[1]
         
-        daily_breakdown = []
-        
-        # Iterate through all days in month
-        for day in range(1, days_in_month + 1):
-            date_key = f"{year:04d}-{month:02d}-{day:02d}"
-            
-            if date_key in self.stats_data:
-                day_data = self.stats_data[date_key].copy()
-                # Normalize the stats to ensure all required fields exist
-                day_data = self._normalize_day_stats(day_data, date_key)
-                
-                # Convert to formatted time strings for display
-                day_data["study_time"] = self.format_time(day_data["study_time"])
-                day_data["break_time"] = self.format_time(day_data["break_time"])
-                daily_breakdown.append(day_data)
-            else:
-                # Create empty day entry
-                daily_breakdown.append({
-                    "date": date_key,
-                    "study_time": "00:00:00",
-                    "break_time": "00:00:00",
-                    "sessions_completed": 0,
-                    "tasks_completed": 0
-                })
-        
-        return daily_breakdown
+        start = date(year, month, 1).toordinal()
+        
+        # Bảng hiển thị: thời gian dạng chuỗi đã format
+        return [
+            {
+                "date": day.date,
+                "study_time": day.formatted_study_time,
+                "break_time": day.formatted_break_time,
+                "sessions_completed": day.sessions_completed,
+                "tasks_completed": day.tasks_completed,
+                "start_time": day.start_time,
+                "last_update": day.last_update
+            }
+            for day in self._range_entries(start, start + days_in_month - 1)
+        ]
 
     def get_month_comparison(self, months_back: int = 3) -> List[Dict[str, Any]]:
         """So sánh thống kê của N tháng gần đây"""
-        import calendar
-        
         comparisons = []
         current_date = datetime.now()
         
@@ -295,80 +344,55 @@ class DailyStatsManager:
                 target_month = 12 + (current_date.month - i)
                 target_year = current_date.year - 1
             
-            monthly_data = self.get_monthly_data(target_year, target_month)
+            totals = self.get_monthly_totals(target_year, target_month)
             comparisons.append({
-                "month_name": monthly_data["month_name"],
-                "study_time": monthly_data["total_study_time"],
-                "active_days": monthly_data["active_days"],
-                "sessions": monthly_data["total_sessions"],
-                "tasks": monthly_data["total_tasks"],
-                "productivity_rate": monthly_data["productivity_rate"]
+                "month_name": datetime(target_year, target_month, 1).strftime("%B %Y"),
+                "study_time": self.format_time(totals["study_time"]),
+                "active_days": totals["active_days"],
+                "sessions": totals["sessions_completed"],
+                "tasks": totals["tasks_completed"],
+                "productivity_rate": f"{(totals['active_days'] / totals['days_in_month'] * 100):.1f}%"
             })
         
         return comparisons
     
-    def get_best_days_in_month(self, year: int = None, month: int = None, top_n: int = 5) -> List[Dict[str, Any]]:
+    def get_best_days_in_month(self, year: int = None, month: int = None, top_n: int = 5) -> List[DayStats]:
         """Lấy những ngày học tập tốt nhất trong tháng"""
-        monthly_data = self.get_monthly_data(year, month)
-        
-        # Lọc những ngày có hoạt động học tập
-        daily_stats = monthly_data["daily_stats"]
-        active_days = [day for day in daily_stats if day["study_time"] > 0]
-        
-        # Sắp xếp theo thời gian học giảm dần
-        best_days = sorted(active_days, key=lambda x: x["study_time"], reverse=True)[:top_n]
+        from calendar import monthrange
         
-        # Format ngày hiển thị đẹp hơn
-        for day in best_days:
-            date_obj = datetime.strptime(day["date"], "%Y-%m-%d")
-            day["display_date"] = date_obj.strftime("%B %d (%A)")
+        if year is None or month is None:
+            now = datetime.now()
+            year = now.year
+            month = now.month
         
-        return best_days
+        # Top N ngày có học, sắp xếp theo thời gian học giảm dần
+        start = date(year, month, 1).toordinal()
+        end = start + monthrange(year, month)[1] - 1
+        # display_date được DayStats format khi đọc
+        return [self._day_entry(ordinal) for ordinal in self.store.best_days(start, end, top_n)]
     
     def reset_today(self):
         """Reset thống kê ngày hôm nay"""
-        today_key = self.get_today_key()
-        if today_key in self.stats_data:
-            del self.stats_data[today_key]
+        today = date.today().toordinal()
+        if self.store.has_day(today):
+            self.store.remove_day(today)
+            self._invalidate_goal_cache(today)
             self.save_stats()
+            
+            if self.on_stats_changed:
+                self.on_stats_changed()
 
-    def _create_empty_day_stats(self, date_key: str) -> Dict[str, Any]:
-        """Tạo entry trống cho ngày không có dữ liệu"""
-        return {
-            "date": date_key,
-            "study_time": 0,
-            "break_time": 0,
-            "sessions_completed": 0,
-            "tasks_completed": 0,
-            "formatted_study_time": "00:00:00",
-            "formatted_break_time": "00:00:00"
-        }
+    def _day_entry(self, ordinal: int) -> DayStats:
+        """DayStats của một ngày (các giá trị 0 nếu ngày không có dữ liệu)"""
+        return self.store.day_stats(ordinal)
 
-    def _normalize_day_stats(self, stats: Dict[str, Any], date_key: str) -> Dict[str, Any]:
-        """Normalize day stats to ensure all required fields exist"""
-        # Handle existing data format - convert if needed
-        if "total_study_time" in stats and "study_time" not in stats:
-            stats["study_time"] = stats["total_study_time"]
-        
-        # Ensure all required fields exist with defaults
-        if "date" not in stats:
-            stats["date"] = date_key
-        if "study_time" not in stats:
-            stats["study_time"] = stats.get("total_study_time", 0)
-        if "break_time" not in stats:
-            stats["break_time"] = 0
-        if "sessions_completed" not in stats:
-            stats["sessions_completed"] = 0
-        if "tasks_completed" not in stats:
-            stats["tasks_completed"] = 0
-        if "start_time" not in stats:
-            stats["start_time"] = None
-        if "last_update" not in stats:
-            stats["last_update"] = None
-        
-        return stats
+    def _range_entries(self, start: int, end: int) -> List[DayStats]:
+        """DayStats cho mọi ngày trong khoảng ordinal [start, end], kể cả ngày trống"""
+        days = self.store.range_days(start, end)
+        return [days.get(ordinal) or DayStats(date.fromordinal(ordinal).isoformat())
+                for ordinal in range(start, end + 1)]
 
-    def get_data_range(self, start_date=None, end_date=None, days=None) -> List[Dict[str, Any]]:
+    def get_data_range(self, start_date=None, end_date=None, days=None) -> List[DayStats]:
         """
         Lấy dữ liệu trong khoảng thời gian linh hoạt
         
@@ -394,28 +418,7 @@ class DailyStatsManager:
         elif isinstance(start_date, str):
             start_date = datetime.strptime(start_date, "%Y-%m-%d").date()
         
-        # Create list of days in the time range
-        current_date = start_date
-        range_stats = []
-        
-        while current_date <= end_date:
-            date_key = current_date.isoformat()
-            
-            if date_key in self.stats_data:
-                stats = self.stats_data[date_key].copy()
-                # Normalize the stats to ensure all required fields exist
-                stats = self._normalize_day_stats(stats, date_key)
-                
-                stats["formatted_study_time"] = self.format_time(stats["study_time"])
-                stats["formatted_break_time"] = self.format_time(stats["break_time"])
-                range_stats.append(stats)
-            else:
-                # Create empty entry for days with no data
-                range_stats.append(self._create_empty_day_stats(date_key))
-            
-            current_date += timedelta(days=1)
-        
-        return range_stats
+        return self._range_entries(start_date.toordinal(), end_date.toordinal())
 
     def get_yearly_data(self, year=None) -> Dict[str, Any]:
         """
@@ -430,38 +433,34 @@ class DailyStatsManager:
         if year is None:
             year = datetime.now().year
         
+        year_totals = self.get_yearly_totals(year)
         yearly_stats = []
-        totals = {"study": 0, "break": 0, "sessions": 0, "tasks": 0}
-        active_days = 0
         
-        # Duyệt qua tất cả 12 tháng
-        for month in range(1, 13):
-            monthly_data = self.get_monthly_data(year, month)
-            
-            # Convert total_study_time from string to seconds to calculate total
-            month_study_seconds = self.time_to_seconds(monthly_data["total_study_time"])
-            month_break_seconds = self.time_to_seconds(monthly_data["total_break_time"])
-            
-            # Add month to yearly_stats
+        # Duyệt qua tất cả 12 tháng, format từ tổng thô
+        for month_totals in year_totals["months"]:
+            month = month_totals["month"]
+            days_in_month = month_totals["days_in_month"]
+            start = date(year, month, 1).toordinal()
             yearly_stats.append({
                 "month": month,
-                "month_name": monthly_data["month_name"],
-                "total_study_time": monthly_data["total_study_time"],
-                "total_break_time": monthly_data["total_break_time"],
-                "total_sessions": monthly_data["total_sessions"],
-                "total_tasks": monthly_data["total_tasks"],
-                "active_days": monthly_data["active_days"],
-                "days_in_month": monthly_data["days_in_month"],
-                "productivity_rate": monthly_data["productivity_rate"],
-                "daily_stats": monthly_data["daily_stats"]
+                "month_name": datetime(year, month, 1).strftime("%B %Y"),
+                "total_study_time": self.format_time(month_totals["study_time"]),
+                "total_break_time": self.format_time(month_totals["break_time"]),
+                "total_sessions": month_totals["sessions_completed"],
+                "total_tasks": month_totals["tasks_completed"],
+                "active_days": month_totals["active_days"],
+                "days_in_month": days_in_month,
+                "productivity_rate": f"{(month_totals['active_days'] / days_in_month * 100):.1f}%",
+                "daily_stats": self._range_entries(start, start + days_in_month - 1)
             })
-            
-            # Tích lũy thống kê tổng
-            totals["study"] += month_study_seconds
-            totals["break"] += month_break_seconds
-            totals["sessions"] += monthly_data["total_sessions"]
-            totals["tasks"] += monthly_data["total_tasks"]
-            active_days += monthly_data["active_days"]
+        
+        totals = {
+            "study": year_totals["study_time"],
+            "break": year_totals["break_time"],
+            "sessions": year_totals["sessions_completed"],
+            "tasks": year_totals["tasks_completed"]
+        }
+        active_days = year_totals["active_days"]
         
         return {
             "year": year,
@@ -494,36 +493,17 @@ class DailyStatsManager:
 
     def get_available_years(self) -> List[int]:
         """Lấy danh sách các năm có dữ liệu"""
-        if not self.stats_data:
-            return []
-        
-        years = set()
-        for date_key in self.stats_data.keys():
-            try:
-                year = int(date_key.split('-')[0])
-                years.add(year)
-            except (ValueError, IndexError):
-                continue
-        
-        return sorted(list(years), reverse=True)
+        return sorted(self.store.years(), reverse=True)
 
     def get_available_months_in_year(self, year: int) -> List[int]:
         """Lấy danh sách các tháng có dữ liệu trong năm"""
-        if not self.stats_data:
+        if year not in self.store.years():
             return []
         
-        months = set()
-        year_str = str(year)
-        
-        for date_key in self.stats_data.keys():
-            if date_key.startswith(year_str):
-                try:
-                    month = int(date_key.split('-')[1])
-                    months.add(month)
-                except (ValueError, IndexError):
-                    continue
-        
-        return sorted(list(months))
+        start = date(year, 1, 1).toordinal()
+        present = self.store.present_slice(start, date(year, 12, 31).toordinal())
+        return sorted({date.fromordinal(start + offset).month
+                       for offset, flag in enumerate(present) if flag})
 
     def get_data_summary(self) -> Dict[str, Any]:
         """
@@ -532,7 +512,8 @@ class DailyStatsManager:
         Returns:
             Dictionary chứa thống kê tổng quan
         """
-        if not self.stats_data:
+        days_recorded = len(self.store)
+        if days_recorded == 0:
             return {
                 "total_days_recorded": 0,
                 "earliest_date": None,
@@ -545,20 +526,22 @@ class DailyStatsManager:
                 "total_years": 0
             }
         
-        dates = sorted(self.stats_data.keys())
-        total_study = sum(day.get("study_time", day.get("total_study_time", 0)) for day in self.stats_data.values())
-        total_sessions = sum(day.get("sessions_completed", 0) for day in self.stats_data.values())
-        total_tasks = sum(day.get("tasks_completed", 0) for day in self.stats_data.values())
+        first = self.store.first_ordinal()
+        last = self.store.last_ordinal()
+        totals = self.store.range_totals(first, last)
+        total_study = totals["study_time"]
+        total_sessions = totals["sessions_completed"]
+        total_tasks = totals["tasks_completed"]
         available_years = self.get_available_years()
         
         return {
-            "total_days_recorded": len(self.stats_data),
-            "earliest_date": dates[0],
-            "latest_date": dates[-1],
+            "total_days_recorded": days_recorded,
+            "earliest_date": date.fromordinal(first).isoformat(),
+            "latest_date": date.fromordinal(last).isoformat(),
             "total_study_hours": total_study / 3600,
             "total_sessions": total_sessions,
             "total_tasks": total_tasks,
-            "average_study_per_day": total_study / len(self.stats_data) / 3600 if len(self.stats_data) > 0 else 0,
+            "average_study_per_day": total_study / days_recorded / 3600,
             "available_years": available_years,
             "total_years": len(available_years)
         }
@@ -579,29 +562,7 @@ class DailyStatsManager:
             year = year or current_date.year
             month = month or current_date.month
         
-        # Lấy dữ liệu tháng
-        monthly_data = self.get_monthly_data(year, month)
-        
-        if not monthly_data:
-            return 4.0  # Default 4h nếu không có dữ liệu
-        
-        # Tính tổng thời gian học và số ngày có dữ liệu
-        total_study_seconds = 0
-        days_with_data = 0
-        
-        for day_data in monthly_data.values():
-            if isinstance(day_data, dict) and 'study_time' in day_data:
-                study_time = day_data['study_time']
-                if study_time > 0:  # Chỉ tính những ngày có học
-                    total_study_seconds += study_time
-                    days_with_data += 1
-        
-        if days_with_data == 0:
-            return 4.0  # Default 4h nếu không có ngày nào có dữ liệu
-        
-        # Trả về trung bình theo giờ
-        average_seconds_per_day = total_study_seconds / days_with_data
-        return average_seconds_per_day / 3600  # Convert to hours
+        return self._get_monthly_averages(year, month)["study_hours"]
     
     def get_monthly_average_sessions(self, year: int = None, month: int = None) -> float:
         """
@@ -619,28 +580,33 @@ class DailyStatsManager:
             year = year or current_date.year
             month = month or current_date.month
         
-        # Lấy dữ liệu tháng
-        monthly_data = self.get_monthly_data(year, month)
-        
-        if not monthly_data:
-            return 4.0  # Default 4 sessions nếu không có dữ liệu
-        
-        # Tính tổng sessions và số ngày có dữ liệu
-        total_sessions = 0
-        days_with_data = 0
-        
-        for day_data in monthly_data.values():
-            if isinstance(day_data, dict) and 'sessions_completed' in day_data:
-                sessions = day_data['sessions_completed']
-                if sessions > 0:  # Chỉ tính những ngày có sessions
-                    total_sessions += sessions
-                    days_with_data += 1
-        
-        if days_with_data == 0:
-            return 4.0  # Default 4 sessions nếu không có ngày nào có dữ liệu
+        return self._get_monthly_averages(year, month)["sessions"]
+    
+    def _get_monthly_averages(self, year: int, month: int) -> Dict[str, float]:
+        """Trung bình theo ngày của tháng (có cache, bị xóa khi dữ liệu tháng thay đổi)"""
+        key = (year, month)
+        averages = self._goal_cache.get(key)
+        if averages is not None:
+            return averages
         
-        # Trả về trung bình sessions
-        return total_sessions / days_with_data
+        from calendar import monthrange
+        start = date(year, month, 1).toordinal()
+        end = start + monthrange(year, month)[1] - 1
+        
+        # Chỉ tính những ngày có học / có sessions; mặc định 4h và 4 sessions nếu trống
+        study_days = [value for value in self.store.column_slice("study_time", start, end) if value > 0]
+        session_days = [value for value in self.store.column_slice("sessions_completed", start, end) if value > 0]
+        averages = {
+            "study_hours": sum(study_days) / len(study_days) / 3600 if study_days else 4.0,
+            "sessions": sum(session_days) / len(session_days) if session_days else 4.0
+        }
+        self._goal_cache[key] = averages
+        return averages
+    
+    def _invalidate_goal_cache(self, ordinal: int):
+        """Xóa cache goal của tháng chứa ngày vừa thay đổi"""
+        changed = date.fromordinal(ordinal)
+        self._goal_cache.pop((changed.year, changed.month), None)
 
     def get_dynamic_session_goal(self, target_date: date = None) -> int:
         """
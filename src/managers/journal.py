@@ -0,0 +1,145 @@
+"""
+Journal Module - Append-only JSON-lines log used for write-behind persistence
+"""
+
+import json
+import os
+import shutil
+import threading
+from typing import Any, Dict, List, Optional, TextIO
+
+
+class Journal:
+    """
+    Append-only journal of small JSON records.
+
+    Every record is stamped with a monotonically increasing ``seq`` so that a
+    snapshot can remember the last record it already contains; replay then
+    skips anything at or below that sequence number.
+
+    While a snapshot is being written in the background the covered records
+    are moved to a rotated segment (``<path>.old``) so new appends never race
+    with the snapshot; the segment is dropped once the snapshot is on disk.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.rotated_path = path + ".old"
+        self.seq = 0  # Sequence number của record cuối cùng
+        self.record_count = 0  # Số record hiện có trong file (kể cả segment cũ)
+        self._rotated_seq = 0  # seq lớn nhất nằm trong segment cũ
+        self._file: Optional[TextIO] = None
+        self._lock = threading.Lock()
+
+    def append(self, record: Dict[str, Any]) -> int:
+        """Ghi thêm một record vào cuối journal, trả về seq của record"""
+        return self.append_many([record])
+
+    def append_many(self, records: List[Dict[str, Any]]) -> int:
+        """Ghi nhiều record bằng một lần write, trả về seq của record cuối"""
+        lines = []
+        for record in records:
+            self.seq += 1
+            lines.append(json.dumps(dict(record, seq=self.seq), ensure_ascii=False, separators=(",", ":")) + "\n")
+        if not lines:
+            return self.seq
+        try:
+            if self._file is None:
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write("".join(lines))
+            self._file.flush()
+            self.record_count += len(lines)
+        except OSError as e:
+            print(f"Error appending to journal {self.path}: {e}")
+        return self.seq
+
+    def read(self, after_seq: int = 0) -> List[Dict[str, Any]]:
+        """Đọc các record có seq > after_seq từ segment cũ rồi file hiện tại"""
+        records = []
+        self.record_count = 0
+        self.seq = max(self.seq, after_seq)
+
+        self._read_file(self.rotated_path, after_seq, records)
+        if os.path.exists(self.rotated_path):
+            self._rotated_seq = self.seq
+        self._read_file(self.path, after_seq, records)
+        return records
+
+    def _read_file(self, path: str, after_seq: int, records: List[Dict[str, Any]]):
+        """Đọc một file journal (bỏ qua dòng ghi dở khi crash)"""
+        if not os.path.exists(path):
+            return
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+
+                    seq = record.get("seq", 0)
+                    self.seq = max(self.seq, seq)
+                    self.record_count += 1
+                    if seq > after_seq:
+                        records.append(record)
+        except OSError as e:
+            print(f"Error reading journal {path}: {e}")
+
+    def rotate(self) -> int:
+        """
+        Chuyển các record hiện có sang segment cũ trước khi ghi snapshot ở background.
+        Trả về seq mà snapshot bao phủ, dùng cho discard_rotated().
+        """
+        self.close()
+        with self._lock:
+            try:
+                if os.path.exists(self.path):
+                    if os.path.exists(self.rotated_path):
+                        # Snapshot trước chưa ghi xong - nối thêm để không mất record
+                        with open(self.path, 'rb') as src, open(self.rotated_path, 'ab') as dst:
+                            shutil.copyfileobj(src, dst)
+                        os.remove(self.path)
+                    else:
+                        os.replace(self.path, self.rotated_path)
+                self._rotated_seq = self.seq
+                self.record_count = 0
+            except OSError as e:
+                print(f"Error rotating journal {self.path}: {e}")
+        return self.seq
+
+    def discard_rotated(self, covered_seq: int):
+        """Xóa segment cũ khi snapshot chứa tới covered_seq đã được ghi (gọi được từ thread khác)"""
+        with self._lock:
+            if self._rotated_seq > covered_seq:
+                return  # Segment đã nhận thêm record mới hơn snapshot này
+            try:
+                if os.path.exists(self.rotated_path):
+                    os.remove(self.rotated_path)
+            except OSError as e:
+                print(f"Error removing journal segment {self.rotated_path}: {e}")
+
+    def truncate(self):
+        """Xóa nội dung journal sau khi đã gộp vào snapshot (seq vẫn tiếp tục tăng)"""
+        self.close()
+        with self._lock:
+            try:
+                with open(self.path, 'w', encoding='utf-8'):
+                    pass
+                if os.path.exists(self.rotated_path):
+                    os.remove(self.rotated_path)
+                self.record_count = 0
+            except OSError as e:
+                print(f"Error truncating journal {self.path}: {e}")
+
+    def close(self):
+        """Đóng file handle đang mở"""
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
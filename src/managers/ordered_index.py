@@ -0,0 +1,164 @@
+"""
+Ordered Index - Map giữ thứ tự, tra vị trí <-> key trong O(log n) (Fenwick tree)
+"""
+
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+# Slot trống (entry đã bị xóa)
+_HOLE = object()
+
+# Số slot trống tối thiểu trước khi dồn lại
+_MIN_COMPACT_HOLES = 64
+
+
+class OrderedIndexMap:
+    """
+    Ordered ``key -> value`` map that also answers "position of a key" and
+    "key at a position" without scanning.
+
+    Entries live in an append-only slot array; a Fenwick tree counts the
+    live slots, so the position of an entry is the number of live slots
+    before it. Appending fills the next slot, removing leaves a hole (both
+    O(log n)), and the slots are compacted once holes outnumber entries, so
+    the amortized cost stays logarithmic. Swapping two positions exchanges
+    the slot contents. Iteration follows display order, like a dict's
+    insertion order.
+    """
+
+    def __init__(self, items: Iterable[Tuple[Hashable, Any]] = ()):
+        self._values: Dict[Hashable, Any] = {}
+        self._slot_of: Dict[Hashable, int] = {}
+        self._slots: List[Any] = []  # slot -> key (_HOLE = đã xóa)
+        self._tree: List[int] = [0]  # Fenwick tree 1-based trên các slot
+        for key, value in items:
+            self[key] = value
+
+    # ----- Fenwick tree -----
+
+    def _rebuild(self, capacity: int):
+        """Dồn các slot còn sống về đầu và dựng lại cây với sức chứa mới (O(n))"""
+        self._slots = [key for key in self._slots if key is not _HOLE]
+        self._slot_of = {key: slot for slot, key in enumerate(self._slots)}
+        tree = [0] * (capacity + 1)
+        for index in range(1, capacity + 1):
+            if index <= len(self._slots):
+                tree[index] += 1
+            parent = index + (index & -index)
+            if parent <= capacity:
+                tree[parent] += tree[index]
+        self._tree = tree
+
+    def _add(self, slot: int, delta: int):
+        index = slot + 1
+        capacity = len(self._tree) - 1
+        while index <= capacity:
+            self._tree[index] += delta
+            index += index & -index
+
+    def _count_before(self, slot: int) -> int:
+        """Số entry nằm ở các slot trước slot"""
+        count = 0
+        index = slot
+        while index > 0:
+            count += self._tree[index]
+            index -= index & -index
+        return count
+
+    def _slot_at(self, position: int) -> int:
+        """Slot của entry thứ position (0-based)"""
+        if not 0 <= position < len(self._values):
+            raise IndexError("position out of range")
+        capacity = len(self._tree) - 1
+        slot = 0
+        remaining = position + 1
+        step = 1 << (capacity.bit_length() - 1)
+        while step:
+            nxt = slot + step
+            if nxt <= capacity and self._tree[nxt] < remaining:
+                slot = nxt
+                remaining -= self._tree[nxt]
+            step >>= 1
+        return slot
+
+    # ----- Mapping -----
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __contains__(self, key) -> bool:
+        return key in self._values
+
+    def __getitem__(self, key):
+        return self._values[key]
+
+    def get(self, key, default=None):
+        return self._values.get(key, default)
+
+    def __setitem__(self, key, value):
+        """Gán giá trị; key mới được thêm vào cuối"""
+        if key not in self._values:
+            slot = len(self._slots)
+            if slot >= len(self._tree) - 1:
+                self._rebuild(max(16, 2 * (len(self._values) + 1)))
+                slot = len(self._slots)
+            self._slots.append(key)
+            self._slot_of[key] = slot
+            self._add(slot, 1)
+        self._values[key] = value
+
+    def pop(self, key, default=None):
+        """Xóa và trả về giá trị của key (default nếu không có)"""
+        if key not in self._values:
+            return default
+        slot = self._slot_of.pop(key)
+        self._slots[slot] = _HOLE
+        self._add(slot, -1)
+        value = self._values.pop(key)
+        holes = len(self._slots) - len(self._values)
+        if holes > _MIN_COMPACT_HOLES and holes > len(self._values):
+            self._rebuild(len(self._tree) - 1)
+        return value
+
+    def clear(self):
+        self._values.clear()
+        self._slot_of.clear()
+        self._slots = []
+        self._tree = [0]
+
+    def __iter__(self) -> Iterator:
+        return (key for key in self._slots if key is not _HOLE)
+
+    def keys(self) -> Iterator:
+        return iter(self)
+
+    def values(self) -> Iterator:
+        return (self._values[key] for key in self)
+
+    def items(self) -> Iterator[Tuple[Hashable, Any]]:
+        return ((key, self._values[key]) for key in self)
+
+    # ----- Positions -----
+
+    def position(self, key) -> int:
+        """Vị trí (0-based) của key, -1 nếu không có"""
+        slot = self._slot_of.get(key)
+        if slot is None:
+            return -1
+        return self._count_before(slot)
+
+    def key_at(self, position: int):
+        """Key ở vị trí position (IndexError nếu ngoài phạm vi)"""
+        return self._slots[self._slot_at(position)]
+
+    def value_at(self, position: int, default=None) -> Optional[Any]:
+        """Giá trị ở vị trí position (default nếu ngoài phạm vi)"""
+        if not 0 <= position < len(self._values):
+            return default
+        return self._values[self.key_at(position)]
+
+    def swap(self, first: int, second: int):
+        """Đổi chỗ hai entry theo vị trí"""
+        first_slot, second_slot = self._slot_at(first), self._slot_at(second)
+        first_key, second_key = self._slots[first_slot], self._slots[second_slot]
+        self._slots[first_slot], self._slots[second_slot] = second_key, first_key
+        self._slot_of[first_key], self._slot_of[second_key] = second_slot, first_slot
@@ -0,0 +1,149 @@
+"""
+Persistence Worker - Background thread ghi file JSON với coalescing
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Thời gian gom các lần ghi dồn dập vào cùng một file (giây)
+DEFAULT_COALESCE_DELAY = 0.5
+
+# (data, indent, on_written) - data = None nghĩa là xóa file
+_WriteJob = Tuple[Any, Optional[int], Optional[Callable[[], None]]]
+
+
+class PersistenceWorker:
+    """
+    Single background writer for the app's JSON files.
+
+    Managers hand over a snapshot of their data with ``submit``; jobs for the
+    same path are coalesced so a burst of changes becomes one write. Files are
+    written atomically (temp file + rename), so the Tk thread never waits on
+    disk except in ``flush``, which the close handler uses before exiting.
+    """
+
+    def __init__(self, coalesce_delay: float = DEFAULT_COALESCE_DELAY):
+        self.coalesce_delay = coalesce_delay
+        self._pending: Dict[str, _WriteJob] = {}  # path -> job mới nhất
+        self._first_pending_at = 0.0
+        self._busy = False
+        self._flush_requested = False
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, path: str, data: Any, indent: Optional[int] = 2,
+               on_written: Optional[Callable[[], None]] = None):
+        """
+        Đặt lịch ghi ``data`` vào ``path`` (thay thế job cũ chưa ghi của cùng file).
+        ``data`` phải là bản chụp không bị sửa sau đó; ``None`` nghĩa là xóa file.
+        ``on_written`` chạy trên worker thread sau khi ghi thành công.
+        """
+        with self._cond:
+            if not self._pending:
+                self._first_pending_at = time.monotonic()
+            self._pending[path] = (data, indent, on_written)
+            self._ensure_thread()
+            self._cond.notify_all()
+
+    def is_pending(self, path: str) -> bool:
+        """Kiểm tra file có thay đổi chưa được ghi không"""
+        with self._cond:
+            return path in self._pending
+
+    def pending_data(self, path: str) -> Any:
+        """Lấy dữ liệu đang chờ ghi của file (để đọc lại ngay sau khi lưu)"""
+        with self._cond:
+            job = self._pending.get(path)
+            return job[0] if job else None
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Ghi ngay mọi thay đổi đang chờ và đợi xong, trả về False nếu hết timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            if not self._pending and not self._busy:
+                return True
+            self._flush_requested = True
+            self._cond.notify_all()
+            while self._pending or self._busy:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def _ensure_thread(self):
+        """Khởi động worker thread ở lần submit đầu tiên"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="persistence-worker", daemon=True)
+            self._thread.start()
+            # Thread là daemon nên phải flush khi interpreter thoát
+            atexit.register(self.flush)
+
+    def _run(self):
+        """Vòng lặp worker: đợi job, gom trong coalesce_delay rồi ghi cả lô"""
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                deadline = self._first_pending_at + self.coalesce_delay
+                while not self._flush_requested:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                jobs = self._pending
+                self._pending = {}
+                self._busy = True
+
+            for path, job in jobs.items():
+                self._write(path, *job)
+
+            with self._cond:
+                self._busy = False
+                if not self._pending:
+                    self._flush_requested = False
+                self._cond.notify_all()
+
+    def _write(self, path: str, data: Any, indent: Optional[int],
+               on_written: Optional[Callable[[], None]]):
+        """Ghi atomic một file (temp file + rename) hoặc xóa file nếu data là None"""
+        try:
+            if data is None:
+                if os.path.exists(path):
+                    os.remove(path)
+            else:
+                directory = os.path.dirname(path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                temp_file = path + ".tmp"
+                with open(temp_file, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, indent=indent, ensure_ascii=False)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_file, path)
+        except Exception as e:
+            print(f"Error writing {path}: {e}")
+            return
+
+        if on_written:
+            try:
+                on_written()
+            except Exception as e:
+                print(f"Error after writing {path}: {e}")
+
+
+_shared_worker: Optional[PersistenceWorker] = None
+_shared_lock = threading.Lock()
+
+
+def get_persistence_worker() -> PersistenceWorker:
+    """Worker dùng chung cho toàn bộ ứng dụng"""
+    global _shared_worker
+    with _shared_lock:
+        if _shared_worker is None:
+            _shared_worker = PersistenceWorker()
+        return _shared_worker
@@ -3,14 +3,28 @@ Sound Manager - Complete pygame implementation
 """
 
 import os
+import threading
 from typing import Optional
 
-try:
-    import pygame
-    PYGAME_AVAILABLE = True
-except ImportError:
-    PYGAME_AVAILABLE = False
-    print("[SOUND] pygame not available. Install with: pip install pygame")
+# pygame chỉ được import khi phát âm thanh lần đầu (hoặc prewarm ở background)
+pygame = None
+PYGAME_AVAILABLE: Optional[bool] = None  # None = chưa thử import
+_pygame_lock = threading.Lock()
+
+
+def load_pygame() -> bool:
+    """Import pygame lần đầu khi cần, trả về True nếu dùng được (an toàn khi gọi từ thread khác)"""
+    global pygame, PYGAME_AVAILABLE
+    with _pygame_lock:
+        if PYGAME_AVAILABLE is None:
+            try:
+                import pygame as _pygame
+                pygame = _pygame
+                PYGAME_AVAILABLE = True
+            except ImportError:
+                PYGAME_AVAILABLE = False
+                print("[SOUND] pygame not available. Install with: pip install pygame")
+    return PYGAME_AVAILABLE
 
 
 class SoundManager:
@@ -33,9 +47,16 @@ class SoundManager:
         self.button_volume = 0.7  # Button volume (70%)
         self.music_playing = False
         
-        # Initialize pygame if available
-        if PYGAME_AVAILABLE:
-            self._init_pygame()
+        # pygame mixer được khởi tạo khi phát âm thanh lần đầu
+        self._initialized = False
+    
+    def _ensure_initialized(self) -> bool:
+        """Import pygame và khởi tạo mixer ở lần dùng đầu tiên"""
+        if not self._initialized:
+            self._initialized = True
+            if load_pygame():
+                self._init_pygame()
+        return self.sound_enabled
     
     def _init_pygame(self):
         """Initialize pygame mixer with optimized settings"""
@@ -107,17 +128,18 @@ class SoundManager:
     
     def initialize(self):
         """Initialize sound system (for backward compatibility)"""
-        if not PYGAME_AVAILABLE:
+        if not load_pygame():
             print("[SOUND] pygame not available, sound system disabled")
             return
         
+        self._initialized = True
         if not self.sound_enabled:
             self._init_pygame()
     
     # Button sound methods
     def play_button_main(self):
         """Play main button click sound (button_1.mp3)"""
-        if self.sound_enabled and self.button_main_sound:
+        if self._ensure_initialized() and self.button_main_sound:
             try:
                 self.button_main_sound.play()
             except Exception as e:
@@ -125,7 +147,7 @@ class SoundManager:
     
     def play_button_secondary(self):
         """Play secondary button click sound (button_2.mp3)"""
-        if self.sound_enabled and self.button_secondary_sound:
+        if self._ensure_initialized() and self.button_secondary_sound:
             try:
                 self.button_secondary_sound.play()
             except Exception as e:
@@ -133,7 +155,7 @@ class SoundManager:
     
     def play_button_stat(self):
         """Play stats button click sound (button_stat.mp3)"""
-        if self.sound_enabled and self.button_stat_sound:
+        if self._ensure_initialized() and self.button_stat_sound:
             try:
                 self.button_stat_sound.play()
             except Exception as e:
@@ -159,7 +181,7 @@ class SoundManager:
     
     def play_session_complete(self):
         """Play session completion sound (rang.mp3)"""
-        if self.sound_enabled and self.completion_sound:
+        if self._ensure_initialized() and self.completion_sound:
             try:
                 self.completion_sound.play()
                 print("[SOUND] Playing session completion sound")
@@ -169,7 +191,7 @@ class SoundManager:
     # Background music methods
     def start_background_music(self):
         """Start background music (whitenoise_1.mp3) with loop"""
-        if not self.sound_enabled or not self.background_music_file:
+        if not self._ensure_initialized() or not self.background_music_file:
             return
         
         try:
@@ -305,7 +327,7 @@ class SoundManager:
     
     def is_music_available(self):
         """Check if background music is available"""
-        return self.sound_enabled and self.background_music_file is not None
+        return self._ensure_initialized() and self.background_music_file is not None
     
     def is_music_playing(self):
         """Check if music is currently playing"""
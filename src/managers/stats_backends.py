@@ -0,0 +1,814 @@
+"""
+Stats Backends - Các backend lưu trữ cho DailyStatsManager (JSON snapshot hoặc SQLite)
+"""
+
+import json
+import os
+import sqlite3
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+from datetime import date
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from .persistence_worker import PersistenceWorker
+from .stats_store import (
+    ACTIVE_DAYS, COLUMNS, PREFIX_COLUMNS, TIME_COLUMNS,
+    DailyStatsStore, DayStats, _YearBlock, _decode_time, _encode_time
+)
+
+try:
+    from config import STATS_BACKEND as DEFAULT_STATS_BACKEND
+except ImportError:
+    DEFAULT_STATS_BACKEND = "json"
+
+# Key chứa metadata trong snapshot/shard (không phải một ngày)
+META_KEY = "_meta"
+
+# Số shard năm tối đa nằm trong bộ nhớ cùng lúc
+MAX_RESIDENT_YEARS = 3
+
+# File tóm tắt các shard trong thư mục daily_stats/
+SHARD_INDEX_NAME = "index.json"
+
+# Phiên bản schema của record ngày, ghi trong _meta.schema_version
+# (file không có schema_version là dữ liệu v1 cũ)
+SCHEMA_VERSION = 2
+
+
+def _upgrade_v1_record(record: Dict[str, Any], date_key: str) -> Dict[str, Any]:
+    """v1 -> v2: total_study_time thành study_time, bổ sung các trường còn thiếu"""
+    upgraded = {
+        "date": record.get("date", date_key),
+        "study_time": record.get("study_time", record.get("total_study_time", 0))
+    }
+    for name in COLUMNS[1:]:
+        upgraded[name] = record.get(name, 0)
+    for name in TIME_COLUMNS:
+        upgraded[name] = record.get(name)
+    return upgraded
+
+
+# version -> hàm nâng cấp một record từ version đó lên version kế tiếp
+SCHEMA_MIGRATIONS: Dict[int, Callable[[Dict[str, Any], str], Dict[str, Any]]] = {
+    1: _upgrade_v1_record,
+}
+
+
+def migrate_records(records: Dict[str, Dict[str, Any]], from_version: int) -> Dict[str, Dict[str, Any]]:
+    """Nâng cấp hàng loạt các record {YYYY-MM-DD: record} từ from_version lên SCHEMA_VERSION"""
+    for version in range(from_version, SCHEMA_VERSION):
+        upgrade = SCHEMA_MIGRATIONS[version]
+        records = {date_key: upgrade(record, date_key) for date_key, record in records.items()}
+    return records
+
+
+class SqliteStatsStore:
+    """
+    DailyStatsStore-compatible store backed by a local SQLite database.
+
+    One row per day keyed by the day ordinal (the INTEGER PRIMARY KEY is the
+    date index), so range queries and aggregates are answered by SQL over the
+    index instead of holding the whole history in memory.
+
+    The connection runs in autocommit mode: single statements commit at once
+    and grouped writes use ``transaction()``, which commits when the block
+    ends. The write lock is therefore only held for the duration of one
+    change, so other processes can open the same database.
+
+    The connection may be used from any thread, but not concurrently: callers
+    serialize access (MultiTimerHost does so with its lock).
+    """
+
+    def __init__(self, db_file: str):
+        self.db_file = db_file
+        # Người dùng tự tuần tự hóa truy cập (vd lock của MultiTimerHost) - cho phép dùng từ thread khác
+        self._conn = sqlite3.connect(db_file, isolation_level=None, check_same_thread=False)
+        try:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            columns = ", ".join(f"{name} INTEGER NOT NULL DEFAULT 0" for name in COLUMNS + TIME_COLUMNS)
+            self._conn.execute(f"CREATE TABLE IF NOT EXISTS daily_stats (day INTEGER PRIMARY KEY, {columns})")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        except sqlite3.Error:
+            self._conn.close()
+            raise
+
+    @staticmethod
+    def _column(name: str) -> str:
+        """Kiểm tra tên cột trước khi đưa vào câu SQL"""
+        if name not in COLUMNS and name not in TIME_COLUMNS:
+            raise KeyError(name)
+        return name
+
+    def _scalar(self, sql: str, *params):
+        row = self._conn.execute(sql, params).fetchone()
+        return row[0] if row else None
+
+    # === Meta / transaction ===
+
+    def get_meta(self, key: str, default: Any = None) -> Any:
+        """Đọc một giá trị metadata (JSON)"""
+        value = self._scalar("SELECT value FROM meta WHERE key = ?", key)
+        return default if value is None else json.loads(value)
+
+    def set_meta(self, key: str, value: Any):
+        """Ghi một giá trị metadata"""
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    @contextmanager
+    def transaction(self):
+        """Gom các lệnh ghi trong khối vào một transaction, commit ngay khi ra khỏi khối"""
+        if self._conn.in_transaction:
+            yield  # Khối lồng nhau - dùng transaction bên ngoài
+            return
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._conn.rollback()
+            raise
+        self._conn.commit()
+
+    def commit(self):
+        """Commit các thay đổi đang chờ (nếu có)"""
+        if self._conn.in_transaction:
+            self._conn.commit()
+
+    @property
+    def in_transaction(self) -> bool:
+        """Có thay đổi chưa commit hay không"""
+        return self._conn.in_transaction
+
+    def close(self):
+        """Commit và đóng kết nối"""
+        try:
+            self.commit()
+            self._conn.close()
+        except sqlite3.Error as e:
+            print(f"Error closing stats database: {e}")
+
+    # === Locating days ===
+
+    def __len__(self) -> int:
+        return self._scalar("SELECT COUNT(*) FROM daily_stats")
+
+    def has_day(self, ordinal: int) -> bool:
+        """Ngày có record hay không"""
+        return self._scalar("SELECT 1 FROM daily_stats WHERE day = ?", ordinal) is not None
+
+    def ordinals(self) -> Iterator[int]:
+        """Duyệt các ngày có record theo thứ tự thời gian"""
+        for (ordinal,) in self._conn.execute("SELECT day FROM daily_stats ORDER BY day").fetchall():
+            yield ordinal
+
+    def years(self) -> List[int]:
+        """Các năm có ít nhất một ngày có record (nhảy theo index, mỗi năm một lookup)"""
+        years = []
+        ordinal = self.first_ordinal()
+        while ordinal is not None:
+            year = date.fromordinal(ordinal).year
+            years.append(year)
+            ordinal = self._scalar("SELECT MIN(day) FROM daily_stats WHERE day > ?",
+                                   date(year, 12, 31).toordinal())
+        return years
+
+    def first_ordinal(self) -> Optional[int]:
+        """Ngày có record sớm nhất"""
+        return self._scalar("SELECT MIN(day) FROM daily_stats")
+
+    def last_ordinal(self) -> Optional[int]:
+        """Ngày có record muộn nhất"""
+        return self._scalar("SELECT MAX(day) FROM daily_stats")
+
+    # === Mutations ===
+
+    def ensure_day(self, ordinal: int):
+        """Tạo record rỗng cho ngày nếu chưa có"""
+        self._conn.execute("INSERT OR IGNORE INTO daily_stats (day) VALUES (?)", (ordinal,))
+
+    def remove_day(self, ordinal: int):
+        """Xóa record của một ngày"""
+        self._conn.execute("DELETE FROM daily_stats WHERE day = ?", (ordinal,))
+
+    def get(self, ordinal: int, column: str) -> int:
+        """Lấy giá trị một cột của một ngày (0 nếu không có)"""
+        value = self._scalar(f"SELECT {self._column(column)} FROM daily_stats WHERE day = ?", ordinal)
+        return value or 0
+
+    def set(self, ordinal: int, column: str, value: int):
+        """Gán giá trị một cột của một ngày"""
+        self.ensure_day(ordinal)
+        self._conn.execute(f"UPDATE daily_stats SET {self._column(column)} = ? WHERE day = ?", (value, ordinal))
+
+    def add(self, ordinal: int, column: str, amount: int):
+        """Cộng dồn một cột của một ngày"""
+        self.ensure_day(ordinal)
+        name = self._column(column)
+        self._conn.execute(f"UPDATE daily_stats SET {name} = {name} + ? WHERE day = ?", (amount, ordinal))
+
+    def get_time(self, ordinal: int, column: str) -> Optional[str]:
+        """Lấy start_time/last_update dạng ISO"""
+        return _decode_time(self.get(ordinal, column))
+
+    def set_time(self, ordinal: int, column: str, value: Optional[str]):
+        """Gán start_time/last_update từ chuỗi ISO"""
+        self.set(ordinal, column, _encode_time(value))
+
+    def load_day(self, ordinal: int, record: Dict[str, Any]):
+        """Nạp một record dạng dict (schema hiện tại)"""
+        values = [record.get(name) or 0 for name in COLUMNS]
+        values += [_encode_time(record.get(name)) for name in TIME_COLUMNS]
+        names = ", ".join(COLUMNS + TIME_COLUMNS)
+        placeholders = ", ".join("?" * len(values))
+        self._conn.execute(f"INSERT OR REPLACE INTO daily_stats (day, {names}) VALUES (?, {placeholders})",
+                           [ordinal] + values)
+
+    def clear(self):
+        """Xóa toàn bộ dữ liệu"""
+        self._conn.execute("DELETE FROM daily_stats")
+
+    # === Row views ===
+
+    def _row_record(self, row) -> Dict[str, Any]:
+        ordinal = row[0]
+        record = {"date": date.fromordinal(ordinal).isoformat()}
+        record.update(zip(COLUMNS, row[1:1 + len(COLUMNS)]))
+        for name, value in zip(TIME_COLUMNS, row[1 + len(COLUMNS):]):
+            record[name] = _decode_time(value)
+        return record
+
+    def _select_rows(self, where: str = "", params=()):
+        names = ", ".join(COLUMNS + TIME_COLUMNS)
+        return self._conn.execute(f"SELECT day, {names} FROM daily_stats {where} ORDER BY day", params)
+
+    def day_record(self, ordinal: int) -> Dict[str, Any]:
+        """Tạo dict (bản sao) của một ngày theo định dạng lưu trữ"""
+        row = self._select_rows("WHERE day = ?", (ordinal,)).fetchone()
+        if row is None:
+            return self._row_record((ordinal,) + (0,) * (len(COLUMNS) + len(TIME_COLUMNS)))
+        return self._row_record(row)
+
+    @staticmethod
+    def _row_stats(row) -> DayStats:
+        ordinal, *values = row
+        times = [_decode_time(value) for value in values[len(COLUMNS):]]
+        return DayStats(date.fromordinal(ordinal).isoformat(), *values[:len(COLUMNS)], *times)
+
+    def day_stats(self, ordinal: int) -> DayStats:
+        """DayStats (read-only) của một ngày"""
+        row = self._select_rows("WHERE day = ?", (ordinal,)).fetchone()
+        if row is None:
+            return DayStats(date.fromordinal(ordinal).isoformat())
+        return self._row_stats(row)
+
+    def range_days(self, start: int, end: int) -> Dict[int, DayStats]:
+        """DayStats của các ngày có record trong khoảng, dạng {ordinal: DayStats}"""
+        return {row[0]: self._row_stats(row)
+                for row in self._select_rows("WHERE day BETWEEN ? AND ?", (start, end))}
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        """Xuất toàn bộ dữ liệu dạng {YYYY-MM-DD: record} để ghi JSON"""
+        return {record["date"]: record for record in map(self._row_record, self._select_rows())}
+
+    # === Range queries (inclusive ordinals) ===
+
+    def column_slice(self, column: str, start: int, end: int) -> array:
+        """Giá trị một cột trong khoảng ngày, dạng array liên tục"""
+        values = array('l', [0]) * max(0, end - start + 1)
+        rows = self._conn.execute(
+            f"SELECT day, {self._column(column)} FROM daily_stats WHERE day BETWEEN ? AND ?", (start, end))
+        for ordinal, value in rows:
+            values[ordinal - start] = value
+        return values
+
+    def present_slice(self, start: int, end: int) -> bytearray:
+        """Cờ có-record của các ngày trong khoảng"""
+        flags = bytearray(max(0, end - start + 1))
+        for (ordinal,) in self._conn.execute("SELECT day FROM daily_stats WHERE day BETWEEN ? AND ?", (start, end)):
+            flags[ordinal - start] = 1
+        return flags
+
+    def range_sum(self, column: str, start: int, end: int) -> int:
+        """Tổng một cột (hoặc ACTIVE_DAYS) trong khoảng ngày"""
+        return self.range_totals(start, end)[column]
+
+    def range_totals(self, start: int, end: int) -> Dict[str, int]:
+        """Tổng mọi cột trong khoảng ngày bằng một câu aggregate"""
+        sums = ", ".join(f"TOTAL({name})" for name in COLUMNS)
+        row = self._conn.execute(
+            f"SELECT {sums}, TOTAL(study_time > 0) FROM daily_stats WHERE day BETWEEN ? AND ?",
+            (start, end)).fetchone()
+        return {name: int(value) for name, value in zip(PREFIX_COLUMNS, row)}
+
+    def active_days(self, start: int, end: int) -> int:
+        """Số ngày có học (study_time > 0) trong khoảng"""
+        return self.range_sum(ACTIVE_DAYS, start, end)
+
+    def best_days(self, start: int, end: int, top_n: int) -> List[int]:
+        """Ordinal của top N ngày học nhiều nhất (bằng nhau thì ngày sớm hơn trước)"""
+        rows = self._conn.execute(
+            "SELECT day FROM daily_stats WHERE day BETWEEN ? AND ? AND study_time > 0 "
+            "ORDER BY study_time DESC, day LIMIT ?", (start, end, top_n))
+        return [ordinal for (ordinal,) in rows]
+
+
+class ShardedStatsStore(DailyStatsStore):
+    """
+    DailyStatsStore whose year blocks are loaded on demand from per-year shards.
+
+    ``loader(year)`` returns ``({ordinal: record}, journal_seq)`` for a shard
+    the first time a query touches that year. At most ``max_resident_years``
+    blocks stay in memory (least recently used are evicted first); the
+    current year and years with unsaved changes are never evicted.
+
+    ``shard_info`` keeps a small summary per year (day count, first/last day
+    and column totals), kept from evicted blocks and loaded from the shard
+    index, so the day count, first/last day and totals over whole years are
+    answered without loading those shards.
+    """
+
+    def __init__(self, loader: Callable[[int], Tuple[Dict[int, Dict[str, Any]], int]],
+                 max_resident_years: int = MAX_RESIDENT_YEARS):
+        super().__init__()
+        self._blocks: "OrderedDict[int, _YearBlock]" = OrderedDict()
+        self._loader = loader
+        self.max_resident_years = max_resident_years
+        self.shard_years: Set[int] = set()  # Các năm có dữ liệu (trên đĩa hoặc trong bộ nhớ)
+        self.shard_seqs: Dict[int, int] = {}  # year -> journal_seq mà shard đã bao gồm
+        self.dirty_years: Set[int] = set()  # Các năm có thay đổi chưa lưu
+        self.shard_info: Dict[int, Dict[str, Any]] = {}  # year -> tóm tắt của các năm không nằm trong bộ nhớ
+
+    def reset(self, years, shard_info: Optional[Dict[int, Dict[str, Any]]] = None):
+        """Bỏ mọi block đã nạp, chỉ giữ danh sách năm có shard (và tóm tắt của chúng nếu có)"""
+        super().clear()
+        self.shard_years = set(years)
+        self.shard_seqs.clear()
+        self.dirty_years.clear()
+        self.shard_info = {year: info for year, info in (shard_info or {}).items() if year in self.shard_years}
+
+    @staticmethod
+    def _block_info(block: _YearBlock) -> Dict[str, Any]:
+        """Tóm tắt một block: số ngày, ngày đầu/cuối (ordinal) và tổng các cột"""
+        return {
+            "days": block.day_count,
+            "first": block.base + block.present.find(1),
+            "last": block.base + block.present.rfind(1),
+            "totals": dict(block.totals)
+        }
+
+    def year_info(self, year: int) -> Optional[Dict[str, Any]]:
+        """Tóm tắt của một năm: từ block nếu đang nạp, từ shard index nếu có, nếu không thì nạp shard"""
+        block = self._blocks.get(year)
+        if block is None:
+            info = self.shard_info.get(year)
+            if info is not None or year not in self.shard_years:
+                return info
+            block = self._get_block(year)  # Shard chưa có trong index (dữ liệu cũ) - nạp một lần
+        if block is None or block.day_count == 0:
+            return None
+        return self._block_info(block)
+
+    def preload(self, year: int):
+        """Nạp trước block của một năm (nếu năm đó có dữ liệu)"""
+        self._get_block(year)
+
+    def _get_block(self, year: int, create: bool = False) -> Optional[_YearBlock]:
+        """Block của một năm: lấy từ bộ nhớ, nạp từ shard, hoặc tạo mới"""
+        block = self._blocks.get(year)
+        if block is not None:
+            self._blocks.move_to_end(year)
+            return block
+
+        if year in self.shard_years:
+            block = self._load_year(year)
+        elif create:
+            block = super()._get_block(year, create=True)
+        if block is not None:
+            self._evict(keep=year)
+        return block
+
+    def _load_year(self, year: int) -> _YearBlock:
+        """Nạp một shard vào block mới"""
+        records, journal_seq = self._loader(year)
+        block = super()._get_block(year, create=True)
+        for ordinal, record in records.items():
+            index = ordinal - block.base
+            if not block.present[index]:
+                block.present[index] = 1
+                block.day_count += 1
+                self._day_count += 1
+            self._fill(block, index, record)
+        self.shard_seqs[year] = journal_seq
+        if block.day_count == 0:
+            self.shard_years.discard(year)
+        return block
+
+    def _evict(self, keep: int):
+        """Bỏ các block ít dùng nhất khi vượt quá max_resident_years"""
+        excess = len(self._blocks) - self.max_resident_years
+        if excess <= 0:
+            return
+        pinned = {keep, date.today().year} | self.dirty_years
+        for year in list(self._blocks):
+            if excess <= 0:
+                break
+            if year in pinned:
+                continue
+            block = self._blocks.pop(year)
+            self._day_count -= block.day_count
+            if block.day_count:
+                self.shard_info[year] = self._block_info(block)
+            excess -= 1
+
+    def __len__(self) -> int:
+        """Tổng số ngày có record, không cần nạp shard"""
+        return sum(info["days"] for info in map(self.year_info, self.years()) if info)
+
+    def first_ordinal(self) -> Optional[int]:
+        """Ngày có record sớm nhất (chỉ đọc tóm tắt năm đầu tiên)"""
+        for year in self.years():
+            info = self.year_info(year)
+            if info:
+                return info["first"]
+        return None
+
+    def last_ordinal(self) -> Optional[int]:
+        """Ngày có record muộn nhất (chỉ đọc tóm tắt năm cuối cùng)"""
+        for year in reversed(self.years()):
+            info = self.year_info(year)
+            if info:
+                return info["last"]
+        return None
+
+    def range_sum(self, column: str, start: int, end: int) -> int:
+        """
+        Như DailyStatsStore.range_sum; với năm chưa nạp mà khoảng chứa trọn (hoặc không chạm)
+        các ngày có dữ liệu của năm đó thì dùng tổng trong tóm tắt thay vì nạp shard.
+        """
+        if start > end:
+            return 0
+        total = 0
+        for year in range(date.fromordinal(start).year, date.fromordinal(end).year + 1):
+            if year not in self.shard_years:
+                continue
+            info = self.shard_info.get(year) if year not in self._blocks else None
+            if info is not None and start <= info["first"] and end >= info["last"]:
+                total += info["totals"][column]
+            elif info is not None and (end < info["first"] or start > info["last"]):
+                continue
+            else:
+                year_start = date(year, 1, 1).toordinal()
+                year_end = date(year, 12, 31).toordinal()
+                total += super().range_sum(column, max(start, year_start), min(end, year_end))
+        return total
+
+    def years(self) -> List[int]:
+        """Các năm có dữ liệu, không cần nạp shard"""
+        return sorted(self.shard_years)
+
+    def _mark_dirty(self, ordinal: int):
+        """Đánh dấu năm của ngày cần lưu"""
+        year = date.fromordinal(ordinal).year
+        self.shard_years.add(year)
+        self.dirty_years.add(year)
+
+    def ensure_day(self, ordinal: int):
+        """Tạo record rỗng cho ngày nếu chưa có (chỉ đánh dấu năm cần lưu khi thực sự tạo)"""
+        if self.has_day(ordinal):
+            return
+        super().ensure_day(ordinal)
+        self._mark_dirty(ordinal)
+
+    def set(self, ordinal: int, column: str, value: int):
+        super().set(ordinal, column, value)
+        self._mark_dirty(ordinal)
+
+    def add(self, ordinal: int, column: str, amount: int):
+        super().add(ordinal, column, amount)
+        self._mark_dirty(ordinal)
+
+    def set_time(self, ordinal: int, column: str, value: Optional[str]):
+        super().set_time(ordinal, column, value)
+        self._mark_dirty(ordinal)
+
+    def load_day(self, ordinal: int, record: Dict[str, Any]):
+        super().load_day(ordinal, record)
+        self._mark_dirty(ordinal)
+
+    def remove_day(self, ordinal: int):
+        """Xóa record của một ngày (đánh dấu năm cần lưu)"""
+        if not self.has_day(ordinal):
+            return
+        year = date.fromordinal(ordinal).year
+        super().remove_day(ordinal)
+        self.dirty_years.add(year)
+        if year not in self._blocks:
+            self.shard_years.discard(year)
+            self.shard_info.pop(year, None)
+
+    def clear(self):
+        """Xóa toàn bộ dữ liệu (các shard bị xóa ở lần lưu tiếp theo)"""
+        self.dirty_years |= self.shard_years
+        self.shard_years.clear()
+        self.shard_info.clear()
+        super().clear()
+
+    def year_records(self, year: int) -> Dict[str, Dict[str, Any]]:
+        """Các record của một năm đang nằm trong bộ nhớ, dạng {YYYY-MM-DD: record}"""
+        block = self._blocks.get(year)
+        if block is None or block.day_count == 0:
+            return {}
+        return {date.fromordinal(block.base + index).isoformat(): self.day_record(block.base + index)
+                for index, flag in enumerate(block.present) if flag}
+
+
+class JsonStatsBackend:
+    """
+    Lịch sử chia theo năm thành ``daily_stats/YYYY.json``; chỉ năm hiện tại luôn
+    nằm trong bộ nhớ, các năm khác được nạp khi có truy vấn chạm tới.
+    """
+
+    name = "json"
+
+    def __init__(self, data_folder: str, persistence: PersistenceWorker):
+        self.stats_file = os.path.join(data_folder, "daily_stats")  # Thư mục chứa các shard
+        self.legacy_file = os.path.join(data_folder, "daily_stats.json")
+        self.persistence = persistence
+        self.store = ShardedStatsStore(self._read_shard)
+        self._index_stale = False  # Có shard chưa nằm trong index (dữ liệu trước khi có index)
+
+    def shard_path(self, year: int) -> str:
+        """Đường dẫn shard của một năm"""
+        return os.path.join(self.stats_file, f"{year}.json")
+
+    @property
+    def index_path(self) -> str:
+        """File tóm tắt các shard (số ngày, ngày đầu/cuối, tổng mỗi năm)"""
+        return os.path.join(self.stats_file, SHARD_INDEX_NAME)
+
+    def _shard_years_on_disk(self) -> Set[int]:
+        """Các năm đã có file shard"""
+        years = set()
+        if os.path.isdir(self.stats_file):
+            for name in os.listdir(self.stats_file):
+                stem, ext = os.path.splitext(name)
+                if ext == ".json" and stem.isdigit():
+                    years.add(int(stem))
+        return years
+
+    def load(self) -> int:
+        """
+        Chuyển daily_stats.json cũ sang shard (một lần), nạp năm hiện tại và năm mới
+        nhất; trả về journal_seq lớn nhất đã được lưu.
+        """
+        if os.path.exists(self.legacy_file) and not self._shard_years_on_disk():
+            self._migrate_legacy()
+
+        years = self._shard_years_on_disk()
+        shard_info = self._read_index()
+        self._index_stale = bool(years - set(shard_info))
+        self.store.reset(years, shard_info)
+        self.store.preload(date.today().year)
+        if years:
+            self.store.preload(max(years))
+        return max(self.store.shard_seqs.values(), default=0)
+
+    def needs_replay(self, record: Dict[str, Any]) -> bool:
+        """Record journal chưa nằm trong shard của năm tương ứng"""
+        try:
+            year = date.fromisoformat(record.get("date")).year
+        except (TypeError, ValueError):
+            return False
+        self.store.preload(year)
+        return record.get("seq", 0) > self.store.shard_seqs.get(year, 0)
+
+    def _read_shard(self, year: int) -> Tuple[Dict[int, Dict[str, Any]], int]:
+        """
+        Đọc một shard (ưu tiên bản đang chờ worker ghi). Shard có schema cũ được
+        nâng cấp một lần tại đây và đánh dấu để ghi lại ở lần lưu tiếp theo.
+        """
+        path = self.shard_path(year)
+        data = None
+        if self.persistence.is_pending(path):
+            data = self.persistence.pending_data(path)
+        elif os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Error loading stats shard {path}: {e}")
+
+        data = dict(data or {})
+        meta = data.pop(META_KEY, None) or {}
+        version = meta.get("schema_version", 1)
+        if data and version < SCHEMA_VERSION:
+            data = migrate_records(data, version)
+            self.store.dirty_years.add(year)
+
+        records = {}
+        for date_key, day_stats in data.items():
+            try:
+                records[date.fromisoformat(date_key).toordinal()] = day_stats
+            except ValueError:
+                continue
+        return records, meta.get("journal_seq", 0)
+
+    def _read_index(self) -> Dict[int, Dict[str, Any]]:
+        """Đọc shard index (ưu tiên bản đang chờ ghi); thiếu hoặc lỗi thì trả về rỗng"""
+        path = self.index_path
+        data = None
+        if self.persistence.is_pending(path):
+            data = self.persistence.pending_data(path)
+        elif os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Error loading stats shard index {path}: {e}")
+
+        shard_info = {}
+        for year, entry in (data or {}).items():
+            try:
+                shard_info[int(year)] = {
+                    "days": entry["days"],
+                    "first": date.fromisoformat(entry["first"]).toordinal(),
+                    "last": date.fromisoformat(entry["last"]).toordinal(),
+                    "totals": {name: entry["totals"].get(name, 0) for name in PREFIX_COLUMNS}
+                }
+            except (KeyError, TypeError, ValueError, AttributeError):
+                continue
+        return shard_info
+
+    def _write_index(self):
+        """Ghi tóm tắt mọi năm (shard chưa có trong index được nạp một lần để tính)"""
+        index = {}
+        for year in self.store.years():
+            info = self.store.year_info(year)
+            if info:
+                index[str(year)] = {
+                    "days": info["days"],
+                    "first": date.fromordinal(info["first"]).isoformat(),
+                    "last": date.fromordinal(info["last"]).isoformat(),
+                    "totals": info["totals"]
+                }
+        self.persistence.submit(self.index_path, index)
+        self._index_stale = False
+
+    def _migrate_legacy(self):
+        """Tách daily_stats.json cũ thành các shard theo năm (giữ bản gốc dạng .migrated)"""
+        try:
+            with open(self.legacy_file, 'r', encoding='utf-8') as f:
+                stats = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Error loading legacy daily stats: {e}")
+            return
+
+        meta = stats.pop(META_KEY, None) or {}
+        records = migrate_records(stats, meta.get("schema_version", 1))
+        shard_meta = {"journal_seq": meta.get("journal_seq", 0), "schema_version": SCHEMA_VERSION}
+        shards: Dict[int, Dict[str, Any]] = {}
+        for date_key, day_stats in sorted(records.items()):
+            try:
+                year = date.fromisoformat(date_key).year
+            except ValueError:
+                continue
+            shard = shards.setdefault(year, {META_KEY: dict(shard_meta)})
+            shard[date_key] = day_stats
+
+        for year, shard in shards.items():
+            self.persistence.submit(self.shard_path(year), shard)
+        self.persistence.flush()
+        try:
+            os.replace(self.legacy_file, self.legacy_file + ".migrated")
+        except OSError as e:
+            print(f"Error renaming legacy daily stats: {e}")
+
+    def transaction(self):
+        """Thay đổi nằm trong bộ nhớ tới lần lưu shard - không cần transaction"""
+        return nullcontext()
+
+    def mark_applied(self, seq: int):
+        """Shard chỉ ghi nhận journal_seq khi được lưu (xem save)"""
+        pass
+
+    def has_unsaved_changes(self) -> bool:
+        """Có năm nào thay đổi (hoặc vừa nâng cấp schema, hoặc index còn thiếu) chưa được lưu"""
+        return bool(self.store.dirty_years) or self._index_stale
+
+    def save(self, journal_seq: int, on_written: Callable[[], None]):
+        """Chỉ ghi lại shard của các năm có thay đổi (thường là năm hiện tại)"""
+        dirty_years = sorted(self.store.dirty_years)
+        self.store.dirty_years.clear()
+        if not dirty_years:
+            if self._index_stale:
+                self._write_index()
+            on_written()
+            return
+
+        # on_written chỉ chạy khi mọi shard đã ghi xong (callback chạy trên worker thread)
+        remaining = [len(dirty_years)]
+
+        def shard_written():
+            remaining[0] -= 1
+            if remaining[0] == 0:
+                on_written()
+
+        for year in dirty_years:
+            records = self.store.year_records(year)
+            shard = None
+            if records:
+                shard = {META_KEY: {"journal_seq": journal_seq, "schema_version": SCHEMA_VERSION}}
+                shard.update(records)
+            self.persistence.submit(self.shard_path(year), shard, on_written=shard_written)
+            self.store.shard_seqs[year] = journal_seq
+        # Index ghi sau các shard; năm đang nằm trong bộ nhớ luôn được tính lại từ block
+        self._write_index()
+
+    def close(self):
+        """Không giữ tài nguyên nào"""
+        pass
+
+
+class SqliteStatsBackend:
+    """Lịch sử trong ``daily_stats.db`` (SQLite, WAL), chỉ đọc những gì được truy vấn"""
+
+    name = "sqlite"
+
+    def __init__(self, data_folder: str, persistence: PersistenceWorker):
+        self.data_folder = data_folder
+        self.stats_file = os.path.join(data_folder, "daily_stats.db")
+        self.persistence = persistence
+        self.store = SqliteStatsStore(self.stats_file)
+        self._journal_seq = 0
+
+    def load(self) -> int:
+        """Mở database (import dữ liệu JSON ở lần đầu), trả về journal_seq đã commit"""
+        if not self.store.get_meta("imported_legacy", False):
+            self._import_legacy()
+        self._journal_seq = self.store.get_meta("journal_seq", 0)
+        return self._journal_seq
+
+    def needs_replay(self, record: Dict[str, Any]) -> bool:
+        """Record journal chưa được commit vào database"""
+        return record.get("seq", 0) > self._journal_seq
+
+    def _import_legacy(self):
+        """Chuyển dữ liệu từ các shard JSON (hoặc daily_stats.json cũ) sang database (một lần)"""
+        legacy = JsonStatsBackend(self.data_folder, self.persistence)
+        journal_seq = legacy.load()
+        with self.store.transaction():
+            for ordinal in legacy.store.ordinals():
+                self.store.load_day(ordinal, legacy.store.day_record(ordinal))
+            self.store.set_meta("journal_seq", journal_seq)
+            self.store.set_meta("schema_version", SCHEMA_VERSION)
+            self.store.set_meta("imported_legacy", True)
+
+    def transaction(self):
+        """Transaction ngắn cho một nhóm record journal (commit khi ra khỏi khối)"""
+        return self.store.transaction()
+
+    def mark_applied(self, seq: int):
+        """
+        Ghi journal_seq trong cùng transaction với thay đổi của record đó, để replay
+        sau crash không cộng lại record đã commit.
+        """
+        self.store.set_meta("journal_seq", seq)
+        self._journal_seq = seq
+
+    def has_unsaved_changes(self) -> bool:
+        """Mọi thay đổi đã được commit ngay khi ghi"""
+        return self.store.in_transaction
+
+    def save(self, journal_seq: int, on_written: Callable[[], None]):
+        """
+        Dữ liệu đã được commit theo từng record; journal chỉ được bỏ khi database đã
+        chứa mọi record tới journal_seq (record ghi lỗi sẽ được replay ở lần mở sau).
+        """
+        if self._journal_seq >= journal_seq:
+            on_written()
+
+    def close(self):
+        """Đóng database"""
+        self.store.close()
+
+
+STATS_BACKENDS = {
+    JsonStatsBackend.name: JsonStatsBackend,
+    SqliteStatsBackend.name: SqliteStatsBackend,
+}
+
+
+def create_stats_backend(name: Optional[str], data_folder: str, persistence: PersistenceWorker):
+    """Tạo backend theo tên (mặc định lấy STATS_BACKEND trong config)"""
+    name = name or DEFAULT_STATS_BACKEND
+    backend_class = STATS_BACKENDS.get(name)
+    if backend_class is None:
+        print(f"Unknown stats backend '{name}', using '{JsonStatsBackend.name}'")
+        backend_class = JsonStatsBackend
+    try:
+        return backend_class(data_folder, persistence)
+    except sqlite3.Error as e:
+        print(f"❌ Could not open stats database in {data_folder}: {e}")
+        print(f"⚠️ Using '{JsonStatsBackend.name}' stats backend for this run")
+        return JsonStatsBackend(data_folder, persistence)
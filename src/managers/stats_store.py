@@ -0,0 +1,443 @@
+"""
+Stats Store Module - Columnar, array-backed storage for daily statistics
+"""
+
+import heapq
+from array import array
+from collections.abc import Mapping
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional
+
+# Các cột số liệu của mỗi ngày
+COLUMNS = ("study_time", "break_time", "sessions_completed", "tasks_completed")
+
+# Cột ảo: số ngày có học (study_time > 0), chỉ tồn tại trong prefix-sum index
+ACTIVE_DAYS = "active_days"
+
+# Các cột có prefix-sum index
+PREFIX_COLUMNS = COLUMNS + (ACTIVE_DAYS,)
+
+# Các cột thời điểm (lưu dạng micro giây, 0 = None)
+TIME_COLUMNS = ("start_time", "last_update")
+
+# Số ô trong một block năm (đủ cho năm nhuận)
+DAYS_PER_BLOCK = 366
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_NO_TIME = 0
+
+
+def _encode_time(value: Optional[str]) -> int:
+    """Chuyển ISO timestamp thành số micro giây (naive, không đổi timezone)"""
+    if not value:
+        return _NO_TIME
+    try:
+        return (datetime.fromisoformat(value) - _EPOCH) // _MICROSECOND
+    except (TypeError, ValueError):
+        return _NO_TIME
+
+
+def _decode_time(value: int) -> Optional[str]:
+    """Chuyển số micro giây về ISO timestamp"""
+    if value == _NO_TIME:
+        return None
+    return (_EPOCH + value * _MICROSECOND).isoformat()
+
+
+def format_duration(seconds: int) -> str:
+    """Format số giây thành HH:MM:SS"""
+    return f"{seconds // 3600:02}:{(seconds % 3600) // 60:02}:{seconds % 60:02}"
+
+
+class DayStats(Mapping):
+    """
+    Immutable, slotted snapshot of one day's statistics.
+
+    Query APIs return these instead of per-day dicts, so results can be
+    shared without defensive copies. They still read like the old dicts
+    (``day["study_time"]``, ``.get``); the formatted strings are computed
+    only when accessed.
+    """
+
+    __slots__ = ("date",) + COLUMNS + TIME_COLUMNS
+
+    _DERIVED = ("formatted_study_time", "formatted_break_time", "display_date")
+    _KEYS = __slots__ + _DERIVED
+
+    def __init__(self, date_key: str, study_time: int = 0, break_time: int = 0,
+                 sessions_completed: int = 0, tasks_completed: int = 0,
+                 start_time: Optional[str] = None, last_update: Optional[str] = None):
+        setter = object.__setattr__
+        setter(self, "date", date_key)
+        setter(self, "study_time", study_time)
+        setter(self, "break_time", break_time)
+        setter(self, "sessions_completed", sessions_completed)
+        setter(self, "tasks_completed", tasks_completed)
+        setter(self, "start_time", start_time)
+        setter(self, "last_update", last_update)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("DayStats is read-only")
+
+    def __delattr__(self, name):
+        raise AttributeError("DayStats is read-only")
+
+    @property
+    def formatted_study_time(self) -> str:
+        return format_duration(self.study_time)
+
+    @property
+    def formatted_break_time(self) -> str:
+        return format_duration(self.break_time)
+
+    @property
+    def display_date(self) -> str:
+        """Ngày dạng "January 05 (Monday)" """
+        return date.fromisoformat(self.date).strftime("%B %d (%A)")
+
+    def __getitem__(self, key):
+        if key in self._KEYS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self._KEYS)
+
+    def __len__(self):
+        return len(self._KEYS)
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"DayStats({fields})"
+
+
+class _YearBlock:
+    """Các cột số liệu của một năm, đánh chỉ số theo (ordinal - ordinal ngày 1/1)"""
+
+    __slots__ = ("year", "base", "length", "columns", "times", "present", "day_count",
+                 "totals", "prefix", "prefix_valid")
+
+    def __init__(self, year: int):
+        self.year = year
+        self.base = date(year, 1, 1).toordinal()
+        self.length = date(year, 12, 31).toordinal() - self.base + 1
+        self.columns = {name: array('l', [0]) * DAYS_PER_BLOCK for name in COLUMNS}
+        self.times = {name: array('q', [_NO_TIME]) * DAYS_PER_BLOCK for name in TIME_COLUMNS}
+        self.present = bytearray(DAYS_PER_BLOCK)  # 1 nếu ngày có record
+        self.day_count = 0
+        # Tổng cả năm, cập nhật tăng dần mỗi lần ghi
+        self.totals = dict.fromkeys(PREFIX_COLUMNS, 0)
+        # prefix[name][k] = tổng các ngày [0, k); chỉ đúng với k <= prefix_valid
+        self.prefix = {name: array('q', [0]) * (DAYS_PER_BLOCK + 1) for name in PREFIX_COLUMNS}
+        self.prefix_valid = DAYS_PER_BLOCK
+
+    def write(self, name: str, index: int, value: int):
+        """Ghi một ô và cập nhật tổng năm + đánh dấu prefix cần tính lại từ index"""
+        column = self.columns[name]
+        old = column[index]
+        if old == value:
+            return
+        column[index] = value
+        self.totals[name] += value - old
+        if name == "study_time":
+            self.totals[ACTIVE_DAYS] += (value > 0) - (old > 0)
+        if index < self.prefix_valid:
+            self.prefix_valid = index
+
+    def prefix_at(self, name: str, k: int) -> int:
+        """Tổng cột name của các ngày [0, k), mở rộng prefix lười nếu cần"""
+        if k > self.prefix_valid:
+            start = self.prefix_valid
+            study = self.columns["study_time"]
+            for prefix_name, prefix in self.prefix.items():
+                if prefix_name == ACTIVE_DAYS:
+                    for i in range(start, k):
+                        prefix[i + 1] = prefix[i] + (study[i] > 0)
+                else:
+                    column = self.columns[prefix_name]
+                    for i in range(start, k):
+                        prefix[i + 1] = prefix[i] + column[i]
+            self.prefix_valid = k
+        return self.prefix[name][k]
+
+    def range_total(self, name: str, lo: int, hi: int) -> int:
+        """Tổng cột name của các ngày [lo, hi)"""
+        if lo == 0 and hi >= self.length:
+            return self.totals[name]
+        return self.prefix_at(name, hi) - self.prefix_at(name, lo)
+
+
+class DailyStatsStore:
+    """
+    Columnar in-memory store for daily statistics.
+
+    Each year is one block of contiguous ``array('l')`` columns indexed by
+    day ordinal, so range sums, monthly aggregates and best-day queries are
+    slice operations instead of per-day dict copies.
+    
+    Every block also keeps running year totals and a lazily extended
+    prefix-sum index, so ``range_sum`` over any span is two prefix lookups
+    per boundary year plus one total per year in between. Appending to the
+    latest day only invalidates the prefix from that day on.
+    """
+
+    def __init__(self):
+        self._blocks: Dict[int, _YearBlock] = {}
+        self._day_count = 0
+
+    # === Locating days ===
+
+    def _get_block(self, year: int, create: bool = False) -> Optional[_YearBlock]:
+        """Block của một năm (tạo mới nếu create=True)"""
+        block = self._blocks.get(year)
+        if block is None and create:
+            block = self._blocks[year] = _YearBlock(year)
+        return block
+
+    def _locate(self, ordinal: int, create: bool = False):
+        """Trả về (block, index) của một ngày, hoặc (None, -1) nếu chưa có block"""
+        block = self._get_block(date.fromordinal(ordinal).year, create)
+        if block is None:
+            return None, -1
+        return block, ordinal - block.base
+
+    def __len__(self) -> int:
+        return self._day_count
+
+    def has_day(self, ordinal: int) -> bool:
+        """Ngày có record hay không"""
+        block, index = self._locate(ordinal)
+        return block is not None and block.present[index] == 1
+
+    def ordinals(self) -> Iterator[int]:
+        """Duyệt các ngày có record theo thứ tự thời gian"""
+        for year in self.years():
+            block = self._get_block(year)
+            if block is None or block.day_count == 0:
+                continue
+            for index, flag in enumerate(block.present):
+                if flag:
+                    yield block.base + index
+
+    def years(self) -> List[int]:
+        """Các năm có ít nhất một ngày có record (tăng dần)"""
+        return sorted(year for year, block in self._blocks.items() if block.day_count > 0)
+
+    def first_ordinal(self) -> Optional[int]:
+        """Ngày có record sớm nhất"""
+        return next(self.ordinals(), None)
+
+    def last_ordinal(self) -> Optional[int]:
+        """Ngày có record muộn nhất"""
+        for year in reversed(self.years()):
+            block = self._get_block(year)
+            if block is None:
+                continue
+            index = block.present.rfind(1)
+            if index >= 0:
+                return block.base + index
+        return None
+
+    # === Mutations ===
+
+    def ensure_day(self, ordinal: int):
+        """Tạo record rỗng cho ngày nếu chưa có"""
+        block, index = self._locate(ordinal, create=True)
+        if not block.present[index]:
+            block.present[index] = 1
+            block.day_count += 1
+            self._day_count += 1
+
+    def remove_day(self, ordinal: int):
+        """Xóa record của một ngày"""
+        block, index = self._locate(ordinal)
+        if block is None or not block.present[index]:
+            return
+        for name in COLUMNS:
+            block.write(name, index, 0)
+        for column in block.times.values():
+            column[index] = _NO_TIME
+        block.present[index] = 0
+        block.day_count -= 1
+        self._day_count -= 1
+        if block.day_count == 0:
+            del self._blocks[block.year]
+
+    def get(self, ordinal: int, column: str) -> int:
+        """Lấy giá trị một cột của một ngày (0 nếu không có)"""
+        block, index = self._locate(ordinal)
+        if block is None:
+            return 0
+        return block.columns[column][index]
+
+    def set(self, ordinal: int, column: str, value: int):
+        """Gán giá trị một cột của một ngày"""
+        self.ensure_day(ordinal)
+        block, index = self._locate(ordinal)
+        block.write(column, index, value)
+
+    def add(self, ordinal: int, column: str, amount: int):
+        """Cộng dồn một cột của một ngày"""
+        self.ensure_day(ordinal)
+        block, index = self._locate(ordinal)
+        block.write(column, index, block.columns[column][index] + amount)
+
+    def get_time(self, ordinal: int, column: str) -> Optional[str]:
+        """Lấy start_time/last_update dạng ISO"""
+        block, index = self._locate(ordinal)
+        if block is None:
+            return None
+        return _decode_time(block.times[column][index])
+
+    def set_time(self, ordinal: int, column: str, value: Optional[str]):
+        """Gán start_time/last_update từ chuỗi ISO"""
+        self.ensure_day(ordinal)
+        block, index = self._locate(ordinal)
+        block.times[column][index] = _encode_time(value)
+
+    def load_day(self, ordinal: int, record: Dict[str, Any]):
+        """Nạp một record dạng dict (schema hiện tại) vào các cột"""
+        self.ensure_day(ordinal)
+        block, index = self._locate(ordinal)
+        self._fill(block, index, record)
+
+    @staticmethod
+    def _fill(block: _YearBlock, index: int, record: Dict[str, Any]):
+        """Ghi các trường của một record vào một ô của block"""
+        for name in COLUMNS:
+            block.write(name, index, record.get(name) or 0)
+        for name in TIME_COLUMNS:
+            block.times[name][index] = _encode_time(record.get(name))
+
+    def clear(self):
+        """Xóa toàn bộ dữ liệu"""
+        self._blocks.clear()
+        self._day_count = 0
+
+    # === Row views ===
+
+    def day_record(self, ordinal: int) -> Dict[str, Any]:
+        """Tạo dict (bản sao) của một ngày theo định dạng lưu trữ"""
+        block, index = self._locate(ordinal)
+        record = {"date": date.fromordinal(ordinal).isoformat()}
+        for name in COLUMNS:
+            record[name] = block.columns[name][index] if block else 0
+        for name in TIME_COLUMNS:
+            record[name] = _decode_time(block.times[name][index]) if block else None
+        return record
+
+    def day_stats(self, ordinal: int) -> DayStats:
+        """DayStats (read-only) của một ngày, đọc thẳng từ các cột"""
+        block, index = self._locate(ordinal)
+        date_key = date.fromordinal(ordinal).isoformat()
+        if block is None:
+            return DayStats(date_key)
+        columns, times = block.columns, block.times
+        return DayStats(
+            date_key,
+            columns["study_time"][index],
+            columns["break_time"][index],
+            columns["sessions_completed"][index],
+            columns["tasks_completed"][index],
+            _decode_time(times["start_time"][index]),
+            _decode_time(times["last_update"][index])
+        )
+
+    def range_days(self, start: int, end: int) -> Dict[int, DayStats]:
+        """DayStats của các ngày có record trong khoảng, dạng {ordinal: DayStats}"""
+        present = self.present_slice(start, end)
+        return {start + offset: self.day_stats(start + offset)
+                for offset, flag in enumerate(present) if flag}
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        """Xuất toàn bộ dữ liệu dạng {YYYY-MM-DD: record} để ghi JSON"""
+        return {date.fromordinal(ordinal).isoformat(): self.day_record(ordinal)
+                for ordinal in self.ordinals()}
+
+    # === Range queries (inclusive ordinals) ===
+
+    def _segments(self, start: int, end: int):
+        """Chia khoảng [start, end] thành các đoạn (block, from, to) theo năm"""
+        if start > end:
+            return
+        for year in range(date.fromordinal(start).year, date.fromordinal(end).year + 1):
+            block = self._get_block(year)
+            year_start = date(year, 1, 1).toordinal()
+            year_end = date(year, 12, 31).toordinal()
+            lo = max(start, year_start) - year_start
+            hi = min(end, year_end) - year_start + 1
+            yield block, lo, hi
+
+    def column_slice(self, column: str, start: int, end: int) -> array:
+        """Giá trị một cột trong khoảng ngày, dạng array liên tục"""
+        values = array('l')
+        for block, lo, hi in self._segments(start, end):
+            if block is None:
+                values.extend(array('l', [0]) * (hi - lo))
+            else:
+                values.extend(block.columns[column][lo:hi])
+        return values
+
+    def present_slice(self, start: int, end: int) -> bytearray:
+        """Cờ có-record của các ngày trong khoảng"""
+        flags = bytearray()
+        for block, lo, hi in self._segments(start, end):
+            flags.extend(block.present[lo:hi] if block else bytes(hi - lo))
+        return flags
+
+    def range_sum(self, column: str, start: int, end: int) -> int:
+        """Tổng một cột (hoặc ACTIVE_DAYS) trong khoảng ngày, dùng prefix-sum index"""
+        return sum(block.range_total(column, lo, hi)
+                   for block, lo, hi in self._segments(start, end) if block is not None)
+
+    def range_totals(self, start: int, end: int) -> Dict[str, int]:
+        """Tổng mọi cột có index trong khoảng ngày"""
+        return {name: self.range_sum(name, start, end) for name in PREFIX_COLUMNS}
+
+    def active_days(self, start: int, end: int) -> int:
+        """Số ngày có học (study_time > 0) trong khoảng"""
+        return self.range_sum(ACTIVE_DAYS, start, end)
+
+    def best_days(self, start: int, end: int, top_n: int) -> List[int]:
+        """Ordinal của top N ngày học nhiều nhất (bằng nhau thì ngày sớm hơn trước)"""
+        study = self.column_slice("study_time", start, end)
+        active = (offset for offset, value in enumerate(study) if value > 0)
+        return [start + offset for offset in heapq.nlargest(top_n, active, key=lambda o: study[o])]
+
+
+class StatsDataView(Mapping):
+    """
+    Read-only ``{YYYY-MM-DD: DayStats}`` mapping served from a DailyStatsStore.
+
+    Values are immutable DayStats snapshots; all changes go through the
+    DailyStatsManager mutators so they are journaled.
+    """
+
+    __slots__ = ("_store",)
+
+    def __init__(self, store: DailyStatsStore):
+        self._store = store
+
+    @staticmethod
+    def _ordinal(key) -> Optional[int]:
+        try:
+            return date.fromisoformat(key).toordinal()
+        except (TypeError, ValueError):
+            return None
+
+    def __getitem__(self, key) -> DayStats:
+        ordinal = self._ordinal(key)
+        if ordinal is None or not self._store.has_day(ordinal):
+            raise KeyError(key)
+        return self._store.day_stats(ordinal)
+
+    def __contains__(self, key):
+        ordinal = self._ordinal(key)
+        return ordinal is not None and self._store.has_day(ordinal)
+
+    def __iter__(self):
+        return (date.fromordinal(ordinal).isoformat() for ordinal in self._store.ordinals())
+
+    def __len__(self):
+        return len(self._store)
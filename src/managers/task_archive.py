@@ -0,0 +1,86 @@
+"""
+Task Archive - Lưu completed tasks cũ theo tháng (cold storage, có thể nén gzip)
+"""
+
+import gzip
+import json
+import os
+import re
+from typing import Any, Dict, Iterable, Iterator, List
+
+# Tên file archive: YYYY-MM.json hoặc YYYY-MM.json.gz
+_ARCHIVE_NAME = re.compile(r"^(\d{4}-\d{2})\.json(\.gz)?$")
+
+
+class TaskArchive:
+    """
+    Monthly archive files for completed tasks, keyed by completion month.
+
+    Archives are only read when history is browsed or exported; the hot task
+    file keeps just the recent completed tasks. Each month is one file,
+    ``YYYY-MM.json`` or ``YYYY-MM.json.gz`` when ``compress`` is set, and
+    either form is readable regardless of the current setting.
+    """
+
+    def __init__(self, folder: str, compress: bool = True):
+        self.folder = folder
+        self.compress = compress
+
+    def month_path(self, month: str, compressed: bool) -> str:
+        """Đường dẫn file archive của một tháng (YYYY-MM)"""
+        return os.path.join(self.folder, f"{month}.json" + (".gz" if compressed else ""))
+
+    def months(self) -> List[str]:
+        """Danh sách các tháng đã có archive (YYYY-MM, tăng dần)"""
+        if not os.path.isdir(self.folder):
+            return []
+        found = set()
+        for name in os.listdir(self.folder):
+            match = _ARCHIVE_NAME.match(name)
+            if match:
+                found.add(match.group(1))
+        return sorted(found)
+
+    def load_month(self, month: str) -> List[Dict[str, Any]]:
+        """Đọc các task đã archive của một tháng"""
+        tasks: List[Dict[str, Any]] = []
+        for compressed in (False, True):
+            path = self.month_path(month, compressed)
+            if not os.path.exists(path):
+                continue
+            try:
+                opener = gzip.open if compressed else open
+                with opener(path, 'rt', encoding='utf-8') as f:
+                    tasks.extend(json.load(f).get('tasks', []))
+            except (OSError, ValueError) as e:
+                print(f"❌ Could not read task archive {path}: {e}")
+        return tasks
+
+    def iter_tasks(self) -> Iterator[Dict[str, Any]]:
+        """Duyệt toàn bộ task đã archive, từ tháng cũ nhất"""
+        for month in self.months():
+            yield from self.load_month(month)
+
+    def add(self, month: str, tasks: Iterable[Dict[str, Any]]) -> int:
+        """
+        Gộp tasks vào archive của tháng (id đã có được ghi đè) và ghi atomic, trả về
+        số task mới. Ghi đồng bộ: dữ liệu phải nằm trên đĩa trước khi bị xóa khỏi file tasks chính.
+        """
+        merged = {task.get('id'): task for task in self.load_month(month)}
+        existing = len(merged)
+        for task in tasks:
+            merged[task.get('id')] = task
+
+        os.makedirs(self.folder, exist_ok=True)
+        path = self.month_path(month, self.compress)
+        temp_file = path + ".tmp"
+        opener = gzip.open if self.compress else open
+        with opener(temp_file, 'wt', encoding='utf-8') as f:
+            json.dump({'month': month, 'tasks': list(merged.values())}, f, ensure_ascii=False)
+        os.replace(temp_file, path)
+
+        # Bỏ file ở định dạng còn lại (khi đổi cấu hình compress)
+        other = self.month_path(month, not self.compress)
+        if os.path.exists(other):
+            os.remove(other)
+        return len(merged) - existing
@@ -4,139 +4,411 @@ Task Manager Module - Manages tasks and completion tracking
 
 import json
 import os
-from datetime import datetime
+from contextlib import contextmanager
+from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional, Callable
 
+from .journal import Journal
+from .ordered_index import OrderedIndexMap
+from .persistence_worker import get_persistence_worker
+from .task_archive import TaskArchive
+
+try:
+    from config import TASK_ARCHIVE_AFTER_DAYS, TASK_ARCHIVE_COMPRESS
+except ImportError:
+    TASK_ARCHIVE_AFTER_DAYS = 30
+    TASK_ARCHIVE_COMPRESS = True
+
+# Số thao tác trong journal trước khi gộp (compact) vào snapshot
+TASK_JOURNAL_COMPACT_THRESHOLD = 200
+
 
 class TaskManager:
-    """Manages task creation, completion, and persistence"""
+    """
+    Manages task creation, completion, and persistence.
+    
+    Active and completed tasks are kept in ordered ``id -> task`` maps
+    (OrderedIndexMap), so lookups by id are O(1) and converting between a
+    row index and an id, completion, deletion and moves are O(log n) while
+    the display order is preserved. Ids come from a persisted monotonic
+    counter and are never reused.
+    
+    Each mutation is appended to ``tasks_data.journal`` as a small operation
+    record (add/complete/reactivate/delete/move/priority/edit/clear) instead
+    of rewriting the whole file; the journal is compacted into the snapshot
+    every ``TASK_JOURNAL_COMPACT_THRESHOLD`` operations and on close, and is
+    replayed on top of the snapshot by ``load_tasks``.
+    
+    Completed tasks older than ``TASK_ARCHIVE_AFTER_DAYS`` are moved into
+    monthly archive files (``task_archive/YYYY-MM.json[.gz]``) at startup;
+    those are only read when history is browsed or exported.
+    
+    Inside ``batch()`` (and the bulk ``add_tasks``/``complete_tasks``/
+    ``delete_tasks``) journal writes and ``on_tasks_updated`` are deferred
+    until the outermost batch ends, so N operations cost one write and one
+    redraw.
+    
+    ``on_task_list_changed(list_name, change, index, task)`` reports each
+    mutation as a row change ("insert"/"delete"/"update" at an index of the
+    "active" or "completed" list, or "reset") so views can update one row
+    instead of redrawing; a batch reports one "reset" per touched list.
+    """
     
     def __init__(self):
-        self.tasks: List[Dict[str, Any]] = []
-        self.completed_tasks: List[Dict[str, Any]] = []
+        self._active = OrderedIndexMap()  # id -> task, theo thứ tự hiển thị
+        self._completed = OrderedIndexMap()  # id -> task, theo thứ tự hoàn thành
+        self.next_id = 1
         self.data_file = os.path.join(os.path.dirname(__file__), "..", "..", "data", "tasks_data.json")
-        self.load_tasks()
+        self.journal = Journal(os.path.splitext(self.data_file)[0] + ".journal")
+        self.archive = TaskArchive(os.path.join(os.path.dirname(self.data_file), "task_archive"),
+                                   compress=TASK_ARCHIVE_COMPRESS)
+        self.archive_after_days = TASK_ARCHIVE_AFTER_DAYS  # None = không archive
+        self.archived_count = 0  # Số task đã chuyển vào archive
+        self._batch_depth = 0
+        self._batch_records: List[Dict[str, Any]] = []  # Record chờ ghi khi batch kết thúc
+        self._batch_updated = False
+        self._batch_changed_lists: List[str] = []  # Danh sách cần "reset" khi batch kết thúc
+        self.persistence = get_persistence_worker()
         
         # Event callbacks
         self.on_task_added: Optional[Callable] = None
         self.on_task_completed: Optional[Callable] = None
         self.on_task_deleted: Optional[Callable] = None
         self.on_tasks_updated: Optional[Callable] = None
+        self.on_task_list_changed: Optional[Callable] = None  # (list_name, change, index, task)
+        
+        self.load_tasks()
+
+    @property
+    def tasks(self) -> List[Dict[str, Any]]:
+        """Danh sách task chưa hoàn thành (theo thứ tự hiển thị)"""
+        return list(self._active.values())
+
+    @property
+    def completed_tasks(self) -> List[Dict[str, Any]]:
+        """Danh sách task đã hoàn thành"""
+        return list(self._completed.values())
+
+    def get_task(self, task_id) -> Optional[Dict[str, Any]]:
+        """Tìm task (active hoặc completed) theo id"""
+        return self._active.get(task_id) or self._completed.get(task_id)
+
+    def get_active_task_at(self, index: int) -> Optional[Dict[str, Any]]:
+        """Task active ở dòng index (None nếu ngoài phạm vi), không sao chép danh sách"""
+        return self._active.value_at(index)
+
+    def get_completed_task_at(self, index: int) -> Optional[Dict[str, Any]]:
+        """Task completed ở dòng index (None nếu ngoài phạm vi)"""
+        return self._completed.value_at(index)
+
+    def _allocate_id(self) -> int:
+        """Cấp id mới, không bao giờ dùng lại id cũ"""
+        task_id = self.next_id
+        self.next_id += 1
+        return task_id
+
+    def _record_operation(self, record: Dict[str, Any]):
+        """Áp dụng một thao tác rồi ghi nó vào journal (compact khi journal đủ dài)"""
+        changes = self._list_changes(record) if self.on_task_list_changed else []
+        result = self._apply_operation(record)
+        self._notify_list_changes(changes)
+        if self._batch_depth:
+            self._batch_records.append(record)
+            return result
+        
+        self.journal.append(record)
+        if self.journal.record_count >= TASK_JOURNAL_COMPACT_THRESHOLD:
+            self.save_tasks()
+        return result
+
+    def _list_changes(self, record: Dict[str, Any]) -> List[tuple]:
+        """Tính các thay đổi dòng (list_name, change, index, task_id) của một thao tác, trước khi áp dụng"""
+        op = record.get("op")
+        task_id = record.get("id")
+        
+        if op == "add":
+            return [("active", "insert", len(self._active), record["task"]['id'])]
+        if op == "complete":
+            return [("active", "delete", self._active.position(task_id), task_id),
+                    ("completed", "insert", len(self._completed), task_id)]
+        if op == "reactivate":
+            return [("completed", "delete", self._completed.position(task_id), task_id),
+                    ("active", "insert", len(self._active), task_id)]
+        if op == "delete":
+            if record.get("completed"):
+                return [("completed", "delete", self._completed.position(task_id), task_id)]
+            return [("active", "delete", self._active.position(task_id), task_id)]
+        if op == "move":
+            first, second = record["from"], record["to"]
+            return [("active", "update", first, self._active.key_at(second)),
+                    ("active", "update", second, self._active.key_at(first))]
+        if op in ("priority", "edit"):
+            return [("active", "update", self._active.position(task_id), task_id)]
+        if op in ("clear_completed", "archive"):
+            return [("completed", "reset", None, None)]
+        return []
+
+    def _notify_list_changes(self, changes: List[tuple]):
+        """Gọi on_task_list_changed cho từng dòng (trong batch chỉ ghi nhận danh sách bị đổi)"""
+        for list_name, change, index, task_id in changes:
+            if self._batch_depth:
+                if list_name not in self._batch_changed_lists:
+                    self._batch_changed_lists.append(list_name)
+            elif self.on_task_list_changed:
+                task = self.get_task(task_id) if change in ("insert", "update") else None
+                self.on_task_list_changed(list_name, change, index, task)
+
+    def _notify_tasks_updated(self):
+        """Gọi on_tasks_updated (hoãn tới cuối batch nếu đang trong batch)"""
+        if self._batch_depth:
+            self._batch_updated = True
+        elif self.on_tasks_updated:
+            self.on_tasks_updated()
+
+    @contextmanager
+    def batch(self):
+        """Gộp nhiều thao tác: ghi một lần và refresh UI một lần khi batch ngoài cùng kết thúc"""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._end_batch()
+
+    def _end_batch(self):
+        """Ghi các record đã gom (hoặc compact luôn nếu journal sẽ quá dài) rồi thông báo"""
+        records, self._batch_records = self._batch_records, []
+        if records:
+            if self.journal.record_count + len(records) >= TASK_JOURNAL_COMPACT_THRESHOLD:
+                self.save_tasks()  # Snapshot đã chứa mọi thay đổi, không cần ghi journal
+            else:
+                self.journal.append_many(records)
+        
+        changed_lists, self._batch_changed_lists = self._batch_changed_lists, []
+        if self.on_task_list_changed:
+            for list_name in changed_lists:
+                self.on_task_list_changed(list_name, "reset", None, None)
+        
+        if self._batch_updated:
+            self._batch_updated = False
+            if self.on_tasks_updated:
+                self.on_tasks_updated()
+
+    def _apply_operation(self, record: Dict[str, Any]):
+        """Áp dụng một record journal vào bộ nhớ (dùng chung cho thao tác mới và replay)"""
+        op = record.get("op")
+        task_id = record.get("id")
+        
+        if op == "add":
+            task = dict(record["task"])
+            self._active[task['id']] = task
+            self.next_id = max(self.next_id, task['id'] + 1)
+            return task
+        
+        if op == "complete":
+            task = self._active.pop(task_id, None)
+            if task is not None:
+                task['completed_at'] = record.get("at")
+                self._completed[task_id] = task
+            return task
+        
+        if op == "reactivate":
+            task = self._completed.pop(task_id, None)
+            if task is not None:
+                # Remove completed timestamp and move back to active
+                task.pop('completed_at', None)
+                self._active[task_id] = task
+            return task
+        
+        if op == "delete":
+            task_map = self._completed if record.get("completed") else self._active
+            return task_map.pop(task_id, None)
+        
+        if op == "move":
+            self._active.swap(record["from"], record["to"])
+            return True
+        
+        if op == "priority":
+            task = self._active.get(task_id)
+            if task is not None:
+                task['priority'] = record.get("priority")
+            return task
+        
+        if op == "edit":
+            task = self._active.get(task_id)
+            if task is not None:
+                task['text'] = record.get("text")
+                task['updated_at'] = record.get("at")
+            return task
+        
+        if op == "clear_completed":
+            cleared_count = len(self._completed)
+            self._completed.clear()
+            return cleared_count
+        
+        if op == "archive":
+            for archived_id in record.get("ids", []):
+                self._completed.pop(archived_id, None)
+            self.archived_count += record.get("added", 0)
+            return record.get("added", 0)
+        
+        return None
 
     def add_task(self, task_text: str, session_target: Optional[int] = None) -> Dict[str, Any]:
         """Add a new task with optional session target"""
         task = {
-            'id': len(self.tasks) + len(self.completed_tasks) + 1,
+            'id': self._allocate_id(),
             'text': task_text,
             'created_at': datetime.now().isoformat(),
             'session_target': session_target,  # Which session to complete this task
             'priority': 'normal'  # normal, high, low
         }
         
-        self.tasks.append(task)
-        self.save_tasks()
+        task = self._record_operation({"op": "add", "task": task})
         
         if self.on_task_added:
             self.on_task_added(task)
-        if self.on_tasks_updated:
-            self.on_tasks_updated()
+        self._notify_tasks_updated()
         
         return task
 
     def complete_task(self, task_id):
         """Đánh dấu task hoàn thành"""
-        for i, task in enumerate(self.tasks):
-            if task['id'] == task_id:
-                task['completed_at'] = datetime.now().isoformat()
-                completed_task = self.tasks.pop(i)
-                self.completed_tasks.append(completed_task)
-                self.save_tasks()
-                
-                if self.on_task_completed:
-                    self.on_task_completed(completed_task)
-                if self.on_tasks_updated:
-                    self.on_tasks_updated()
-                
-                return completed_task
-        return None
+        if task_id not in self._active:
+            return None
+        
+        completed_task = self._record_operation(
+            {"op": "complete", "id": task_id, "at": datetime.now().isoformat()})
+        
+        if self.on_task_completed:
+            self.on_task_completed(completed_task)
+        self._notify_tasks_updated()
+        
+        return completed_task
 
     def reactivate_task(self, task_id):
         """Chuyển task từ completed về active (undo complete)"""
-        for i, task in enumerate(self.completed_tasks):
-            if task['id'] == task_id:
-                # Remove completed timestamp and move back to active
-                if 'completed_at' in task:
-                    del task['completed_at']
-                reactivated_task = self.completed_tasks.pop(i)
-                self.tasks.append(reactivated_task)
-                self.save_tasks()
-                
-                if self.on_tasks_updated:
-                    self.on_tasks_updated()
-                
-                return reactivated_task
-        return None
+        if task_id not in self._completed:
+            return None
+        
+        reactivated_task = self._record_operation({"op": "reactivate", "id": task_id})
+        
+        self._notify_tasks_updated()
+        
+        return reactivated_task
 
     def delete_task(self, task_id, from_completed=False):
         """Xóa task"""
-        task_list = self.completed_tasks if from_completed else self.tasks
-        
-        for i, task in enumerate(task_list):
-            if task['id'] == task_id:
-                deleted_task = task_list.pop(i)
-                self.save_tasks()
-                
-                if self.on_task_deleted:
-                    self.on_task_deleted(deleted_task)
-                if self.on_tasks_updated:
-                    self.on_tasks_updated()
-                
-                return deleted_task
-        return None
+        task_map = self._completed if from_completed else self._active
+        if task_id not in task_map:
+            return None
+        
+        deleted_task = self._record_operation({"op": "delete", "id": task_id, "completed": from_completed})
+        
+        if self.on_task_deleted:
+            self.on_task_deleted(deleted_task)
+        self._notify_tasks_updated()
+        
+        return deleted_task
+
+    def add_tasks(self, task_texts: List[str], session_target: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Thêm nhiều task cùng lúc (một lần ghi, một lần refresh)"""
+        with self.batch():
+            return [self.add_task(text, session_target) for text in task_texts]
+
+    def complete_tasks(self, task_ids) -> List[Dict[str, Any]]:
+        """Hoàn thành nhiều task cùng lúc, trả về các task đã hoàn thành"""
+        with self.batch():
+            completed = [self.complete_task(task_id) for task_id in task_ids]
+        return [task for task in completed if task is not None]
+
+    def delete_tasks(self, task_ids, from_completed=False) -> List[Dict[str, Any]]:
+        """Xóa nhiều task cùng lúc, trả về các task đã xóa"""
+        with self.batch():
+            deleted = [self.delete_task(task_id, from_completed) for task_id in task_ids]
+        return [task for task in deleted if task is not None]
 
     def get_tasks_for_session(self, session_number):
         """Lấy tasks cho session cụ thể"""
-        return [task for task in self.tasks if task.get('session_target') == session_number]
+        return [task for task in self._active.values() if task.get('session_target') == session_number]
 
     def move_task_up(self, task_index: int) -> bool:
         """Move task up in the list"""
-        if task_index > 0 and task_index < len(self.tasks):
+        if task_index > 0 and task_index < len(self._active):
             # Swap position with task above
-            self.tasks[task_index], self.tasks[task_index - 1] = self.tasks[task_index - 1], self.tasks[task_index]
-            self.save_tasks()
+            self._record_operation({"op": "move", "from": task_index, "to": task_index - 1})
             
-            if self.on_tasks_updated:
-                self.on_tasks_updated()
+            self._notify_tasks_updated()
             
             return True
         return False
 
     def move_task_down(self, task_index: int) -> bool:
         """Move task down in the list"""
-        if task_index >= 0 and task_index < len(self.tasks) - 1:
+        if task_index >= 0 and task_index < len(self._active) - 1:
             # Swap position with task below
-            self.tasks[task_index], self.tasks[task_index + 1] = self.tasks[task_index + 1], self.tasks[task_index]
-            self.save_tasks()
+            self._record_operation({"op": "move", "from": task_index, "to": task_index + 1})
             
-            if self.on_tasks_updated:
-                self.on_tasks_updated()
+            self._notify_tasks_updated()
             
             return True
         return False
 
     def get_all_active_tasks(self):
         """Lấy tất cả tasks chưa hoàn thành"""
-        return self.tasks.copy()
+        return self.tasks
 
     def get_completed_tasks(self):
-        """Lấy tất cả tasks đã hoàn thành"""
-        return self.completed_tasks.copy()
+        """Lấy tasks đã hoàn thành gần đây (chưa archive)"""
+        return self.completed_tasks
+
+    def get_archived_months(self) -> List[str]:
+        """Các tháng (YYYY-MM) có completed tasks đã archive"""
+        return self.archive.months()
+
+    def get_archived_tasks(self, month: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Đọc completed tasks đã archive của một tháng (None = toàn bộ lịch sử)"""
+        if month is not None:
+            return self.archive.load_month(month)
+        return list(self.archive.iter_tasks())
+
+    def archive_completed_tasks(self, older_than_days: Optional[int] = None) -> int:
+        """Chuyển completed tasks hoàn thành trước older_than_days ngày vào archive theo tháng"""
+        if older_than_days is None:
+            older_than_days = self.archive_after_days
+        if older_than_days is None:
+            return 0
+        
+        cutoff = (datetime.now() - timedelta(days=older_than_days)).isoformat()
+        by_month: Dict[str, List[Dict[str, Any]]] = {}
+        for task in self._completed.values():
+            completed_at = task.get('completed_at')
+            if isinstance(completed_at, str) and completed_at < cutoff:
+                by_month.setdefault(completed_at[:7], []).append(dict(task))
+        if not by_month:
+            return 0
+        
+        archived_ids = []
+        for month, tasks in by_month.items():
+            try:
+                self.archive.add(month, tasks)
+            except (OSError, ValueError) as e:
+                print(f"❌ Could not archive tasks for {month}: {e}")
+                continue
+            archived_ids.extend(task['id'] for task in tasks)
+        
+        if archived_ids:
+            # Đếm mọi task rời khỏi danh sách completed, kể cả task đã có sẵn trong archive (vd sau import)
+            self._record_operation({"op": "archive", "ids": archived_ids, "added": len(archived_ids)})
+            self._notify_tasks_updated()
+        return len(archived_ids)
 
     def get_tasks_summary(self):
         """Lấy tóm tắt về tasks"""
-        total_tasks = len(self.tasks) + len(self.completed_tasks)
-        completed_count = len(self.completed_tasks)
-        remaining_count = len(self.tasks)
+        completed_count = len(self._completed) + self.archived_count
+        remaining_count = len(self._active)
+        total_tasks = completed_count + remaining_count
         
         completion_rate = (completed_count / total_tasks * 100) if total_tasks > 0 else 0
         
@@ -149,63 +421,136 @@ class TaskManager:
 
     def set_task_priority(self, task_id, priority):
         """Thiết lập priority cho task"""
-        for task in self.tasks:
-            if task['id'] == task_id:
-                task['priority'] = priority
-                self.save_tasks()
-                if self.on_tasks_updated:
-                    self.on_tasks_updated()
-                return True
-        return False
+        if task_id not in self._active:
+            return False
+        
+        self._record_operation({"op": "priority", "id": task_id, "priority": priority})
+        self._notify_tasks_updated()
+        return True
 
     def edit_task(self, task_id, new_text):
         """Chỉnh sửa nội dung task"""
-        for task in self.tasks:
-            if task['id'] == task_id:
-                task['text'] = new_text
-                task['updated_at'] = datetime.now().isoformat()
-                self.save_tasks()
-                if self.on_tasks_updated:
-                    self.on_tasks_updated()
-                return True
-        return False
+        if task_id not in self._active:
+            return False
+        
+        self._record_operation({"op": "edit", "id": task_id, "text": new_text,
+                                "at": datetime.now().isoformat()})
+        self._notify_tasks_updated()
+        return True
 
     def clear_completed_tasks(self):
         """Xóa tất cả tasks đã hoàn thành"""
-        cleared_count = len(self.completed_tasks)
-        self.completed_tasks.clear()
-        self.save_tasks()
+        cleared_count = self._record_operation({"op": "clear_completed"})
         
-        if self.on_tasks_updated:
-            self.on_tasks_updated()
+        self._notify_tasks_updated()
         
         return cleared_count
 
-    def save_tasks(self):
-        """Lưu tasks vào file"""
+    def _snapshot(self) -> Dict[str, Any]:
+        """Chụp bản sao toàn bộ tasks (worker thread ghi sau, trong khi dict vẫn có thể bị sửa)"""
+        return {
+            'tasks': [dict(task) for task in self._active.values()],
+            'completed_tasks': [dict(task) for task in self._completed.values()],
+            'next_id': self.next_id,
+            'archived_count': self.archived_count,
+            'journal_seq': self.journal.seq,
+            'last_updated': datetime.now().isoformat()
+        }
+
+    def save_tasks(self, wait: bool = False):
+        """
+        Compact: ghi snapshot đầy đủ ở background. Journal được xoay sang segment cũ
+        và chỉ bị xóa khi snapshot đã nằm trên đĩa. wait=True chờ ghi xong.
+        """
         try:
-            data = {
-                'tasks': self.tasks,
-                'completed_tasks': self.completed_tasks,
-                'last_updated': datetime.now().isoformat()
-            }
-            
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            # Snapshot đã chứa các thao tác đang gom trong batch
+            self._batch_records = []
+            covered_seq = self.journal.rotate()
+            self.persistence.submit(self.data_file, self._snapshot(),
+                                    on_written=lambda: self.journal.discard_rotated(covered_seq))
+            if wait:
+                self.persistence.flush()
         except Exception as e:
             print(f"❌ Could not save tasks: {e}")
 
+    def close(self):
+        """Compact journal, đợi ghi xong và đóng file trước khi thoát ứng dụng"""
+        if self.journal.record_count > 0:
+            self.save_tasks()
+        self.persistence.flush()
+        self.journal.close()
+
+    def export_tasks(self, filename: str):
+        """Xuất toàn bộ tasks (kể cả archive và các thao tác chưa compact) ra một file JSON"""
+        data = self._snapshot()
+        del data['journal_seq'], data['archived_count']
+        data['completed_tasks'] = self.get_archived_tasks() + data['completed_tasks']
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+    def import_tasks(self, filename: str):
+        """Thay toàn bộ tasks bằng nội dung file export (journal cũ bị bỏ)"""
+        with open(filename, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        
+        self.journal.truncate()
+        self._build_index(data.get('tasks', []), data.get('completed_tasks', []), data.get('next_id', 1))
+        # File export chứa cả task đã archive trong completed_tasks - đếm lại khi archive bên dưới
+        self.archived_count = 0
+        self.save_tasks(wait=True)
+        self.archive_completed_tasks()
+
     def load_tasks(self):
-        """Load tasks from file"""
+        """Load snapshot rồi replay các thao tác trong journal chưa được compact"""
+        tasks, completed_tasks, next_id, journal_seq = [], [], 1, 0
+        self.archived_count = 0
         try:
+            if self.persistence.is_pending(self.data_file):
+                self.persistence.flush()
             if os.path.exists(self.data_file):
                 with open(self.data_file, 'r', encoding='utf-8') as f:
                     data = json.load(f)
-                    self.tasks = data.get('tasks', [])
-                    self.completed_tasks = data.get('completed_tasks', [])
+                    tasks = data.get('tasks', [])
+                    completed_tasks = data.get('completed_tasks', [])
+                    next_id = data.get('next_id', 1)
+                    self.archived_count = data.get('archived_count', 0)
+                    journal_seq = data.get('journal_seq', 0)
             else:
                 pass  # Starting fresh with empty task lists
         except Exception as e:
             print(f"❌ Could not load tasks: {e}")
-            self.tasks = []
-            self.completed_tasks = []
+            tasks, completed_tasks, next_id, journal_seq = [], [], 1, 0
+        
+        reassigned = self._build_index(tasks, completed_tasks, next_id)
+        
+        self.journal.close()
+        replayed = self.journal.read(after_seq=journal_seq)
+        for record in replayed:
+            try:
+                self._apply_operation(record)
+            except (KeyError, IndexError, TypeError) as e:
+                print(f"❌ Skipping invalid task journal record: {e}")
+        # Record mới phải có seq lớn hơn mọi seq đã được lưu
+        self.journal.seq = max(self.journal.seq, journal_seq)
+        
+        if reassigned:
+            print(f"🔧 Reassigned {reassigned} duplicate task id(s)")
+            self.save_tasks()
+        
+        self.archive_completed_tasks()
+
+    def _build_index(self, tasks: List[Dict[str, Any]], completed_tasks: List[Dict[str, Any]], next_id: int) -> int:
+        """Dựng index id -> task; id trùng (do cách cấp id cũ) được cấp lại id mới"""
+        ids = [task.get('id') for task in tasks + completed_tasks]
+        self.next_id = max([next_id] + [task_id + 1 for task_id in ids if isinstance(task_id, int)])
+        self._active = OrderedIndexMap()
+        self._completed = OrderedIndexMap()
+        reassigned = 0
+        for task_list, task_map in ((tasks, self._active), (completed_tasks, self._completed)):
+            for task in task_list:
+                task_id = task.get('id')
+                if not isinstance(task_id, int) or task_id in self._active or task_id in self._completed:
+                    task['id'] = task_id = self._allocate_id()
+                    reassigned += 1
+                task_map[task_id] = task
+        return reassigned
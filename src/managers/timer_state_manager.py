@@ -7,6 +7,8 @@ import os
 from datetime import datetime
 from typing import Dict, Optional
 
+from .persistence_worker import get_persistence_worker
+
 
 class TimerStateManager:
     """Manages saving and loading timer state for session persistence"""
@@ -14,6 +16,7 @@ class TimerStateManager:
     def __init__(self, data_dir: str = "data"):
         self.data_dir = data_dir
         self.state_file = os.path.join(data_dir, "timer_state.json")
+        self.persistence = get_persistence_worker()
         self._ensure_data_dir()
     
     def _ensure_data_dir(self):
@@ -23,8 +26,8 @@ class TimerStateManager:
     
     def save_timer_state(self, timer_core) -> bool:
         """
-        Save current timer state to file
-        Returns True if successful, False otherwise
+        Save current timer state to file (written by the persistence worker)
+        Returns True if the state was queued, False otherwise
         """
         try:
             current_date = datetime.now().strftime("%Y-%m-%d")
@@ -50,8 +53,7 @@ class TimerStateManager:
                 }
             }
             
-            with open(self.state_file, 'w', encoding='utf-8') as f:
-                json.dump(state_data, f, indent=2, ensure_ascii=False)
+            self.persistence.submit(self.state_file, state_data)
             
             return True
             
@@ -65,11 +67,16 @@ class TimerStateManager:
         Returns state dict if successful, None otherwise
         """
         try:
-            if not os.path.exists(self.state_file):
+            # Ưu tiên bản đang chờ worker ghi (None = đang chờ xóa)
+            if self.persistence.is_pending(self.state_file):
+                state_data = self.persistence.pending_data(self.state_file)
+                if state_data is None:
+                    return None
+            elif not os.path.exists(self.state_file):
                 return None
-            
-            with open(self.state_file, 'r', encoding='utf-8') as f:
-                state_data = json.load(f)
+            else:
+                with open(self.state_file, 'r', encoding='utf-8') as f:
+                    state_data = json.load(f)
             
             # Check if the saved state is from today
             saved_date = state_data.get("date", "")
@@ -119,8 +126,8 @@ class TimerStateManager:
         Returns True if successful, False otherwise
         """
         try:
-            if os.path.exists(self.state_file):
-                os.remove(self.state_file)
+            # Xóa qua worker để không bị một lần ghi đang chờ tạo lại file
+            self.persistence.submit(self.state_file, None)
             return True
         except Exception as e:
             print(f"Error clearing timer state: {e}")
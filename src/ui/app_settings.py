@@ -5,10 +5,16 @@ Settings cho welcome screen
 import os
 import json
 
+from ..managers.persistence_worker import get_persistence_worker
+
 SETTINGS_FILE = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'app_settings.json')
 
 def load_settings():
     """Load app settings"""
+    worker = get_persistence_worker()
+    if worker.is_pending(SETTINGS_FILE):
+        return dict(worker.pending_data(SETTINGS_FILE))
+    
     try:
         if os.path.exists(SETTINGS_FILE):
             with open(SETTINGS_FILE, 'r', encoding='utf-8') as f:
@@ -23,13 +29,8 @@ def load_settings():
     }
 
 def save_settings(settings):
-    """Save app settings"""
-    try:
-        os.makedirs(os.path.dirname(SETTINGS_FILE), exist_ok=True)
-        with open(SETTINGS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(settings, f, indent=2)
-    except:
-        pass
+    """Save app settings (ghi ở background)"""
+    get_persistence_worker().submit(SETTINGS_FILE, dict(settings))
 
 def should_show_welcome():
     """Check if should show welcome screen"""
@@ -5,18 +5,44 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime, timedelta, date
 import calendar
-import shutil
+import importlib.util
+import math
 import os
+import threading
 
-# Import matplotlib for charts
-try:
-    import matplotlib.pyplot as plt
-    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-    import matplotlib.dates as mdates
-    from matplotlib.figure import Figure
-    MATPLOTLIB_AVAILABLE = True
-except ImportError:
-    MATPLOTLIB_AVAILABLE = False
+from .treeview_sync import TreeviewRowSync
+
+# matplotlib chỉ được import khi cần vẽ/xuất biểu đồ (hoặc prewarm ở background)
+plt = None
+FigureCanvasTkAgg = None
+mdates = None
+Figure = None
+MATPLOTLIB_AVAILABLE = None  # None = chưa thử import
+_matplotlib_lock = threading.Lock()
+
+
+def load_matplotlib() -> bool:
+    """Import matplotlib lần đầu khi cần, trả về True nếu dùng được (an toàn khi gọi từ thread khác)"""
+    global plt, FigureCanvasTkAgg, mdates, Figure, MATPLOTLIB_AVAILABLE
+    with _matplotlib_lock:
+        if MATPLOTLIB_AVAILABLE is None:
+            try:
+                import matplotlib.pyplot as _plt
+                from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg as _FigureCanvasTkAgg
+                import matplotlib.dates as _mdates
+                from matplotlib.figure import Figure as _Figure
+                plt, FigureCanvasTkAgg, mdates, Figure = _plt, _FigureCanvasTkAgg, _mdates, _Figure
+                MATPLOTLIB_AVAILABLE = True
+            except ImportError:
+                MATPLOTLIB_AVAILABLE = False
+    return MATPLOTLIB_AVAILABLE
+
+
+def matplotlib_installed() -> bool:
+    """Kiểm tra nhanh matplotlib có được cài không (không import)"""
+    if MATPLOTLIB_AVAILABLE is not None:
+        return MATPLOTLIB_AVAILABLE
+    return importlib.util.find_spec("matplotlib") is not None
 
 class DailyStatsWindow:
     def __init__(self, parent, stats_manager):
@@ -29,13 +55,24 @@ class DailyStatsWindow:
         self.date_overlay = None
         self.overlay_visible = False
         
+        # Lazy tabs: chỉ dựng/refresh tab đang hiển thị
+        self.tab_frames = {}  # key -> frame của tab
+        self.built_tabs = set()
+        self.dirty_tabs = set()
+        
+        # Figure matplotlib dùng lại giữa các lần mở cửa sổ
+        self.charts = {}
+        
+        # Dữ liệu thay đổi -> đánh dấu các tab cần refresh
+        self.stats_manager.on_stats_changed = self.mark_tabs_dirty
+        
     def show(self):
         """Hiển thị cửa sổ thống kê"""
         if self.window is not None:
             # Nếu cửa sổ đã mở, chỉ cần bring to front
             self.window.lift()
             self.window.focus_force()
-            self.refresh_data()
+            self.refresh_current_tab()
             return
             
         # Tạo cửa sổ mới với kích thước lớn hơn
@@ -51,7 +88,7 @@ class DailyStatsWindow:
         self.window.protocol("WM_DELETE_WINDOW", self.on_close)
         
         self.create_widgets()
-        self.refresh_data()
+        self.refresh_current_tab()
         
         # Center window
         self.center_window()
@@ -85,32 +122,67 @@ class DailyStatsWindow:
         self.notebook = ttk.Notebook(main_frame)
         self.notebook.pack(fill="both", expand=True)
         
-        # Tab 1: Today's Summary
-        self.create_today_tab()
-        
-        # Tab 2: Weekly Overview
-        self.create_weekly_tab()
-        
-        # Tab 3: Monthly Overview
-        self.create_monthly_tab()
-        
-        # Tab 4: History & Charts
-        self.create_history_tab()
+        # Tabs: (key, title, builder, refresher) - nội dung chỉ được dựng khi tab được chọn
+        self.tab_specs = {
+            "today": ("📅 Today", self.create_today_tab, self.refresh_today_data),
+            "weekly": ("📊 Weekly", self.create_weekly_tab, self.refresh_weekly_data),
+            "monthly": ("📅 Monthly", self.create_monthly_tab, self.refresh_monthly_data),
+            "charts": ("📈 Charts", self.create_history_tab, self.refresh_charts),
+            "yearly": ("📅 Yearly", self.create_yearly_tab, self.refresh_yearly_data),
+            "explorer": ("🔍 Data Explorer", self.create_data_explorer_tab, self.refresh_explorer_data)
+        }
         
-        # Tab 5: Yearly Overview
-        self.create_yearly_tab()
+        self.tab_frames = {}
+        self.built_tabs = set()
+        self.dirty_tabs = set(self.tab_specs)
+        for key, (title, _, _) in self.tab_specs.items():
+            tab_frame = ttk.Frame(self.notebook, padding="15")
+            self.notebook.add(tab_frame, text=title)
+            self.tab_frames[key] = tab_frame
         
-        # Tab 6: All Data Explorer
-        self.create_data_explorer_tab()
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
         
         # Control buttons frame
         self.create_control_buttons(main_frame)
     
-    def create_today_tab(self):
-        """Tạo tab thống kê hôm nay"""
-        today_frame = ttk.Frame(self.notebook, padding="15")
-        self.notebook.add(today_frame, text="📅 Today")
+    def on_tab_changed(self, event=None):
+        """Dựng và refresh tab vừa được chọn nếu cần"""
+        self.refresh_current_tab()
+    
+    def get_current_tab_key(self):
+        """Lấy key của tab đang hiển thị"""
+        try:
+            selected = self.notebook.select()
+        except tk.TclError:
+            return None
+        for key, tab_frame in self.tab_frames.items():
+            if str(tab_frame) == selected:
+                return key
+        return None
+    
+    def refresh_current_tab(self):
+        """Dựng tab đang hiển thị (lần đầu) và refresh nếu dữ liệu đã thay đổi"""
+        key = self.get_current_tab_key()
+        if key is None:
+            return
         
+        _, builder, refresher = self.tab_specs[key]
+        if key not in self.built_tabs:
+            builder(self.tab_frames[key])
+            self.built_tabs.add(key)
+        
+        if key in self.dirty_tabs:
+            self.dirty_tabs.discard(key)
+            if refresher is not None:
+                refresher()
+    
+    def mark_tabs_dirty(self):
+        """Đánh dấu mọi tab cần refresh khi được hiển thị lại"""
+        self.dirty_tabs.update(self.tab_frames)
+    
+    def create_today_tab(self, today_frame):
+        """Tạo tab thống kê hôm nay"""
+
         # Date header
         date_label = tk.Label(
             today_frame,
@@ -360,10 +432,8 @@ class DailyStatsWindow:
         )
         self.goal_percentage_label.pack(pady=(2, 0))
     
-    def create_weekly_tab(self):
+    def create_weekly_tab(self, weekly_frame):
         """Tạo tab thống kê tuần"""
-        weekly_frame = ttk.Frame(self.notebook, padding="15")
-        self.notebook.add(weekly_frame, text="📊 Weekly")
         
         # Weekly summary cards
         weekly_stats_frame = tk.Frame(weekly_frame, bg='white')
@@ -416,6 +486,7 @@ class DailyStatsWindow:
         # Create treeview with better styling
         columns = ("Date", "Study Time", "Break Time", "Sessions", "Tasks", "Efficiency")
         self.weekly_tree = ttk.Treeview(table_frame, columns=columns, show="headings", height=8)
+        self.weekly_rows = TreeviewRowSync(self.weekly_tree)
         
         # Define headings with better formatting
         column_widths = {"Date": 100, "Study Time": 100, "Break Time": 100, "Sessions": 80, "Tasks": 70, "Efficiency": 90}
@@ -441,10 +512,8 @@ class DailyStatsWindow:
         # Bind double-click event for date overlay
         self.weekly_tree.bind("<Double-1>", self.on_weekly_double_click)
     
-    def create_monthly_tab(self):
+    def create_monthly_tab(self, monthly_frame):
         """Tạo tab thống kê tháng"""
-        monthly_frame = ttk.Frame(self.notebook, padding="15")
-        self.notebook.add(monthly_frame, text="📅 Monthly")
         
         # Month selector
         month_selector_frame = tk.Frame(monthly_frame, bg='white')
@@ -504,6 +573,7 @@ class DailyStatsWindow:
             self.best_days_tree.column(col, width=120, anchor="center")
         
         self.best_days_tree.pack(fill="x")
+        self.best_days_rows = TreeviewRowSync(self.best_days_tree)
         
         # Month comparison
         comparison_frame = ttk.LabelFrame(monthly_frame, text="📈 3-Month Comparison", padding="10")
@@ -521,6 +591,7 @@ class DailyStatsWindow:
             self.comparison_tree.column(col, width=100, anchor="center")
         
         self.comparison_tree.pack(fill="both", expand=True)
+        self.comparison_rows = TreeviewRowSync(self.comparison_tree)
     
     def create_monthly_card(self, parent, title, stat_type, color, row, col):
         """Tạo card thống kê tháng với thiết kế đẹp"""
@@ -616,42 +687,38 @@ class DailyStatsWindow:
     
     def update_best_days(self, year, month):
         """Cập nhật danh sách ngày học tốt nhất"""
-        # Clear existing items
-        for item in self.best_days_tree.get_children():
-            self.best_days_tree.delete(item)
-        
         best_days = self.stats_manager.get_best_days_in_month(year, month, 5)
         
-        for day in best_days:
-            self.best_days_tree.insert("", "end", values=(
+        # Chỉ cập nhật các dòng thay đổi (key = ngày)
+        self.best_days_rows.sync(
+            (day["date"], (
                 day["display_date"],
                 day["formatted_study_time"],
                 day["sessions_completed"],
                 day["tasks_completed"]
-            ))
+            ), ())
+            for day in best_days
+        )
     
     def update_month_comparison(self):
         """Cập nhật bảng so sánh 3 tháng"""
-        # Clear existing items
-        for item in self.comparison_tree.get_children():
-            self.comparison_tree.delete(item)
-        
         comparisons = self.stats_manager.get_month_comparison(3)
         
-        for comp in comparisons:
-            self.comparison_tree.insert("", "end", values=(
+        # Chỉ cập nhật các dòng thay đổi (key = tháng)
+        self.comparison_rows.sync(
+            (comp["month_name"], (
                 comp["month_name"],
                 comp["study_time"],
                 comp["active_days"],
                 comp["sessions"],
                 comp["tasks"],
                 comp["productivity_rate"]
-            ))
+            ), ())
+            for comp in comparisons
+        )
 
-    def create_history_tab(self):
+    def create_history_tab(self, history_frame):
         """Tạo tab lịch sử và biểu đồ"""
-        history_frame = ttk.Frame(self.notebook, padding="15")
-        self.notebook.add(history_frame, text="📈 Charts")
         
         # Chart header
         chart_label = tk.Label(
@@ -665,10 +732,8 @@ class DailyStatsWindow:
         # Create matplotlib charts
         self.create_matplotlib_charts(history_frame)
     
-    def create_yearly_tab(self):
+    def create_yearly_tab(self, yearly_frame):
         """Tạo tab thống kê theo năm"""
-        yearly_frame = ttk.Frame(self.notebook, padding="15")
-        self.notebook.add(yearly_frame, text="📅 Yearly")
         
         # Year selector frame
         year_selector_frame = tk.Frame(yearly_frame, bg='white')
@@ -718,6 +783,7 @@ class DailyStatsWindow:
         # Create treeview for monthly data
         monthly_columns = ("Month", "Study Time", "Break Time", "Sessions", "Tasks", "Active Days", "Productivity")
         self.yearly_tree = ttk.Treeview(monthly_frame, columns=monthly_columns, show="headings", height=12)
+        self.yearly_rows = TreeviewRowSync(self.yearly_tree)
         
         # Define headings
         for col in monthly_columns:
@@ -741,10 +807,8 @@ class DailyStatsWindow:
         self.yearly_tree.pack(side="left", fill="both", expand=True)
         yearly_scrollbar.pack(side="right", fill="y")
     
-    def create_data_explorer_tab(self):
+    def create_data_explorer_tab(self, explorer_frame):
         """Tạo tab khám phá dữ liệu toàn diện"""
-        explorer_frame = ttk.Frame(self.notebook, padding="15")
-        self.notebook.add(explorer_frame, text="🔍 Data Explorer")
         
         # Control panel
         control_panel = tk.Frame(explorer_frame, bg='white', relief="raised", bd=1)
@@ -851,6 +915,7 @@ class DailyStatsWindow:
         # Create treeview for all data
         data_columns = ("Date", "Study Time", "Break Time", "Sessions", "Tasks", "Efficiency", "Goal Progress")
         self.explorer_tree = ttk.Treeview(table_frame, columns=data_columns, show="headings", height=15)
+        self.explorer_rows = TreeviewRowSync(self.explorer_tree)
         
         # Define headings with better widths
         column_widths = {
@@ -892,8 +957,8 @@ class DailyStatsWindow:
         # Bind double-click event for date overlay
         self.explorer_tree.bind("<Double-1>", self.on_explorer_double_click)
         
-        # Initialize with last 30 days
-        self.load_data_range(30)
+        # Last 30 days are loaded by refresh_explorer_data on first display
+        self.current_data = []
     
     def create_control_buttons(self, parent):
         """Tạo các nút điều khiển với thiết kế Material Design"""
@@ -944,7 +1009,7 @@ class DailyStatsWindow:
         export_btn.pack(side="left", padx=5)
         
         # Export Charts button (only show if matplotlib available)
-        if MATPLOTLIB_AVAILABLE:
+        if matplotlib_installed():
             export_charts_btn = tk.Button(
                 button_frame,
                 text="📊 Export Charts",
@@ -971,10 +1036,15 @@ class DailyStatsWindow:
         close_btn.pack(side="right")
     
     def refresh_data(self):
-        """Cập nhật dữ liệu hiển thị với trend indicators và visual enhancements"""
+        """Đánh dấu mọi tab cần refresh và cập nhật ngay tab đang hiển thị"""
         if not self.window:
             return
-            
+        
+        self.mark_tabs_dirty()
+        self.refresh_current_tab()
+    
+    def refresh_today_data(self):
+        """Cập nhật tab hôm nay với trend indicators và visual enhancements"""
         # Get today's and yesterday's data for comparison
         today_summary = self.stats_manager.get_today_summary()
         recent_days = self.stats_manager.get_recent_days(2)  # Today and yesterday
@@ -999,8 +1069,9 @@ class DailyStatsWindow:
         sessions = int(today_summary["sessions_completed"])
         tasks = int(today_summary["tasks_completed"])
         self.update_achievement_section(study_seconds, sessions, tasks)
-        
-        # Update weekly stats
+    
+    def refresh_weekly_data(self):
+        """Cập nhật tab tuần"""
         weekly_summary = self.stats_manager.get_weekly_total()
         
         self.weekly_study_label.config(text=weekly_summary["total_study_time"])
@@ -1009,18 +1080,6 @@ class DailyStatsWindow:
         
         # Update weekly table with enhanced visuals
         self.update_weekly_table()
-        
-        # Update monthly data if tab exists
-        if hasattr(self, 'month_combo'):
-            self.refresh_monthly_data()
-        
-        # Update yearly data if tab exists
-        if hasattr(self, 'year_combo'):
-            self.refresh_yearly_data()
-        
-        # Update data explorer if tab exists
-        if hasattr(self, 'explorer_tree'):
-            self.refresh_explorer_data()
     
     def update_stat_card_with_trend(self, stat_type, current_value, yesterday_data):
         """Cập nhật stat card với trend indicators và visual enhancements"""
@@ -1419,13 +1478,10 @@ class DailyStatsWindow:
 
     def update_weekly_table(self):
         """Cập nhật bảng thống kê tuần với màu sắc và visual indicators"""
-        # Clear existing items
-        for item in self.weekly_tree.get_children():
-            self.weekly_tree.delete(item)
-        
         # Get recent days data
         recent_days = self.stats_manager.get_recent_days(7)
         today_key = self.stats_manager.get_today_key()
+        rows = []
         
         for i, day in enumerate(recent_days):
             # Format date nicely
@@ -1462,14 +1518,17 @@ class DailyStatsWindow:
             elif study_time > 0:
                 study_display += " ⏱️"
             
-            self.weekly_tree.insert("", "end", values=(
+            rows.append((day["date"], (
                 formatted_date,
                 study_display,
                 day["formatted_break_time"],
                 f"{day['sessions_completed']} 🎯" if day['sessions_completed'] > 0 else "0",
                 f"{day['tasks_completed']} ✅" if day['tasks_completed'] > 0 else "0",
                 efficiency_text
-            ), tags=(tag,))
+            ), (tag,)))
+        
+        # Chỉ cập nhật các dòng thay đổi (thường chỉ có hôm nay)
+        self.weekly_rows.sync(rows)
 
     def time_to_seconds(self, time_str):
         """Chuyển đổi thời gian HH:MM:SS thành giây"""
@@ -1510,15 +1569,14 @@ class DailyStatsWindow:
         
         if filename:
             try:
-                import shutil
-                shutil.copy(self.stats_manager.stats_file, filename)
+                self.stats_manager.export_stats(filename)
                 messagebox.showinfo("Export Successful", f"Statistics exported to:\n{filename}")
             except Exception as e:
                 messagebox.showerror("Export Failed", f"Could not export data:\n{e}")
 
     def export_charts(self):
         """Xuất biểu đồ thành file hình ảnh với thiết kế đẹp"""
-        if not MATPLOTLIB_AVAILABLE:
+        if not load_matplotlib():
             messagebox.showwarning("Export Charts", "Matplotlib is required to export charts.\nPlease install it with: pip install matplotlib")
             return
         
@@ -1770,6 +1828,7 @@ class DailyStatsWindow:
         if self.overlay_visible:
             self.hide_date_overlay()
         
+        self.detach_chart_canvases()
         self.window.destroy()
         self.window = None
 
@@ -1849,7 +1908,7 @@ class DailyStatsWindow:
 
     def create_matplotlib_charts(self, parent):
         """Tạo biểu đồ matplotlib cho data visualization"""
-        if not MATPLOTLIB_AVAILABLE:
+        if not load_matplotlib():
             # Fallback to placeholder if matplotlib not available
             self.create_chart_placeholder(parent)
             return
@@ -1859,45 +1918,135 @@ class DailyStatsWindow:
             chart_notebook = ttk.Notebook(parent)
             chart_notebook.pack(fill="both", expand=True)
             
-            # Study Time Trend Chart
-            self.create_study_time_chart(chart_notebook)
-            
-            # Daily Sessions Chart (separate tab)
-            self.create_sessions_chart(chart_notebook)
-            
-            # Daily Tasks Chart (separate tab)
-            self.create_tasks_chart(chart_notebook)
-            
-            # Efficiency and Progress Chart
-            self.create_efficiency_chart(chart_notebook)
+            # Figure được giữ lại giữa các lần mở cửa sổ, mỗi lần mở chỉ tạo canvas mới
+            chart_specs = (
+                ("study", "📚 Study Time", self.create_study_time_chart),
+                ("sessions", "🎯 Daily Sessions", self.create_sessions_chart),
+                ("tasks", "✅ Daily Tasks", self.create_tasks_chart),
+                ("efficiency", "⚡ Efficiency", self.create_efficiency_chart)
+            )
+            for key, title, builder in chart_specs:
+                chart_frame = ttk.Frame(chart_notebook, padding="15")
+                chart_notebook.add(chart_frame, text=title)
+                if key not in self.charts:
+                    self.charts[key] = builder()
+                self.attach_chart_canvas(self.charts[key], chart_frame)
             
         except Exception as e:
             print(f"Error creating charts: {e}")
             self.create_chart_placeholder(parent)
     
-    def create_study_time_chart(self, parent):
-        """Tạo biểu đồ thời gian học với thiết kế đẹp"""
-        # Create frame for study time chart
-        study_frame = ttk.Frame(parent, padding="15")
-        parent.add(study_frame, text="📚 Study Time")
+    def attach_chart_canvas(self, chart, parent):
+        """Gắn figure có sẵn vào một canvas Tk mới"""
+        canvas = FigureCanvasTkAgg(chart["fig"], parent)
+        canvas.get_tk_widget().pack(fill="both", expand=True, padx=5, pady=5)
         
-        # Get last 14 days of data
-        recent_days = self.stats_manager.get_recent_days(14)
+        chart["draw_cid"] = canvas.mpl_connect("draw_event", lambda event: self.on_chart_draw(chart))
+        chart["canvas"] = canvas
+        chart["background"] = None
+        chart["data"] = None
+        chart["layout"] = None  # Buộc vẽ lại toàn bộ lần đầu
+    
+    def detach_chart_canvases(self):
+        """Tách figure khỏi canvas đã bị hủy để giải phóng bộ nhớ ảnh"""
+        if not MATPLOTLIB_AVAILABLE:
+            return
+        from matplotlib.backend_bases import FigureCanvasBase
+        for chart in self.charts.values():
+            if chart.get("canvas") is not None:
+                chart["canvas"].mpl_disconnect(chart["draw_cid"])
+                FigureCanvasBase(chart["fig"])
+                chart["canvas"] = None
+                chart["background"] = None
+                chart["draw_cid"] = None
+    
+    def on_chart_draw(self, chart):
+        """Sau mỗi lần vẽ toàn bộ: lưu nền tĩnh và vẽ các artist động"""
+        canvas = chart["canvas"]
+        if canvas is None:
+            return
+        chart["background"] = canvas.copy_from_bbox(chart["fig"].bbox)
+        for artist in chart["dynamic"]:
+            chart["fig"].draw_artist(artist)
+    
+    def render_chart(self, chart, data, layout):
+        """Vẽ lại biểu đồ: blit nếu trục không đổi, ngược lại vẽ toàn bộ"""
+        full_redraw = layout != chart["layout"] or chart["background"] is None
+        chart["data"] = data
+        chart["layout"] = layout
+        canvas = chart["canvas"]
+        
+        if full_redraw:
+            if chart.get("dynamic_legend"):
+                chart["legend"].remove()
+                chart["legend"] = self.create_chart_legend(chart["ax"])
+                chart["dynamic"][-1] = chart["legend"]
+            chart["fig"].tight_layout(pad=2.0)
+            canvas.draw_idle()  # on_chart_draw sẽ vẽ các artist động
+            return
         
-        if not recent_days:
-            tk.Label(study_frame, text="No data available", font=("Arial", 12)).pack(expand=True)
+        canvas.restore_region(chart["background"])
+        for artist in chart["dynamic"]:
+            chart["fig"].draw_artist(artist)
+        canvas.blit(chart["fig"].bbox)
+    
+    def chart_is_current(self, chart, data, layout):
+        """Biểu đồ đã hiển thị đúng dữ liệu này chưa"""
+        return chart.get("canvas") is None or (chart["data"], chart["layout"]) == (data, layout)
+    
+    def create_chart_legend(self, ax, *handles_labels):
+        """Tạo legend với style chung (animated để luôn vẽ trên các artist động)"""
+        legend = ax.legend(*handles_labels, loc='upper left', frameon=True, fancybox=True, 
+                          shadow=True, fontsize=11, 
+                          facecolor='white', edgecolor='#bdc3c7',
+                          framealpha=0.95, borderpad=1)
+        legend.get_frame().set_linewidth(1)
+        legend.set_animated(True)
+        return legend
+    
+    def style_chart_dates(self, ax):
+        """Format trục ngày cho biểu đồ 14 ngày"""
+        ax.xaxis.set_major_formatter(mdates.DateFormatter('%m/%d'))
+        ax.xaxis.set_major_locator(mdates.DayLocator(interval=1))
+        plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right',
+                fontsize=11, color='#5d6d7e', fontweight='500')
+    
+    def get_chart_placeholder_dates(self):
+        """14 ngày gần nhất, dùng để khởi tạo artist trước khi có dữ liệu"""
+        today = datetime.combine(date.today(), datetime.min.time())
+        return [today - timedelta(days=offset) for offset in range(13, -1, -1)]
+    
+    def area_vertices(self, x_values, y_values):
+        """Đỉnh polygon của vùng tô dưới đường (giống fill_between với đáy 0)"""
+        return [(x_values[0], 0)] + list(zip(x_values, y_values)) + [(x_values[-1], 0)]
+    
+    def refresh_charts(self):
+        """Cập nhật dữ liệu các biểu đồ tại chỗ (chỉ vẽ lại khi dữ liệu thay đổi)"""
+        if not MATPLOTLIB_AVAILABLE or not self.charts:
             return
         
-        # Prepare data
-        dates = []
-        study_hours = []
-        break_hours = []
+        # Get last 14 days of data (oldest first)
+        recent_days = list(reversed(self.stats_manager.get_recent_days(14)))
+        if not recent_days:
+            return
+        dates = [datetime.strptime(day["date"], "%Y-%m-%d") for day in recent_days]
         
-        for day in recent_days:
-            date_obj = datetime.strptime(day["date"], "%Y-%m-%d")
-            dates.append(date_obj)
-            study_hours.append(day["study_time"] / 3600)  # Convert to hours
-            break_hours.append(day["break_time"] / 3600)
+        updaters = {
+            "study": self.update_study_time_chart,
+            "sessions": self.update_sessions_chart,
+            "tasks": self.update_tasks_chart,
+            "efficiency": self.update_efficiency_chart
+        }
+        for key, chart in self.charts.items():
+            try:
+                updaters[key](chart, dates, recent_days)
+            except Exception as e:
+                print(f"Error updating chart {key}: {e}")
+    
+    def create_study_time_chart(self):
+        """Tạo biểu đồ thời gian học với thiết kế đẹp (dữ liệu được gán trong update_study_time_chart)"""
+        dates = self.get_chart_placeholder_dates()
+        zeros = [0] * len(dates)
         
         # Create matplotlib figure with beautiful styling
         plt.style.use('default')  # Reset to clean style
@@ -1908,7 +2057,7 @@ class DailyStatsWindow:
         ax.set_facecolor('#fafbfc')
         
         # Plot study time with enhanced styling
-        study_line = ax.plot(dates, study_hours, 
+        study_line, = ax.plot(dates, zeros, 
                            marker='o', linewidth=3, markersize=8, 
                            color='#2ecc71', label='📚 Study Time', 
                            alpha=0.9, markerfacecolor='#27ae60',
@@ -1916,21 +2065,19 @@ class DailyStatsWindow:
                            zorder=3)
         
         # Add area fill under study time line for visual impact
-        ax.fill_between(dates, study_hours, alpha=0.2, color='#2ecc71', zorder=1)
+        study_fill = ax.fill_between(dates, zeros, alpha=0.2, color='#2ecc71', zorder=1)
         
         # Plot break time with contrasting style
-        break_line = ax.plot(dates, break_hours, 
+        break_line, = ax.plot(dates, zeros, 
                            marker='s', linewidth=2.5, markersize=6,
                            color='#e67e22', label='☕ Break Time', 
                            alpha=0.8, markerfacecolor='#d35400',
                            markeredgecolor='white', markeredgewidth=1.5,
                            zorder=2)
         
-        # Add daily goal line with enhanced styling (dynamic)
-        daily_goal = self.stats_manager.get_dynamic_daily_goal()
-        goal_line = ax.axhline(y=daily_goal, color='#3498db', linestyle='--', 
-                              linewidth=2, alpha=0.7, 
-                              label=f'Daily Goal ({daily_goal:.1f}h)')
+        # Daily goal line with enhanced styling (dynamic, updated in place)
+        goal_line = ax.axhline(y=0, color='#3498db', linestyle='--', 
+                              linewidth=2, alpha=0.7, label='Daily Goal')
         
         # Customize chart with beautiful typography
         ax.set_title('Study Time & Break Analysis', 
@@ -1943,26 +2090,12 @@ class DailyStatsWindow:
         ax.grid(True, alpha=0.4, linestyle='-', linewidth=0.5, color='#bdc3c7')
         ax.set_axisbelow(True)  # Grid behind data
         
-        # Beautiful legend with shadow
-        legend = ax.legend(loc='upper left', frameon=True, fancybox=True, 
-                          shadow=True, fontsize=11, 
-                          facecolor='white', edgecolor='#bdc3c7',
-                          framealpha=0.95, borderpad=1)
-        legend.get_frame().set_linewidth(1)
-        
         # Format x-axis with better styling
-        ax.xaxis.set_major_formatter(mdates.DateFormatter('%m/%d'))
-        ax.xaxis.set_major_locator(mdates.DayLocator(interval=1))
-        plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right', 
-                fontsize=11, color='#5d6d7e', fontweight='500')
+        self.style_chart_dates(ax)
         
         # Style y-axis
         plt.setp(ax.yaxis.get_majorticklabels(), fontsize=11, color='#5d6d7e', fontweight='500')
         
-        # Set better axis limits with more padding
-        if max(study_hours) > 0:
-            ax.set_ylim(0, max(max(study_hours), daily_goal) * 1.15)
-        
         # Remove top and right spines for cleaner look
         ax.spines['top'].set_visible(False)
         ax.spines['right'].set_visible(False)
@@ -1972,84 +2105,87 @@ class DailyStatsWindow:
             ax.spines[spine].set_color('#d5dbdb')
             ax.spines[spine].set_linewidth(1)
         
-        # Adjust layout with better margins
-        fig.subplots_adjust(left=0.1, right=0.95, top=0.9, bottom=0.15)
+        # Beautiful legend (rebuilt when the goal label changes)
+        legend = self.create_chart_legend(ax)
         
-        # Tight layout with padding
-        fig.tight_layout(pad=2.0)
+        dynamic = [study_fill, goal_line, break_line, study_line, legend]
+        for artist in dynamic:
+            artist.set_animated(True)
         
-        # Add to tkinter
-        canvas = FigureCanvasTkAgg(fig, study_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True, padx=5, pady=5)
+        return {
+            "fig": fig, "ax": ax, "dynamic": dynamic, "legend": legend, "dynamic_legend": True,
+            "study_line": study_line, "study_fill": study_fill,
+            "break_line": break_line, "goal_line": goal_line
+        }
     
-    def create_sessions_chart(self, parent):
-        """Tạo biểu đồ sessions riêng biệt với thiết kế đẹp"""
-        # Create frame for sessions chart
-        session_frame = ttk.Frame(parent, padding="15")
-        parent.add(session_frame, text="🎯 Daily Sessions")
+    def update_study_time_chart(self, chart, dates, recent_days):
+        """Cập nhật dữ liệu biểu đồ thời gian học"""
+        study_hours = [day["study_time"] / 3600 for day in recent_days]  # Convert to hours
+        break_hours = [day["break_time"] / 3600 for day in recent_days]
+        daily_goal = self.stats_manager.get_dynamic_daily_goal()
         
-        # Get last 14 days of data
-        recent_days = self.stats_manager.get_recent_days(14)
+        # Trục y làm tròn lên 0.5h để phần lớn cập nhật chỉ cần blit
+        peak = max(max(study_hours), daily_goal) * 1.15
+        y_top = math.ceil(peak * 2) / 2
         
-        if not recent_days:
-            tk.Label(session_frame, text="No data available", font=("Arial", 12)).pack(expand=True)
+        data = (tuple(study_hours), tuple(break_hours))
+        layout = (tuple(dates), daily_goal, y_top)
+        if self.chart_is_current(chart, data, layout):
             return
         
-        # Prepare data
-        dates = []
-        sessions = []
+        ax = chart["ax"]
+        x_values = mdates.date2num(dates)
+        chart["study_line"].set_data(dates, study_hours)
+        chart["break_line"].set_data(dates, break_hours)
+        chart["study_fill"].set_verts([self.area_vertices(x_values, study_hours)])
+        chart["goal_line"].set_ydata([daily_goal, daily_goal])
+        chart["goal_line"].set_label(f'Daily Goal ({daily_goal:.1f}h)')
         
-        for day in recent_days:
-            date_obj = datetime.strptime(day["date"], "%Y-%m-%d")
-            dates.append(date_obj)
-            sessions.append(day["sessions_completed"])
+        if layout != chart["layout"]:
+            ax.relim()
+            ax.autoscale_view(scalex=True, scaley=False)
+            ax.set_ylim(0, y_top)
+        
+        self.render_chart(chart, data, layout)
+    
+    def create_bar_chart(self, title, ylabel, label, color, edgecolor, target_color, zones):
+        """Tạo biểu đồ cột 14 ngày (sessions/tasks) với nhãn giá trị và đường mục tiêu"""
+        dates = self.get_chart_placeholder_dates()
         
-        # Create matplotlib figure with beautiful styling for sessions only
+        # Create matplotlib figure with beautiful styling
         fig = Figure(figsize=(14, 8), dpi=100, facecolor='#f8f9fa')
         ax = fig.add_subplot(111, facecolor='#fafbfc')
         
         # Create bars with optimal width for text spacing
-        bars = ax.bar(dates, sessions, 
-                     color='#9b59b6', alpha=0.8, 
-                     edgecolor='#8e44ad', linewidth=1.5,
-                     label='Sessions', capsize=4, width=0.6)
+        bars = ax.bar(dates, [0] * len(dates), 
+                     color=color, alpha=0.8, 
+                     edgecolor=edgecolor, linewidth=1.5,
+                     label=label, capsize=4, width=0.6)
+        
+        # Value labels on bars with better styling and no overlap
+        value_labels = [
+            ax.text(0, 0, "", ha='center', va='bottom', 
+                    fontsize=12, fontweight='bold', color='#2c3e50',
+                    bbox=dict(boxstyle="round,pad=0.5", facecolor='white', 
+                              alpha=0.98, edgecolor=edgecolor, linewidth=1.5),
+                    zorder=20, visible=False)
+            for _ in bars
+        ]
         
-        ax.set_title('Daily Sessions Completed - Detailed Analysis', 
+        # Target line (updated in place)
+        target_line = ax.axhline(y=0, color=target_color, linestyle='--', 
+                                linewidth=2, alpha=0.7, label='Target')
+        
+        ax.set_title(title, 
                     fontsize=16, fontweight='bold', pad=20,
                     color='#2c3e50', fontfamily='monospace')
         ax.set_xlabel('Date', fontsize=12, color='#34495e', fontweight='500')
-        ax.set_ylabel('Sessions', fontsize=12, color='#34495e', fontweight='500')
+        ax.set_ylabel(ylabel, fontsize=12, color='#34495e', fontweight='500')
         ax.grid(True, alpha=0.4, axis='y', linestyle='-', linewidth=0.5, color='#bdc3c7')
         ax.set_axisbelow(True)
         
-        # Add value labels on bars with better styling and no overlap
-        for bar in bars:
-            height = bar.get_height()
-            if height > 0:
-                ax.text(bar.get_x() + bar.get_width()/2., height + 0.3,
-                        f'{int(height)}', ha='center', va='bottom', 
-                        fontsize=12, fontweight='bold', color='#2c3e50',
-                        bbox=dict(boxstyle="round,pad=0.5", facecolor='white', 
-                                alpha=0.98, edgecolor='#8e44ad', linewidth=1.5),
-                        zorder=20)
-        
-        # Add session target line (dynamic: sessions trung bình tháng + 2)
-        target_sessions = self.stats_manager.get_dynamic_session_goal()
-        ax.axhline(y=target_sessions, color='#3498db', linestyle='--', 
-                  linewidth=2, alpha=0.7, 
-                  label=f'🎯 Target ({target_sessions} sessions/day)')
-        
-        # Set y-axis limits to ensure labels are fully visible
-        if sessions:
-            max_sessions = max(sessions)
-            ax.set_ylim(0, max(max_sessions * 1.4, target_sessions * 1.2))
-        
         # Format x-axis with enhanced styling
-        ax.xaxis.set_major_formatter(mdates.DateFormatter('%m/%d'))
-        ax.xaxis.set_major_locator(mdates.DayLocator(interval=1))
-        plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right',
-                fontsize=11, color='#5d6d7e', fontweight='500')
+        self.style_chart_dates(ax)
         plt.setp(ax.yaxis.get_majorticklabels(), fontsize=11, color='#5d6d7e', fontweight='500')
         
         # Style axis borders
@@ -2061,176 +2197,88 @@ class DailyStatsWindow:
         ax.spines['top'].set_visible(False)
         ax.spines['right'].set_visible(False)
         
-        # Enhanced legend
-        legend = ax.legend(loc='upper left', frameon=True, fancybox=True, 
-                          shadow=True, fontsize=11, 
-                          facecolor='white', edgecolor='#bdc3c7',
-                          framealpha=0.95, borderpad=1)
-        legend.get_frame().set_linewidth(1)
+        # Performance zones (the top zone is clipped by the y limit)
+        for (low, high), zone_color in zip(zones, ('red', 'orange', 'yellow', 'green')):
+            ax.axhspan(low, high, alpha=0.05, color=zone_color, zorder=0)
         
-        # Add session performance zones
-        if sessions:
-            ax.axhspan(0, 2, alpha=0.05, color='red', zorder=0)  # Low productivity
-            ax.axhspan(2, 4, alpha=0.05, color='orange', zorder=0)  # Fair productivity  
-            ax.axhspan(4, 6, alpha=0.05, color='yellow', zorder=0)  # Good productivity
-            ax.axhspan(6, max(max_sessions * 1.4, target_sessions * 1.2), alpha=0.05, color='green', zorder=0)  # Excellent productivity
+        # Enhanced legend (rebuilt when the target label changes)
+        legend = self.create_chart_legend(ax)
         
-        # Adjust layout with better margins
-        fig.subplots_adjust(left=0.1, right=0.95, top=0.9, bottom=0.15)
-        fig.tight_layout(pad=2.0)
+        dynamic = list(bars) + [target_line] + value_labels + [legend]
+        for artist in dynamic:
+            artist.set_animated(True)
         
-        # Add to tkinter
-        canvas = FigureCanvasTkAgg(fig, session_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True, padx=5, pady=5)
+        return {
+            "fig": fig, "ax": ax, "dynamic": dynamic, "legend": legend, "dynamic_legend": True,
+            "bars": list(bars), "value_labels": value_labels, "target_line": target_line
+        }
     
-    def create_tasks_chart(self, parent):
-        """Tạo biểu đồ tasks riêng biệt với thiết kế đẹp"""
-        # Create frame for tasks chart
-        task_frame = ttk.Frame(parent, padding="15")
-        parent.add(task_frame, text="✅ Daily Tasks")
-        
-        # Get last 14 days of data
-        recent_days = self.stats_manager.get_recent_days(14)
-        
-        if not recent_days:
-            tk.Label(task_frame, text="No data available", font=("Arial", 12)).pack(expand=True)
+    def update_bar_chart(self, chart, dates, values, target, target_label):
+        """Cập nhật chiều cao cột, nhãn giá trị và đường mục tiêu"""
+        y_top = max(max(values) * 1.4, target * 1.2)
+        data = tuple(values)
+        layout = (tuple(dates), target, y_top)
+        if self.chart_is_current(chart, data, layout):
             return
         
-        # Prepare data
-        dates = []
-        tasks = []
-        
-        for day in recent_days:
-            date_obj = datetime.strptime(day["date"], "%Y-%m-%d")
-            dates.append(date_obj)
-            tasks.append(day["tasks_completed"])
-        
-        # Create matplotlib figure with beautiful styling for tasks only
-        fig = Figure(figsize=(14, 8), dpi=100, facecolor='#f8f9fa')
-        ax = fig.add_subplot(111, facecolor='#fafbfc')
-        
-        # Create bars with optimal width for text spacing
-        bars = ax.bar(dates, tasks, 
-                     color='#e74c3c', alpha=0.8,
-                     edgecolor='#c0392b', linewidth=1.5,
-                     label='Tasks', capsize=4, width=0.6)
-        
-        ax.set_title('Daily Tasks Completed - Detailed Analysis', 
-                    fontsize=16, fontweight='bold', pad=20,
-                    color='#2c3e50', fontfamily='monospace')
-        ax.set_xlabel('Date', fontsize=12, color='#34495e', fontweight='500')
-        ax.set_ylabel('Tasks', fontsize=12, color='#34495e', fontweight='500')
-        ax.grid(True, alpha=0.4, axis='y', linestyle='-', linewidth=0.5, color='#bdc3c7')
-        ax.set_axisbelow(True)
-        
-        # Add value labels on bars with better styling and no overlap
-        for bar in bars:
-            height = bar.get_height()
-            if height > 0:
-                ax.text(bar.get_x() + bar.get_width()/2., height + 0.3,
-                        f'{int(height)}', ha='center', va='bottom', 
-                        fontsize=12, fontweight='bold', color='#2c3e50',
-                        bbox=dict(boxstyle="round,pad=0.5", facecolor='white', 
-                                alpha=0.98, edgecolor='#c0392b', linewidth=1.5),
-                        zorder=20)
-        
-        # Add task target line (example: 8 tasks per day)
+        ax = chart["ax"]
+        for bar, value_label, x_value, value in zip(chart["bars"], chart["value_labels"], mdates.date2num(dates), values):
+            bar.set_x(x_value - bar.get_width() / 2)
+            bar.set_height(value)
+            value_label.set_position((x_value, value + 0.3))
+            value_label.set_text(f'{int(value)}')
+            value_label.set_visible(value > 0)
+        chart["target_line"].set_ydata([target, target])
+        chart["target_line"].set_label(target_label)
+        
+        if layout != chart["layout"]:
+            ax.relim()
+            ax.autoscale_view(scalex=True, scaley=False)
+            ax.set_ylim(0, y_top)
+        
+        self.render_chart(chart, data, layout)
+    
+    def create_sessions_chart(self):
+        """Tạo biểu đồ sessions riêng biệt với thiết kế đẹp"""
+        return self.create_bar_chart(
+            'Daily Sessions Completed - Detailed Analysis', 'Sessions', 'Sessions',
+            '#9b59b6', '#8e44ad', '#3498db',
+            zones=((0, 2), (2, 4), (4, 6), (6, 1000))
+        )
+    
+    def update_sessions_chart(self, chart, dates, recent_days):
+        """Cập nhật biểu đồ sessions (mục tiêu động: sessions trung bình tháng + 2)"""
+        sessions = [day["sessions_completed"] for day in recent_days]
+        target_sessions = self.stats_manager.get_dynamic_session_goal()
+        self.update_bar_chart(chart, dates, sessions, target_sessions,
+                              f'🎯 Target ({target_sessions} sessions/day)')
+    
+    def create_tasks_chart(self):
+        """Tạo biểu đồ tasks riêng biệt với thiết kế đẹp"""
+        return self.create_bar_chart(
+            'Daily Tasks Completed - Detailed Analysis', 'Tasks', 'Tasks',
+            '#e74c3c', '#c0392b', '#27ae60',
+            zones=((0, 3), (3, 5), (5, 8), (8, 1000))
+        )
+    
+    def update_tasks_chart(self, chart, dates, recent_days):
+        """Cập nhật biểu đồ tasks (mục tiêu: 8 tasks mỗi ngày)"""
+        tasks = [day["tasks_completed"] for day in recent_days]
         target_tasks = 8
-        ax.axhline(y=target_tasks, color='#27ae60', linestyle='--', 
-                  linewidth=2, alpha=0.7, 
-                  label=f'✅ Target ({target_tasks} tasks/day)')
-        
-        # Set y-axis limits to ensure labels are fully visible
-        if tasks:
-            max_tasks = max(tasks)
-            ax.set_ylim(0, max(max_tasks * 1.4, target_tasks * 1.2))
-        
-        # Format x-axis with enhanced styling
-        ax.xaxis.set_major_formatter(mdates.DateFormatter('%m/%d'))
-        ax.xaxis.set_major_locator(mdates.DayLocator(interval=1))
-        plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right',
-                fontsize=11, color='#5d6d7e', fontweight='500')
-        plt.setp(ax.yaxis.get_majorticklabels(), fontsize=11, color='#5d6d7e', fontweight='500')
-        
-        # Style axis borders
-        for spine in ax.spines.values():
-            spine.set_color('#d5dbdb')
-            spine.set_linewidth(1)
-        
-        # Remove top and right spines
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
-        
-        # Enhanced legend
-        legend = ax.legend(loc='upper left', frameon=True, fancybox=True, 
-                          shadow=True, fontsize=11, 
-                          facecolor='white', edgecolor='#bdc3c7',
-                          framealpha=0.95, borderpad=1)
-        legend.get_frame().set_linewidth(1)
-        
-        # Add task performance zones
-        if tasks:
-            ax.axhspan(0, 3, alpha=0.05, color='red', zorder=0)  # Low productivity
-            ax.axhspan(3, 5, alpha=0.05, color='orange', zorder=0)  # Fair productivity  
-            ax.axhspan(5, 8, alpha=0.05, color='yellow', zorder=0)  # Good productivity
-            ax.axhspan(8, max(max_tasks * 1.4, target_tasks * 1.2), alpha=0.05, color='green', zorder=0)  # Excellent productivity
-        
-        # Adjust layout with better margins
-        fig.subplots_adjust(left=0.1, right=0.95, top=0.9, bottom=0.15)
-        fig.tight_layout(pad=2.0)
-        
-        # Add to tkinter
-        canvas = FigureCanvasTkAgg(fig, task_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True, padx=5, pady=5)
+        self.update_bar_chart(chart, dates, tasks, target_tasks,
+                              f'✅ Target ({target_tasks} tasks/day)')
     
-    def create_efficiency_chart(self, parent):
+    def create_efficiency_chart(self):
         """Tạo biểu đồ hiệu suất với thiết kế đẹp"""
-        # Create frame for efficiency chart
-        efficiency_frame = ttk.Frame(parent, padding="15")
-        parent.add(efficiency_frame, text="⚡ Efficiency")
-        
-        # Get last 14 days of data
-        recent_days = self.stats_manager.get_recent_days(14)
-        
-        if not recent_days:
-            tk.Label(efficiency_frame, text="No data available", font=("Arial", 12)).pack(expand=True)
-            return
-        
-        # Prepare data
-        dates = []
-        efficiency_values = []
-        goal_progress = []
-        
-        for day in recent_days:
-            date_obj = datetime.strptime(day["date"], "%Y-%m-%d")
-            dates.append(date_obj)
-            
-            # Calculate efficiency
-            study_time = day["study_time"]
-            break_time = day["break_time"]
-            total_time = study_time + break_time
-            
-            if total_time > 0:
-                efficiency = (study_time / total_time) * 100
-            else:
-                efficiency = 0
-            efficiency_values.append(efficiency)
-            
-            # Calculate goal progress (dynamic daily goal)
-            day_date = datetime.strptime(day["date"], "%Y-%m-%d").date()
-            daily_goal_hours = self.stats_manager.get_dynamic_daily_goal(day_date)
-            daily_goal_seconds = daily_goal_hours * 3600
-            progress = min((study_time / daily_goal_seconds) * 100, 100)
-            goal_progress.append(progress)
+        dates = self.get_chart_placeholder_dates()
+        zeros = [0] * len(dates)
         
         # Create matplotlib figure with enhanced styling and larger size for better visibility
         fig = Figure(figsize=(14, 8), dpi=100, facecolor='#f8f9fa')
         ax = fig.add_subplot(111, facecolor='#fafbfc')
         
         # Plot efficiency with enhanced styling
-        line1 = ax.plot(dates, efficiency_values, 
+        efficiency_line, = ax.plot(dates, zeros, 
                        marker='o', linewidth=3, markersize=8,
                        color='#1abc9c', label='⚡ Study Efficiency (%)', 
                        alpha=0.9, markerfacecolor='#16a085',
@@ -2238,13 +2286,13 @@ class DailyStatsWindow:
                        zorder=3)
         
         # Add area fill under efficiency line
-        ax.fill_between(dates, efficiency_values, alpha=0.2, color='#1abc9c', zorder=1)
+        efficiency_fill = ax.fill_between(dates, zeros, alpha=0.2, color='#1abc9c', zorder=1)
         
         # Create second y-axis for goal progress
         ax2 = ax.twinx()
         ax2.patch.set_alpha(0)  # Make background transparent
         
-        line2 = ax2.plot(dates, goal_progress, 
+        progress_line, = ax2.plot(dates, zeros, 
                         marker='D', linewidth=2.5, markersize=6,
                         color='#3498db', label='🎯 Goal Progress (%)', 
                         alpha=0.8, markerfacecolor='#2980b9',
@@ -2276,10 +2324,7 @@ class DailyStatsWindow:
                                label='🏆 Goal Achievement (100%)')
         
         # Format x-axis with better styling and proper spacing
-        ax.xaxis.set_major_formatter(mdates.DateFormatter('%m/%d'))
-        ax.xaxis.set_major_locator(mdates.DayLocator(interval=1))
-        plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right',
-                fontsize=11, color='#5d6d7e', fontweight='500')
+        self.style_chart_dates(ax)
         
         # Style y-axis labels with better visibility
         plt.setp(ax.yaxis.get_majorticklabels(), fontsize=11, color='#16a085', fontweight='500')
@@ -2299,17 +2344,10 @@ class DailyStatsWindow:
                 ax2.spines[spine_name].set_color('#d5dbdb')
                 ax2.spines[spine_name].set_linewidth(1)
         
-        # Adjust layout with better margins for text visibility
-        fig.subplots_adjust(left=0.1, right=0.9, top=0.9, bottom=0.15)
-        
         # Beautiful legend with multiple entries
-        lines = line1 + line2 + [excellent_line, goal_line]
+        lines = [efficiency_line, progress_line, excellent_line, goal_line]
         labels = [l.get_label() for l in lines]
-        legend = ax.legend(lines, labels, loc='upper left', frameon=True, 
-                          fancybox=True, shadow=True, fontsize=11,
-                          facecolor='white', edgecolor='#bdc3c7',
-                          framealpha=0.95, borderpad=1)
-        legend.get_frame().set_linewidth(1)
+        legend = self.create_chart_legend(ax, lines, labels)
         
         # Add performance zones with subtle background colors
         ax.axhspan(0, 40, alpha=0.05, color='red', zorder=0)  # Poor zone
@@ -2317,13 +2355,54 @@ class DailyStatsWindow:
         ax.axhspan(60, 80, alpha=0.05, color='yellow', zorder=0)  # Good zone
         ax.axhspan(80, 100, alpha=0.05, color='green', zorder=0)  # Excellent zone
         
-        # Tight layout with padding
-        fig.tight_layout(pad=2.0)
+        dynamic = [efficiency_fill, efficiency_line, progress_line, legend]
+        for artist in dynamic:
+            artist.set_animated(True)
         
-        # Add to tkinter
-        canvas = FigureCanvasTkAgg(fig, efficiency_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True, padx=5, pady=5)
+        return {
+            "fig": fig, "ax": ax, "ax2": ax2, "dynamic": dynamic, "legend": legend,
+            "efficiency_line": efficiency_line, "efficiency_fill": efficiency_fill,
+            "progress_line": progress_line
+        }
+    
+    def update_efficiency_chart(self, chart, dates, recent_days):
+        """Cập nhật biểu đồ hiệu suất và tiến độ mục tiêu"""
+        efficiency_values = []
+        goal_progress = []
+        
+        for day_date, day in zip(dates, recent_days):
+            # Calculate efficiency
+            study_time = day["study_time"]
+            break_time = day["break_time"]
+            total_time = study_time + break_time
+            
+            if total_time > 0:
+                efficiency = (study_time / total_time) * 100
+            else:
+                efficiency = 0
+            efficiency_values.append(efficiency)
+            
+            # Calculate goal progress (dynamic daily goal, cached per month)
+            daily_goal_seconds = self.stats_manager.get_dynamic_daily_goal(day_date.date()) * 3600
+            progress = min((study_time / daily_goal_seconds) * 100, 100)
+            goal_progress.append(progress)
+        
+        data = (tuple(efficiency_values), tuple(goal_progress))
+        layout = tuple(dates)
+        if self.chart_is_current(chart, data, layout):
+            return
+        
+        ax = chart["ax"]
+        x_values = mdates.date2num(dates)
+        chart["efficiency_line"].set_data(dates, efficiency_values)
+        chart["efficiency_fill"].set_verts([self.area_vertices(x_values, efficiency_values)])
+        chart["progress_line"].set_data(dates, goal_progress)
+        
+        if layout != chart["layout"]:
+            ax.relim()
+            ax.autoscale_view(scalex=True, scaley=False)
+        
+        self.render_chart(chart, data, layout)
     
     def create_chart_placeholder(self, parent):
         """Tạo placeholder khi matplotlib không có sẵn"""
@@ -2398,34 +2477,31 @@ class DailyStatsWindow:
         except ValueError:
             return
         
-        # Get yearly data
-        yearly_data = self.stats_manager.get_yearly_data(year)
+        # Get raw yearly totals (seconds/counts) - format only for display
+        yearly_totals = self.stats_manager.get_yearly_totals(year)
         
         # Update cards
-        self.yearly_study_label.config(text=yearly_data["total_study_time"])
-        self.yearly_active_label.config(text=f"{yearly_data['active_days']}/365")
-        self.yearly_monthly_avg_label.config(text=f"{yearly_data['study_hours_per_month']:.1f}h")
-        self.yearly_sessions_label.config(text=str(yearly_data["total_sessions"]))
+        self.yearly_study_label.config(text=self.stats_manager.format_time(yearly_totals["study_time"]))
+        self.yearly_active_label.config(text=f"{yearly_totals['active_days']}/365")
+        self.yearly_monthly_avg_label.config(text=f"{yearly_totals['study_time'] / 3600 / 12:.1f}h")
+        self.yearly_sessions_label.config(text=str(yearly_totals["sessions_completed"]))
         
         # Update monthly breakdown table
-        self.update_yearly_table(yearly_data)
+        self.update_yearly_table(yearly_totals)
 
-    def update_yearly_table(self, yearly_data):
+    def update_yearly_table(self, yearly_totals):
         """Cập nhật bảng thống kê tháng trong năm"""
-        # Clear existing items
-        for item in self.yearly_tree.get_children():
-            self.yearly_tree.delete(item)
-        
+        rows = []
         current_month = datetime.now().month
         current_year = datetime.now().year
         selected_year = int(self.year_combo.get())
         
-        for month_data in yearly_data["monthly_stats"]:
+        for month_data in yearly_totals["months"]:
             month = month_data["month"]
             
             # Calculate efficiency for the month
-            total_study = self.stats_manager.time_to_seconds(month_data["total_study_time"])
-            total_break = self.stats_manager.time_to_seconds(month_data["total_break_time"])
+            total_study = month_data["study_time"]
+            total_break = month_data["break_time"]
             total_time = total_study + total_break
             
             if total_time > 0:
@@ -2448,7 +2524,7 @@ class DailyStatsWindow:
                 tag = ''
             
             # Add visual indicators
-            study_display = month_data["total_study_time"]
+            study_display = self.stats_manager.format_time(total_study)
             if study_hours >= 80:
                 study_display += " 🔥"
             elif study_hours >= 40:
@@ -2456,15 +2532,23 @@ class DailyStatsWindow:
             elif study_hours > 0:
                 study_display += " ⏱️"
             
-            self.yearly_tree.insert("", "end", values=(
-                month_data["month_name"],
+            sessions = month_data["sessions_completed"]
+            tasks = month_data["tasks_completed"]
+            active_days = month_data["active_days"]
+            days_in_month = month_data["days_in_month"]
+            
+            rows.append((month, (
+                datetime(yearly_totals["year"], month, 1).strftime("%B %Y"),
                 study_display,
-                month_data["total_break_time"],
-                f"{month_data['total_sessions']} 🎯" if month_data['total_sessions'] > 0 else "0",
-                f"{month_data['total_tasks']} ✅" if month_data['total_tasks'] > 0 else "0",
-                f"{month_data['active_days']}/{month_data['days_in_month']}",
-                month_data["productivity_rate"]
-            ), tags=(tag,))
+                self.stats_manager.format_time(total_break),
+                f"{sessions} 🎯" if sessions > 0 else "0",
+                f"{tasks} ✅" if tasks > 0 else "0",
+                f"{active_days}/{days_in_month}",
+                f"{(active_days / days_in_month * 100):.1f}%"
+            ), (tag,)))
+        
+        # Chỉ cập nhật các tháng thay đổi
+        self.yearly_rows.sync(rows)
 
     # Data Explorer methods
     def load_data_range(self, days):
@@ -2521,14 +2605,16 @@ class DailyStatsWindow:
         if not self.current_data:
             summary = "📊 No data available for selected range."
         else:
-            total_study = sum(day["study_time"] for day in self.current_data)
-            total_sessions = sum(day["sessions_completed"] for day in self.current_data)
-            total_tasks = sum(day["tasks_completed"] for day in self.current_data)
-            active_days = len([day for day in self.current_data if day["study_time"] > 0])
-            
             first_date = self.current_data[0]["date"]
             last_date = self.current_data[-1]["date"]
             
+            # Tổng khoảng ngày tra từ prefix-sum index thay vì cộng từng ngày
+            totals = self.stats_manager.get_range_totals(first_date, last_date)
+            total_study = totals["study_time"]
+            total_sessions = totals["sessions_completed"]
+            total_tasks = totals["tasks_completed"]
+            active_days = totals["active_days"]
+            
             summary = f"""📊 Summary for {first_date} to {last_date} ({len(self.current_data)} days):
 📚 Total Study Time: {self.stats_manager.format_time(total_study)} ({total_study/3600:.1f} hours)
 🎯 Total Sessions: {total_sessions} | ✅ Total Tasks: {total_tasks}
@@ -2543,14 +2629,12 @@ class DailyStatsWindow:
         if not hasattr(self, 'explorer_tree'):
             return
         
-        # Clear existing items
-        for item in self.explorer_tree.get_children():
-            self.explorer_tree.delete(item)
-        
         if not self.current_data:
+            self.explorer_rows.clear()
             return
         
         today_key = self.stats_manager.get_today_key()
+        rows = []
         
         for day in self.current_data:
             # Calculate efficiency
@@ -2564,11 +2648,10 @@ class DailyStatsWindow:
             else:
                 efficiency_text = "--"
             
-            # Calculate goal progress (dynamic daily goal)
-            day_date = datetime.strptime(day["date"], "%Y-%m-%d").date()
-            daily_goal_hours = self.stats_manager.get_dynamic_daily_goal(day_date)
-            daily_goal_seconds = daily_goal_hours * 3600
+            # Calculate goal progress (dynamic daily goal, cached per month)
             if study_time > 0:
+                day_date = datetime.strptime(day["date"], "%Y-%m-%d").date()
+                daily_goal_seconds = self.stats_manager.get_dynamic_daily_goal(day_date) * 3600
                 goal_progress = min((study_time / daily_goal_seconds) * 100, 100)
                 goal_text = f"{goal_progress:.1f}%"
             else:
@@ -2607,7 +2690,7 @@ class DailyStatsWindow:
             elif study_time > 0:
                 study_display += " ⏱️"
             
-            self.explorer_tree.insert("", "end", values=(
+            rows.append((day["date"], (
                 formatted_date,
                 study_display,
                 day["formatted_break_time"],
@@ -2615,11 +2698,17 @@ class DailyStatsWindow:
                 f"{day['tasks_completed']} ✅" if day['tasks_completed'] > 0 else "0",
                 efficiency_text,
                 goal_text
-            ), tags=(tag,))
+            ), (tag,)))
+        
+        # Chỉ cập nhật các dòng thay đổi (key = ngày)
+        self.explorer_rows.sync(rows)
 
     def refresh_explorer_data(self):
         """Refresh current data in explorer"""
-        if hasattr(self, 'current_data'):
+        if not self.current_data:
+            # Initialize with last 30 days
+            self.load_data_range(30)
+        else:
             self.update_explorer_display()
     
     def toggle_efficiency_info(self, event=None):
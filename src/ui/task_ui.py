@@ -5,12 +5,19 @@ Task UI Components - Giao diện quản lý tasks
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
 
+from .virtual_listbox import VirtualListbox
+
+PRIORITY_ICONS = {'high': '🔴', 'normal': '🟡', 'low': '🟢'}
+
+
 class TaskUI:
     def __init__(self, parent_frame):
         self.parent_frame = parent_frame
         self.tasks_frame = None
         self.task_listbox = None
         self.completed_listbox = None
+        self.task_rows = None  # VirtualListbox của task_listbox
+        self.completed_rows = None  # VirtualListbox của completed_listbox
         self.task_entry = None
         self.summary_label = None
         
@@ -87,6 +94,7 @@ class TaskUI:
             selectbackground="blue"
         )
         self.task_listbox.pack(fill=tk.BOTH, expand=True)
+        self.task_rows = VirtualListbox(self.task_listbox)
 
         # Active tasks buttons - smaller
         active_btn_frame = tk.Frame(active_frame, bg='black')
@@ -165,6 +173,7 @@ class TaskUI:
             selectbackground="darkgreen"
         )
         self.completed_listbox.pack(fill=tk.BOTH, expand=True)
+        self.completed_rows = VirtualListbox(self.completed_listbox)
 
         # Completed tasks buttons frame
         completed_buttons_frame = tk.Frame(completed_frame, bg='black')
@@ -211,19 +220,17 @@ class TaskUI:
         """Xử lý sự kiện hoàn thành task"""
         if self.play_sound:
             self.play_sound()
-        selection = self.task_listbox.curselection()
-        if selection and self.on_complete_task:
-            index = selection[0]
+        index = self.task_rows.selected_index()
+        if index is not None and self.on_complete_task:
             self.on_complete_task(index)
 
     def _on_edit_task_clicked(self):
         """Xử lý sự kiện chỉnh sửa task"""
         if self.play_sound:
             self.play_sound()
-        selection = self.task_listbox.curselection()
-        if selection and self.on_edit_task:
-            index = selection[0]
-            current_text = self.task_listbox.get(index)
+        index = self.task_rows.selected_index()
+        if index is not None and self.on_edit_task:
+            current_text = self.task_rows.get(index)
             # Remove priority prefix if exists
             if current_text.startswith(('🔴 ', '🟡 ', '🟢 ')):
                 current_text = current_text[2:]
@@ -236,26 +243,24 @@ class TaskUI:
         """Xử lý sự kiện xóa task"""
         if self.play_sound:
             self.play_sound()
-        selection = self.task_listbox.curselection()
-        if selection and self.on_delete_task:
+        index = self.task_rows.selected_index()
+        if index is not None and self.on_delete_task:
             if messagebox.askyesno("Confirm Delete", "Are you sure you want to delete this task?"):
-                index = selection[0]
                 self.on_delete_task(index)
 
     def _on_reactivate_task_clicked(self):
         """Xử lý sự kiện reactivate completed task"""
         if self.play_sound:
             self.play_sound()
-        selection = self.completed_listbox.curselection()
-        if selection and self.on_reactivate_task:
-            index = selection[0]
+        index = self.completed_rows.selected_index()
+        if index is not None and self.on_reactivate_task:
             self.on_reactivate_task(index)
 
     def _on_clear_completed_clicked(self):
         """Xử lý sự kiện xóa tất cả completed tasks"""
         if self.play_sound:
             self.play_sound()
-        if self.completed_listbox.size() > 0:
+        if self.completed_rows.size() > 0:
             if messagebox.askyesno("Clear Completed", "Clear all completed tasks?"):
                 if hasattr(self, 'on_clear_completed') and self.on_clear_completed:
                     self.on_clear_completed()
@@ -264,40 +269,56 @@ class TaskUI:
         """Xử lý sự kiện di chuyển task lên trên"""
         if self.play_sound:
             self.play_sound()
-        selection = self.task_listbox.curselection()
-        if selection and self.on_move_task_up:
-            index = selection[0]
+        index = self.task_rows.selected_index()
+        if index is not None and self.on_move_task_up:
             if index > 0:  # Cannot move up if already at the top of the list
                 self.on_move_task_up(index)
                 # Keep selection after moving
-                self.task_listbox.selection_set(index - 1)
+                self.task_rows.select(index - 1)
 
     def _on_move_task_down_clicked(self):
         """Xử lý sự kiện di chuyển task xuống dưới"""
         if self.play_sound:
             self.play_sound()
-        selection = self.task_listbox.curselection()
-        if selection and self.on_move_task_down:
-            index = selection[0]
-            if index < self.task_listbox.size() - 1:  # Cannot move down if already at the bottom of the list
+        index = self.task_rows.selected_index()
+        if index is not None and self.on_move_task_down:
+            if index < self.task_rows.size() - 1:  # Cannot move down if already at the bottom of the list
                 self.on_move_task_down(index)
                 # Keep selection after moving
-                self.task_listbox.selection_set(index + 1)
+                self.task_rows.select(index + 1)
+
+    @staticmethod
+    def _format_task(task):
+        """Dòng hiển thị của active task (kèm priority indicator)"""
+        priority_icon = PRIORITY_ICONS.get(task.get('priority', 'normal'), '🟡')
+        return f"{priority_icon} {task['text']}"
+
+    @staticmethod
+    def _format_completed_task(task):
+        """Dòng hiển thị của completed task"""
+        return f"✅ {task['text']}"
 
     def update_task_list(self, tasks):
         """Update task list"""
-        self.task_listbox.delete(0, tk.END)
-        for task in tasks:
-            # Add priority indicator
-            priority_icon = {'high': '🔴', 'normal': '🟡', 'low': '🟢'}.get(task.get('priority', 'normal'), '🟡')
-            display_text = f"{priority_icon} {task['text']}"
-            self.task_listbox.insert(tk.END, display_text)
+        self.task_rows.set_rows(self._format_task(task) for task in tasks)
 
     def update_completed_list(self, completed_tasks):
         """Cập nhật danh sách completed tasks"""
-        self.completed_listbox.delete(0, tk.END)
-        for task in completed_tasks:
-            self.completed_listbox.insert(tk.END, f"✅ {task['text']}")
+        self.completed_rows.set_rows(self._format_completed_task(task) for task in completed_tasks)
+
+    def apply_list_change(self, list_name, change, index, task):
+        """Cập nhật một dòng của danh sách "active"/"completed" (insert/delete/update)"""
+        if list_name == "active":
+            rows, text = self.task_rows, self._format_task(task) if task else None
+        else:
+            rows, text = self.completed_rows, self._format_completed_task(task) if task else None
+        
+        if change == "insert":
+            rows.insert(index, text)
+        elif change == "delete":
+            rows.delete(index)
+        elif change == "update":
+            rows.update(index, text)
 
     def update_summary(self, summary):
         """Cập nhật task summary"""
@@ -0,0 +1,60 @@
+"""
+Treeview Sync - Keyed row diffing cho ttk.Treeview
+"""
+
+from typing import Any, Dict, Hashable, Iterable, List, Sequence, Tuple
+
+
+class TreeviewRowSync:
+    """
+    Keeps a flat ttk.Treeview in sync with a list of keyed rows.
+
+    Each row's key is used as its item ID, so refreshing the table only
+    touches rows whose values or tags changed, moves rows whose position
+    changed, and inserts/deletes the difference instead of rebuilding.
+    """
+
+    def __init__(self, tree):
+        self.tree = tree
+        self._rows: Dict[str, Tuple[Tuple[Any, ...], Tuple[str, ...]]] = {}  # iid -> (values, tags)
+        self._order: List[str] = []
+
+    def sync(self, rows: Iterable[Tuple[Hashable, Sequence[Any], Sequence[str]]]):
+        """Cập nhật bảng theo danh sách (key, values, tags) theo thứ tự hiển thị"""
+        new_rows = {}
+        new_order = []
+        for key, values, tags in rows:
+            iid = str(key)
+            new_rows[iid] = (tuple(values), tuple(tags))
+            new_order.append(iid)
+
+        # Xóa các dòng không còn
+        stale = [iid for iid in self._order if iid not in new_rows]
+        if stale:
+            self.tree.delete(*stale)
+            for iid in stale:
+                del self._rows[iid]
+
+        # Chỉ cần move khi thứ tự tương đối của các dòng cũ thay đổi
+        surviving = [iid for iid in self._order if iid in new_rows]
+        needs_move = surviving != [iid for iid in new_order if iid in self._rows]
+        for index, iid in enumerate(new_order):
+            values, tags = new_rows[iid]
+            current = self._rows.get(iid)
+            if current is None:
+                self.tree.insert("", index, iid=iid, values=values, tags=tags)
+                continue
+            if current != (values, tags):
+                self.tree.item(iid, values=values, tags=tags)
+            if needs_move:
+                self.tree.move(iid, "", index)
+
+        self._rows = new_rows
+        self._order = new_order
+
+    def clear(self):
+        """Xóa toàn bộ dòng"""
+        if self._order:
+            self.tree.delete(*self._order)
+        self._rows.clear()
+        self._order.clear()
@@ -4,9 +4,10 @@ UI Components Module - Main user interface components for the Study Timer
 
 import tkinter as tk
 from tkinter import font as tkfont
-from typing import Dict
+from typing import Any, Dict, Tuple
 
 from .task_ui import TaskUI
+from .widget_state import WidgetStateCache
 
 # Session duration options mapping
 SESSION_DURATION_OPTIONS: Dict[str, int] = {
@@ -22,10 +23,30 @@ SESSION_DURATION_OPTIONS: Dict[str, int] = {
 
 
 class StudyTimerUI:
-    """Main UI class for the Study Timer interface"""
+    """
+    Main UI class for the Study Timer interface.
+    
+    The timer, session and progress labels and the toggle button are
+    configured through ``self.view`` (a WidgetStateCache), so a tick that
+    does not change the visible text or colours issues no Tk calls.
+    
+    While the root window is iconified or withdrawn, the per-second display
+    updates (timers, progress) are not pushed into the widgets; only the
+    latest call of each is kept and repainted once when the window is mapped
+    again. Timing and stats are unaffected.
+    """
     
     def __init__(self, root: tk.Tk):
         self.root = root
+        
+        # Throttle khi cửa sổ bị ẩn: tên method -> tham số của lần gọi mới nhất
+        self._window_hidden = False
+        self._flushing_updates = False
+        self._pending_updates: Dict[str, Tuple[Any, ...]] = {}
+        
+        # Giá trị đã hiển thị của các label cập nhật mỗi giây - bỏ qua config trùng lặp
+        self.view = WidgetStateCache()
+        
         self._setup_window()
         self._create_widgets()
         
@@ -79,6 +100,40 @@ class StudyTimerUI:
         # Bind keyboard shortcut for debug toggle (Ctrl+D)
         self.root.bind('<Control-d>', lambda e: self._on_debug_toggle_clicked())
         self.root.bind('<Control-D>', lambda e: self._on_debug_toggle_clicked())
+        
+        # Phát hiện cửa sổ bị minimize/withdraw để bỏ qua các cập nhật hiển thị
+        self.root.bind('<Unmap>', self._on_root_unmap, add='+')
+        self.root.bind('<Map>', self._on_root_map, add='+')
+
+    def _on_root_unmap(self, event):
+        """Cửa sổ chính bị iconify/withdraw (bỏ qua Unmap của widget con)"""
+        if event.widget is self.root:
+            self._window_hidden = True
+
+    def _on_root_map(self, event):
+        """Cửa sổ chính hiện lại - vẽ một lần trạng thái mới nhất"""
+        if event.widget is self.root and self._window_hidden:
+            self._window_hidden = False
+            self._flush_pending_updates()
+
+    def _defer_if_hidden(self, method_name: str, *args) -> bool:
+        """Khi cửa sổ ẩn: ghi nhớ lần gọi mới nhất thay vì cập nhật widget, trả về True nếu đã hoãn"""
+        if not self._window_hidden or self._flushing_updates:
+            return False
+        # Đưa xuống cuối để khi vẽ lại giữ đúng thứ tự của lần gọi cuối cùng
+        self._pending_updates.pop(method_name, None)
+        self._pending_updates[method_name] = args
+        return True
+
+    def _flush_pending_updates(self):
+        """Áp dụng các cập nhật đã hoãn theo thứ tự"""
+        pending, self._pending_updates = self._pending_updates, {}
+        self._flushing_updates = True
+        try:
+            for method_name, args in pending.items():
+                getattr(self, method_name)(*args)
+        finally:
+            self._flushing_updates = False
 
     def _create_widgets(self):
         """Tạo các widget UI"""
@@ -474,17 +529,22 @@ class StudyTimerUI:
 
     def update_main_timer_display(self, time_text):
         """Cập nhật hiển thị main timer"""
-        self.main_timer_label.config(text=time_text)
+        if self._defer_if_hidden('update_main_timer_display', time_text):
+            return
+        self.view.config(self.main_timer_label, text=time_text)
 
     def update_break_timer_display(self, time_text, break_session_seconds=0):
         """Cập nhật hiển thị break timer với màu sắc dựa trên hidden timer"""
-        self.break_timer_label.config(text=f"Break: {time_text}")
+        if self._defer_if_hidden('update_break_timer_display', time_text, break_session_seconds):
+            return
+        
+        self.view.config(self.break_timer_label, text=f"Break: {time_text}")
         
         # Format hidden timer (MM:SS format)
         hidden_mins = break_session_seconds // 60
         hidden_secs = break_session_seconds % 60
         hidden_text = f"{hidden_mins:02d}:{hidden_secs:02d}"
-        self.hidden_timer_label.config(text=hidden_text)
+        self.view.config(self.hidden_timer_label, text=hidden_text)
         
         # Change color based on current break session time
         if break_session_seconds >= 20 * 60:  # 20+ minutes: red color
@@ -496,43 +556,49 @@ class StudyTimerUI:
         
         # Only change color when break timer is active
         if hasattr(self, '_break_timer_active') and self._break_timer_active:
-            self.break_timer_label.config(fg=color)
-            self.hidden_timer_label.config(fg=color)
+            self.view.config(self.break_timer_label, fg=color)
+            self.view.config(self.hidden_timer_label, fg=color)
         else:
-            self.hidden_timer_label.config(fg="gray")
+            self.view.config(self.hidden_timer_label, fg="gray")
 
     def update_button_state(self, state):
         """Cập nhật trạng thái các nút theo dual clock system"""
+        # Đổi trạng thái hiếm khi xảy ra: áp dụng các cập nhật đang hoãn trước để giữ đúng thứ tự
+        if self._pending_updates:
+            self._flush_pending_updates()
+        
         if state == "main_running":
-            self.toggle_btn.config(text="🔄 → BREAK", bg="orange")
-            self.main_timer_label.config(fg="lime")
-            self.break_timer_label.config(fg="gray")
-            self.hidden_timer_label.config(text="00:00", fg="gray")
+            self.view.config(self.toggle_btn, text="🔄 → BREAK", bg="orange")
+            self.view.config(self.main_timer_label, fg="lime")
+            self.view.config(self.break_timer_label, fg="gray")
+            self.view.config(self.hidden_timer_label, text="00:00", fg="gray")
             self._break_timer_active = False
         elif state == "break_running":
-            self.toggle_btn.config(text="🔄 → MAIN", bg="blue")
-            self.main_timer_label.config(fg="gray")
-            self.break_timer_label.config(fg="cyan")
+            self.view.config(self.toggle_btn, text="🔄 → MAIN", bg="blue")
+            self.view.config(self.main_timer_label, fg="gray")
+            self.view.config(self.break_timer_label, fg="cyan")
             self._break_timer_active = True
         elif state == "all_frozen":
-            self.toggle_btn.config(text="▶ START", bg="green")
-            self.main_timer_label.config(fg="white")
-            self.break_timer_label.config(fg="white")
+            self.view.config(self.toggle_btn, text="▶ START", bg="green")
+            self.view.config(self.main_timer_label, fg="white")
+            self.view.config(self.break_timer_label, fg="white")
             self._break_timer_active = False
         elif state == "reset":
-            self.toggle_btn.config(text="▶ START", bg="green")
-            self.main_timer_label.config(text="00:00:00", fg="white")
-            self.break_timer_label.config(text="Break: 00:00:00", fg="white")
-            self.hidden_timer_label.config(text="00:00", fg="gray")
+            self.view.config(self.toggle_btn, text="▶ START", bg="green")
+            self.view.config(self.main_timer_label, text="00:00:00", fg="white")
+            self.view.config(self.break_timer_label, text="Break: 00:00:00", fg="white")
+            self.view.config(self.hidden_timer_label, text="00:00", fg="gray")
             self._break_timer_active = False
 
     def update_session_display(self, current, target):
         """Cập nhật hiển thị session"""
-        self.session_label.config(text=f"Session: {current}/{target}")
+        self.view.config(self.session_label, text=f"Session: {current}/{target}")
 
     def update_progress_display(self, progress):
         """Cập nhật hiển thị tiến độ"""
-        self.progress_label.config(text=f"Progress: {progress:.1f}%")
+        if self._defer_if_hidden('update_progress_display', progress):
+            return
+        self.view.config(self.progress_label, text=f"Progress: {progress:.1f}%")
 
     def update_mute_button(self, is_muted):
         """Cập nhật trạng thái hiển thị nút mute"""
@@ -574,6 +640,10 @@ class StudyTimerUI:
         """Cập nhật danh sách completed tasks"""
         self.task_ui.update_completed_list(completed_tasks)
 
+    def apply_task_list_change(self, list_name, change, index, task):
+        """Cập nhật một dòng trong danh sách tasks"""
+        self.task_ui.apply_list_change(list_name, change, index, task)
+
     def update_task_summary(self, summary):
         """Cập nhật task summary"""
         self.task_ui.update_summary(summary)
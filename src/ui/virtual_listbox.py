@@ -0,0 +1,152 @@
+"""
+Virtual Listbox - Chỉ hiển thị một cửa sổ các dòng của tk.Listbox cho danh sách lớn
+"""
+
+import tkinter as tk
+from typing import Iterable, List, Optional
+
+# Số dòng tối đa thực sự nằm trong Listbox
+DEFAULT_WINDOW_SIZE = 300
+
+# Khi view cách mép cửa sổ ít hơn tỉ lệ này thì dời cửa sổ
+_EDGE_FRACTION = 0.1
+
+
+class VirtualListbox:
+    """
+    Keeps a tk.Listbox showing a sliding window of a larger list of rows.
+
+    The full list lives in ``rows``; the Listbox only holds at most
+    ``window_size`` of them starting at ``start``. Single-row ``insert``,
+    ``delete`` and ``update`` touch at most two Listbox rows, and scrolling
+    near either edge of the window slides it, so the cost of a change does
+    not grow with the length of the list. Indexes in this API are always
+    absolute row indexes.
+    """
+
+    def __init__(self, listbox: tk.Listbox, window_size: int = DEFAULT_WINDOW_SIZE):
+        self.listbox = listbox
+        self.window_size = window_size
+        self.rows: List[str] = []
+        self.start = 0  # Index tuyệt đối của dòng đầu tiên trong Listbox
+        self._shift_pending = False
+        self.listbox.config(yscrollcommand=self._on_yscroll)
+
+    @property
+    def end(self) -> int:
+        """Index tuyệt đối ngay sau dòng cuối cùng trong Listbox"""
+        return min(self.start + self.window_size, len(self.rows))
+
+    def size(self) -> int:
+        """Tổng số dòng (kể cả dòng chưa hiển thị)"""
+        return len(self.rows)
+
+    def get(self, index: int) -> str:
+        """Nội dung một dòng theo index tuyệt đối"""
+        return self.rows[index]
+
+    def set_rows(self, rows: Iterable[str]):
+        """Thay toàn bộ danh sách (giữ vị trí cửa sổ nếu còn hợp lệ)"""
+        self.rows = list(rows)
+        self.start = max(0, min(self.start, len(self.rows) - self.window_size))
+        self.listbox.delete(0, tk.END)
+        if self.rows:
+            self.listbox.insert(tk.END, *self.rows[self.start:self.end])
+
+    def insert(self, index: int, text: str):
+        """Chèn một dòng tại index tuyệt đối"""
+        window_full = self.end - self.start >= self.window_size
+        self.rows.insert(index, text)
+        if index < self.start:
+            self.start += 1  # Nội dung cửa sổ không đổi, chỉ bị đẩy xuống
+        elif index < self.start + self.window_size:
+            self.listbox.insert(index - self.start, text)
+            if window_full:
+                self.listbox.delete(self.window_size)
+
+    def delete(self, index: int):
+        """Xóa một dòng theo index tuyệt đối"""
+        del self.rows[index]
+        if index < self.start:
+            self.start -= 1
+        elif index < self.start + self.window_size:
+            self.listbox.delete(index - self.start)
+            # Kéo dòng kế tiếp vào cuối cửa sổ
+            if len(self.rows) >= self.start + self.window_size:
+                self.listbox.insert(tk.END, self.rows[self.start + self.window_size - 1])
+            elif self.start > 0 and self.end - self.start < self.window_size:
+                self.start -= 1
+                self.listbox.insert(0, self.rows[self.start])
+
+    def update(self, index: int, text: str):
+        """Thay nội dung một dòng (giữ selection)"""
+        self.rows[index] = text
+        if self.start <= index < self.end:
+            local = index - self.start
+            selected = self.listbox.selection_includes(local)
+            self.listbox.delete(local)
+            self.listbox.insert(local, text)
+            if selected:
+                self.listbox.selection_set(local)
+
+    def selected_index(self) -> Optional[int]:
+        """Index tuyệt đối của dòng đang chọn (None nếu không chọn)"""
+        selection = self.listbox.curselection()
+        if not selection:
+            return None
+        return self.start + selection[0]
+
+    def select(self, index: int):
+        """Chọn một dòng và cuộn tới nó (dời cửa sổ nếu cần)"""
+        if not 0 <= index < len(self.rows):
+            return
+        if not self.start <= index < self.end:
+            self._shift_to(max(0, index - self.window_size // 2))
+        local = index - self.start
+        self.listbox.selection_clear(0, tk.END)
+        self.listbox.selection_set(local)
+        self.listbox.activate(local)
+        self.listbox.see(local)
+
+    def _on_yscroll(self, first, last):
+        """Dời cửa sổ khi người dùng cuộn gần mép (thực hiện ở idle, ngoài callback vẽ)"""
+        first, last = float(first), float(last)
+        near_end = last >= 1.0 - _EDGE_FRACTION and self.end < len(self.rows)
+        near_start = first <= _EDGE_FRACTION and self.start > 0
+        if (near_end or near_start) and not self._shift_pending:
+            self._shift_pending = True
+            self.listbox.after_idle(self._shift_for_view)
+
+    def _shift_for_view(self):
+        """Dời cửa sổ nửa trang theo hướng đang cuộn, giữ nguyên dòng đang ở trên cùng"""
+        self._shift_pending = False
+        first, last = self.listbox.yview()
+        step = self.window_size // 2
+        if last >= 1.0 - _EDGE_FRACTION and self.end < len(self.rows):
+            self._shift_to(min(self.start + step, len(self.rows) - self.window_size))
+        elif first <= _EDGE_FRACTION and self.start > 0:
+            self._shift_to(max(0, self.start - step))
+
+    def _shift_to(self, new_start: int):
+        """Dời cửa sổ tới new_start, chỉ thêm/xóa phần chênh lệch ở hai đầu"""
+        new_start = max(0, new_start)
+        if new_start == self.start:
+            return
+        top_row = self.start + self.listbox.nearest(0)
+        new_end = min(new_start + self.window_size, len(self.rows))
+
+        if new_start >= self.end or new_end <= self.start:
+            # Không chồng lấn - dựng lại cửa sổ
+            self.listbox.delete(0, tk.END)
+            self.listbox.insert(tk.END, *self.rows[new_start:new_end])
+        elif new_start > self.start:
+            self.listbox.delete(0, new_start - self.start - 1)
+            if new_end > self.end:
+                self.listbox.insert(tk.END, *self.rows[self.end:new_end])
+        else:
+            if self.end > new_end:
+                self.listbox.delete(new_end - self.start, tk.END)
+            self.listbox.insert(0, *self.rows[new_start:self.start])
+
+        self.start = new_start
+        self.listbox.yview(max(0, top_row - new_start))
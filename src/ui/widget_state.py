@@ -0,0 +1,39 @@
+"""
+Widget State - Cache các option đã áp dụng cho widget, chỉ gọi Tk khi giá trị thực sự đổi
+"""
+
+from typing import Any, Dict
+
+
+class WidgetStateCache:
+    """
+    Remembers the last options pushed into each widget via ``config``.
+
+    Every ``widget.config(...)`` is a round trip into Tcl, and the timer
+    display re-sends the same text and colours every tick. ``config`` here
+    compares the requested options with what was last applied and forwards
+    only the ones that differ, skipping the Tk call entirely when nothing
+    changed. All updates of a cached widget must go through this object,
+    otherwise the cache no longer matches the widget (use ``invalidate``).
+    """
+
+    def __init__(self):
+        self._applied: Dict[str, Dict[str, Any]] = {}  # widget path -> option -> value
+
+    def config(self, widget, **options) -> bool:
+        """Áp dụng các option đã đổi, trả về True nếu có gọi Tk"""
+        applied = self._applied.setdefault(str(widget), {})
+        changed = {key: value for key, value in options.items()
+                   if key not in applied or applied[key] != value}
+        if not changed:
+            return False
+        widget.config(**changed)
+        applied.update(changed)
+        return True
+
+    def invalidate(self, widget=None):
+        """Quên giá trị đã cache (của một widget, hoặc tất cả) để lần config sau gửi lại"""
+        if widget is None:
+            self._applied.clear()
+        else:
+            self._applied.pop(str(widget), None)